@@ -0,0 +1,4 @@
+from .response_cache import ResponseCache, normalize_utterance, embed_utterance, conversation_context
+from .prefetch import SectionPrefetcher
+
+__all__ = ['ResponseCache', 'normalize_utterance', 'embed_utterance', 'conversation_context', 'SectionPrefetcher']
\ No newline at end of file
@@ -0,0 +1,128 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Fraction of a section's time that must have passed before its successor
+# is prefetched
+PREFETCH_THRESHOLD = float(os.environ.get("PREFETCH_THRESHOLD", "0.6"))
+PREFETCH_TTL = float(os.environ.get("PREFETCH_TTL", "1800"))
+PREFETCH_MAX_SESSIONS = int(os.environ.get("PREFETCH_MAX_SESSIONS", "1024"))
+# How long a live turn waits on a build still in flight. Builds run at
+# background priority, so past this the turn makes its own live call.
+PREFETCH_WAIT_TIMEOUT = float(os.environ.get("PREFETCH_WAIT_TIMEOUT", "1.0"))
+
+Frames = List[Dict[str, Any]]
+
+class PrefetchedTurn:
+    """Frames of a section's opening turn, generated ahead of time."""
+
+    def __init__(self, section: str, version: str):
+        self.section = section
+        self.version = version
+        self.created_at = time.monotonic()
+        self.frames: Optional[Frames] = None
+        self.task: Optional[asyncio.Task] = None
+
+class SectionPrefetcher:
+    """Speculatively generated opening turns, one per session.
+
+    Each session holds at most one guess: the opening turn of the section
+    it is expected to move to next. A guess is only served for the same
+    section and content version it was built for; anything else means the
+    session diverged, and the guess is thrown away.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = PREFETCH_MAX_SESSIONS,
+        ttl: float = PREFETCH_TTL,
+        wait_timeout: float = PREFETCH_WAIT_TIMEOUT
+    ):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.wait_timeout = wait_timeout
+        self._entries: "OrderedDict[str, PrefetchedTurn]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.discarded = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def schedule(self, session_id: str, section: str, version: str, build: Callable[[], Awaitable[Frames]]) -> bool:
+        """Start building a session's next opening turn in the background.
+
+        Returns:
+            False if that turn is already built or being built
+        """
+        entry = self._entries.get(session_id)
+        if entry is not None and entry.section == section and entry.version == version:
+            return False
+        if entry is not None:
+            self._discard(session_id)
+
+        entry = PrefetchedTurn(section, version)
+        entry.task = asyncio.ensure_future(self._build(session_id, entry, build))
+        self._entries[session_id] = entry
+        while len(self._entries) > self.max_sessions:
+            self._discard(next(iter(self._entries)))
+        return True
+
+    async def take(self, session_id: str, section: str, version: str) -> Optional[Frames]:
+        """Claim the prefetched opening turn for a section, if it matches.
+
+        A build still in flight is awaited for up to wait_timeout, since it
+        is usually ahead of a fresh call. It runs at background priority,
+        though, so if the scheduler is busy it is abandoned rather than
+        holding a live turn behind background work.
+        """
+        entry = self._entries.pop(session_id, None)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.section != section or entry.version != version or time.monotonic() - entry.created_at > self.ttl:
+            self.discarded += 1
+            self.misses += 1
+            if entry.task is not None:
+                entry.task.cancel()
+            return None
+        if entry.task is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(entry.task), self.wait_timeout)
+            except asyncio.TimeoutError:
+                entry.task.cancel()
+            except Exception:
+                pass
+        if entry.frames is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry.frames
+
+    def discard(self, session_id: str) -> None:
+        """Drop a session's guess, e.g. when it jumps to another section."""
+        if session_id in self._entries:
+            self._discard(session_id)
+
+    def _discard(self, session_id: str) -> None:
+        entry = self._entries.pop(session_id)
+        self.discarded += 1
+        if entry.task is not None:
+            entry.task.cancel()
+
+    async def _build(self, session_id: str, entry: PrefetchedTurn, build: Callable[[], Awaitable[Frames]]) -> None:
+        try:
+            entry.frames = await build()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Failed to prefetch {entry.section} for session {session_id}: {str(e)}")
+            if self._entries.get(session_id) is entry:
+                del self._entries[session_id]
+        finally:
+            entry.task = None
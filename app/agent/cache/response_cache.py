@@ -0,0 +1,207 @@
+import hashlib
+import logging
+import math
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from agent.observability.tracing import tracer
+
+logger = logging.getLogger(__name__)
+
+RESPONSE_CACHE_TTL = int(os.environ.get("RESPONSE_CACHE_TTL", "3600"))
+RESPONSE_CACHE_SIZE = int(os.environ.get("RESPONSE_CACHE_SIZE", "512"))
+RESPONSE_CACHE_THRESHOLD = float(os.environ.get("RESPONSE_CACHE_THRESHOLD", "0.85"))
+# Sections where varied responses matter more than latency
+RESPONSE_CACHE_OPT_OUT = {
+    section.strip()
+    for section in os.environ.get("RESPONSE_CACHE_OPT_OUT", "role_play").split(",")
+    if section.strip()
+}
+RESPONSE_CACHE_KEY_PREFIX = "response-cache:"
+
+# Utterances shorter than this ("yes", "ok, go on") depend on context too
+# much to be answered from the cache
+MIN_CACHEABLE_TERMS = 3
+EMBEDDING_DIMENSIONS = 1 << 12
+
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "to", "of", "in", "on",
+    "for", "and", "or", "it", "this", "that", "we", "i", "you", "do", "does",
+    "can", "could", "please", "so", "um", "uh", "just"
+}
+# Words that point back at the conversation ("can you say more about
+# that?"); a reply to an utterance using them depends on what came before
+REFERRING_TERMS = {
+    "it", "this", "that", "these", "those", "they", "them", "their",
+    "he", "she", "him", "her", "again", "above", "earlier", "else", "more"
+}
+
+Vector = Dict[int, float]
+
+def normalize_utterance(utterance: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(re.sub(r"[^\w\s']", " ", utterance.lower()).split())
+
+def embed_utterance(normalized: str) -> Vector:
+    """Sparse, L2-normalized hashed bag of unigrams and bigrams.
+
+    Cheap enough to run on every turn and good at matching rephrasings that
+    share most of their content words. A model embedding can be passed to
+    ResponseCache instead.
+    """
+    terms = [term for term in normalized.split() if term not in STOPWORDS]
+    features = terms + [f"{a} {b}" for a, b in zip(terms, terms[1:])]
+    vector: Vector = {}
+    for feature in features:
+        index = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=4).digest(), "big") % EMBEDDING_DIMENSIONS
+        vector[index] = vector.get(index, 0.0) + 1.0
+    norm = math.sqrt(sum(value * value for value in vector.values()))
+    return {index: value / norm for index, value in vector.items()} if norm else {}
+
+def conversation_context(utterance: str, messages: Optional[List[Dict[str, Any]]]) -> str:
+    """The part of the conversation a reply to an utterance depends on.
+
+    "" for a self-contained question, which any session in the section can
+    share; for one referring back, a digest of the facilitator's last turn.
+    """
+    if REFERRING_TERMS.isdisjoint(normalize_utterance(utterance).split()):
+        return ""
+    previous = next((message.get("content", "") for message in reversed(messages or []) if message.get("role") == "assistant"), "")
+    return hashlib.sha1(str(previous).encode()).hexdigest()[:16]
+
+def cosine_similarity(a: Vector, b: Vector) -> float:
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(value * b.get(index, 0.0) for index, value in a.items())
+
+class CachedResponse:
+    def __init__(self, text: str, vector: Vector, expires_at: float):
+        self.text = text
+        self.vector = vector
+        self.expires_at = expires_at
+
+class ResponseCache:
+    """Facilitator responses keyed by section and a normalized utterance.
+
+    Self-contained questions are shared by every session in a section;
+    utterances that refer back to the conversation are further scoped by
+    the facilitator turn they follow (see conversation_context). Lookups
+    try an exact match on the normalized utterance, then the most similar
+    cached utterance in the same scope above ``threshold``, then
+    the shared Redis tier (exact matches only). Entries expire after ``ttl``
+    seconds and the in-memory tier evicts least recently used entries.
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        ttl: int = RESPONSE_CACHE_TTL,
+        max_entries: int = RESPONSE_CACHE_SIZE,
+        threshold: float = RESPONSE_CACHE_THRESHOLD,
+        opt_out: Optional[Set[str]] = None,
+        embed: Callable[[str], Vector] = embed_utterance
+    ):
+        self.redis = redis_client
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.opt_out = RESPONSE_CACHE_OPT_OUT if opt_out is None else opt_out
+        self.embed = embed
+        self._entries: "OrderedDict[Tuple[str, str, str], CachedResponse]" = OrderedDict()
+        self._by_section: Dict[Tuple[str, str], Set[str]] = {}
+        self.hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+
+    def enabled_for(self, section: str) -> bool:
+        return self.max_entries > 0 and section not in self.opt_out
+
+    def is_cacheable(self, normalized: str) -> bool:
+        return len([term for term in normalized.split() if term not in STOPWORDS]) >= MIN_CACHEABLE_TERMS
+
+    async def lookup(self, section: str, version: str, utterance: str, context: str = "") -> Optional[str]:
+        """Find a cached response for an utterance in a section and context."""
+        normalized = normalize_utterance(utterance)
+        if not self.enabled_for(section) or not self.is_cacheable(normalized):
+            return None
+        version = self._scope(version, context)
+
+        now = time.monotonic()
+        key = (section, version, normalized)
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at > now:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.text
+
+        match = self._most_similar(section, version, self.embed(normalized), now)
+        if match is not None:
+            self._entries.move_to_end(match)
+            self.similar_hits += 1
+            return self._entries[match].text
+
+        if self.redis is not None:
+            try:
+                with tracer.span("redis.get", key="response_cache"):
+                    text = await self.redis.get(self._redis_key(section, version, normalized))
+            except Exception as e:
+                logger.warning(f"Response cache lookup failed: {str(e)}")
+                text = None
+            if text:
+                text = text.decode() if isinstance(text, bytes) else text
+                self._remember(key, text, now)
+                self.hits += 1
+                return text
+
+        self.misses += 1
+        return None
+
+    async def store(self, section: str, version: str, utterance: str, text: str, context: str = "") -> None:
+        """Cache the response given to an utterance in a context."""
+        normalized = normalize_utterance(utterance)
+        if not text or not self.enabled_for(section) or not self.is_cacheable(normalized):
+            return
+        version = self._scope(version, context)
+        self._remember((section, version, normalized), text, time.monotonic())
+        if self.redis is not None:
+            try:
+                await self.redis.set(self._redis_key(section, version, normalized), text, ex=self.ttl)
+            except Exception as e:
+                logger.warning(f"Response cache store failed: {str(e)}")
+
+    def _most_similar(self, section: str, version: str, vector: Vector, now: float) -> Optional[Tuple[str, str, str]]:
+        best_key, best_score = None, self.threshold
+        for normalized in list(self._by_section.get((section, version), ())):
+            key = (section, version, normalized)
+            entry = self._entries[key]
+            if entry.expires_at <= now:
+                self._forget(key)
+                continue
+            score = cosine_similarity(vector, entry.vector)
+            if score >= best_score:
+                best_key, best_score = key, score
+        return best_key
+
+    def _remember(self, key: Tuple[str, str, str], text: str, now: float) -> None:
+        self._entries[key] = CachedResponse(text, self.embed(key[2]), now + self.ttl)
+        self._entries.move_to_end(key)
+        self._by_section.setdefault(key[:2], set()).add(key[2])
+        while len(self._entries) > self.max_entries:
+            self._forget(next(iter(self._entries)))
+
+    def _forget(self, key: Tuple[str, str, str]) -> None:
+        del self._entries[key]
+        scope = self._by_section[key[:2]]
+        scope.discard(key[2])
+        if not scope:
+            del self._by_section[key[:2]]
+
+    def _scope(self, version: str, context: str) -> str:
+        return f"{version}:{context}" if context else version
+
+    def _redis_key(self, section: str, version: str, normalized: str) -> str:
+        digest = hashlib.sha1(normalized.encode()).hexdigest()
+        return f"{RESPONSE_CACHE_KEY_PREFIX}{section}:{version}:{digest}"
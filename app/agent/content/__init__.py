@@ -0,0 +1,23 @@
+from .repository import ContentRepository, ContentSnapshot, SectionInfo
+from .widgets import (
+    CachedWidget,
+    WidgetCache,
+    widget_cache,
+    section_widget,
+    STATIC_WIDGET_VERSION
+)
+from .bundle import ContentBundle, BundleServer, compile_bundle
+
+__all__ = [
+    'ContentRepository',
+    'ContentSnapshot',
+    'SectionInfo',
+    'CachedWidget',
+    'WidgetCache',
+    'widget_cache',
+    'section_widget',
+    'STATIC_WIDGET_VERSION',
+    'ContentBundle',
+    'BundleServer',
+    'compile_bundle'
+]
\ No newline at end of file
@@ -0,0 +1,201 @@
+import json
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from agent.cache.response_cache import normalize_utterance
+from agent.content.repository import CONTENT_PATH, ContentSnapshot
+from agent.content.widgets import STATIC_WIDGET_VERSION, section_widget
+from agent.utils.serialization import EncodedJSON, dumps
+
+logger = logging.getLogger(__name__)
+
+# Bump when the bundle layout or the scripted phrases change
+BUNDLE_FORMAT = "2"
+BUNDLE_PATH = os.environ.get(
+    "WORKSHOP_BUNDLE_PATH",
+    os.path.join(os.path.dirname(CONTENT_PATH), "workshop_bundle.json")
+)
+
+# Utterances (after normalize_utterance) answered from the bundle
+SCRIPTED_PHRASES = {
+    "task": [
+        "what is the task", "what's the task", "what is our task", "what's our task",
+        "what should we do", "what do we do now", "what are we doing", "what are we meant to do",
+        "what is the activity", "what's the activity", "repeat the task", "can you repeat the task"
+    ],
+    "time": [
+        "how much time is left", "how much time do we have", "how much time have we got",
+        "how long do we have", "how long is left", "how long have we got", "how much time left",
+        "time check", "how are we for time"
+    ],
+    "widget": [
+        "show the visual aid", "show me the visual aid", "can you show the visual aid",
+        "show the widget", "show it again", "can we see that again", "show the chart",
+        "show the checklist", "show the table", "show the flowchart"
+    ]
+}
+
+def describe_time_remaining(time_remaining: Optional[int]) -> str:
+    """The facilitator's answer to a time check."""
+    if time_remaining is None:
+        return "We don't have a timer running for this section, so let's keep going."
+    if time_remaining < 60:
+        return "We have less than a minute left for this section."
+    if time_remaining < 180:
+        return "We have a few minutes left for this section."
+    return f"We have about {time_remaining // 60} minutes left for this section."
+
+class ScriptedTurn:
+    """A turn answered entirely from the bundle."""
+
+    def __init__(self, intent: str, text: str, widget: Optional[Dict[str, Any]] = None, task: Optional[Dict[str, Any]] = None):
+        self.intent = intent
+        self.text = text
+        self.widget = widget
+        self.task = task
+
+class ContentBundle:
+    """Pre-rendered scripted utterances and widgets for one content version.
+
+    Built by compile_bundle from workshop_content.json and the graph nodes'
+    built-in tables. Each section carries its task description, task
+    metadata and widget payload, already rendered, so a scripted turn is a
+    dict lookup.
+    """
+
+    def __init__(self, content_version: str, sections: Dict[str, Dict[str, Any]]):
+        self.content_version = content_version
+        self.version = f"{BUNDLE_FORMAT}:{STATIC_WIDGET_VERSION}:{content_version}"
+        self.sections = sections
+        for script in sections.values():
+            # Encoded once here, spliced into every frame that shows it
+            if script.get("widget") and not isinstance(script["widget"], EncodedJSON):
+                script["widget"] = EncodedJSON(script["widget"])
+        self._intents = {
+            normalize_utterance(phrase): intent
+            for intent, phrases in SCRIPTED_PHRASES.items()
+            for phrase in phrases
+        }
+
+    def match(self, section_name: str, utterance: str, time_remaining: Optional[int] = None) -> Optional[ScriptedTurn]:
+        """Return the scripted answer to an utterance, if it has one."""
+        intent = self._intents.get(normalize_utterance(utterance))
+        if intent is None:
+            return None
+        if intent == "time":
+            return ScriptedTurn(intent, describe_time_remaining(time_remaining))
+
+        script = self.sections.get(section_name)
+        if script is None:
+            return None
+        if intent == "task" and script.get("task"):
+            task = script["task"]
+            return ScriptedTurn(intent, task["content"], task=task)
+        if intent == "widget" and script.get("widget"):
+            return ScriptedTurn(intent, script["widget_intro"], widget=script["widget"])
+        return None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"version": self.version, "content_version": self.content_version, "sections": self.sections}
+
+    def save(self, path: str = BUNDLE_PATH) -> None:
+        """Write the bundle atomically."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(dumps(self.to_dict()))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str = BUNDLE_PATH, content_version: Optional[str] = None) -> Optional["ContentBundle"]:
+        """Read a compiled bundle, or None if missing or built from other content."""
+        try:
+            with open(path) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        bundle = cls(data.get("content_version", ""), data.get("sections", {}))
+        if bundle.version != data.get("version"):
+            return None
+        if content_version is not None and bundle.content_version != content_version:
+            return None
+        return bundle
+
+def compile_bundle(snapshot: ContentSnapshot) -> ContentBundle:
+    """Render every section's scripted turns for a content snapshot."""
+    # Imported here: the graph nodes import this package's widget cache
+    from agent.graph.nodes.task_description import DEFAULT_TASK_DURATION, TaskDescription
+    from agent.graph.nodes.widget import Widget
+
+    task_node = TaskDescription()
+    widget_node = Widget()
+    sections: Dict[str, Dict[str, Any]] = {}
+    for name, section in snapshot.sections.items():
+        script: Dict[str, Any] = {}
+
+        if section.activities:
+            activity = section.activities[0]
+            content, metadata = task_node.describe_task(
+                name,
+                activity.get("type", ""),
+                activity.get("duration", DEFAULT_TASK_DURATION)
+            )
+            script["task"] = {"content": content, "metadata": metadata}
+
+        widget = None
+        if section.has_visual_aid:
+            cached = section_widget(section, snapshot.version)
+            widget = cached.payload if cached is not None else None
+        if not widget and section.widget_type:
+            widget = widget_node.generate_widget_output(section.widget_type, name, {"content_version": snapshot.version})
+        if widget:
+            script["widget"] = widget
+            script["widget_intro"] = f"Here's the {section.title or 'visual aid'} again."
+
+        if script:
+            sections[name] = script
+    return ContentBundle(snapshot.version, sections)
+
+class BundleServer:
+    """Keeps the bundle in step with the content and counts scripted turns."""
+
+    def __init__(self, path: str = BUNDLE_PATH):
+        self.path = path
+        self._bundle: Optional[ContentBundle] = None
+        self.turns = 0
+        self.scripted = 0
+
+    def bundle(self, snapshot: ContentSnapshot) -> ContentBundle:
+        """The bundle for a snapshot: from disk if prebuilt, else compiled once."""
+        if self._bundle is None or self._bundle.content_version != snapshot.version:
+            bundle = ContentBundle.load(self.path, snapshot.version)
+            if bundle is None:
+                bundle = compile_bundle(snapshot)
+                logger.info(f"Compiled content bundle {bundle.version}")
+            self._bundle = bundle
+        return self._bundle
+
+    def match(self, snapshot: ContentSnapshot, section_name: str, utterance: str, time_remaining: Optional[int] = None) -> Optional[ScriptedTurn]:
+        """Look up a scripted answer and count the turn."""
+        self.turns += 1
+        turn = self.bundle(snapshot).match(section_name, utterance, time_remaining)
+        if turn is not None:
+            self.scripted += 1
+        return turn
+
+    def stats(self) -> Dict[str, Any]:
+        """How many turns were answered from the bundle."""
+        return {
+            "version": self._bundle.version if self._bundle is not None else None,
+            "turns": self.turns,
+            "scripted": self.scripted,
+            "scripted_share": self.scripted / self.turns if self.turns else 0.0
+        }
+
+if __name__ == "__main__":
+    # Compile step: python -m agent.content.bundle
+    from agent.content.repository import ContentRepository
+    repository = ContentRepository(reload_interval=0)
+    compiled = compile_bundle(repository.snapshot)
+    compiled.save()
+    print(f"Wrote {BUNDLE_PATH} ({compiled.version}, {len(compiled.sections)} sections)")
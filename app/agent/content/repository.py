@@ -0,0 +1,136 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+CONTENT_PATH = os.environ.get(
+    "WORKSHOP_CONTENT_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "workshop_content.json")
+)
+CONTENT_RELOAD_INTERVAL = float(os.environ.get("CONTENT_RELOAD_INTERVAL", "2"))
+
+class SectionInfo:
+    """A workshop section with the fields each turn needs precomputed."""
+
+    def __init__(self, name: str, content: Dict[str, Any]):
+        self.name = name
+        self.content = content
+        self.title = content.get("title", "")
+        self.duration = content.get("duration", 0)
+        self.widget_type = content.get("widget_type")
+        self.has_visual_aid = bool(content.get("has_visual_aid", False) and self.widget_type)
+        self.activities: List[Dict[str, Any]] = content.get("activities", [])
+
+class ContentSnapshot:
+    """An immutable, indexed view of one version of the workshop content."""
+
+    def __init__(self, raw: Dict[str, Any], version: str):
+        """Index the raw content of workshop_content.json.
+
+        Raises:
+            ValueError: If the content or one of its sections isn't a JSON object
+        """
+        if not isinstance(raw, dict):
+            raise ValueError(f"Expected a JSON object, got {type(raw).__name__}")
+        sections = raw.get("sections", {})
+        if not isinstance(sections, dict) or not all(isinstance(content, dict) for content in sections.values()):
+            raise ValueError("Expected \"sections\" to map section names to objects")
+        self.version = version
+        self.metadata = raw.get("workshop_metadata", {})
+        self.resources = raw.get("resources", {})
+        self.sections = {
+            name: SectionInfo(name, content)
+            for name, content in sections.items()
+        }
+
+    def get_section(self, name: str) -> Optional[SectionInfo]:
+        return self.sections.get(name)
+
+EMPTY_SNAPSHOT = ContentSnapshot({}, "empty")
+
+class ContentRepository:
+    """Loads workshop_content.json once and reloads it when the file changes.
+
+    Turns read from the current snapshot without touching the file. A
+    background watcher compares the file's mtime and size, and only re-reads
+    and hashes it when they differ. A new snapshot is swapped in with a single
+    assignment, so readers always see either the old or the new version.
+    """
+
+    def __init__(self, path: str = CONTENT_PATH, reload_interval: float = CONTENT_RELOAD_INTERVAL):
+        self.path = path
+        self.reload_interval = reload_interval
+        self._snapshot: Optional[ContentSnapshot] = None
+        self._stat_key = None
+        self._watcher: Optional[asyncio.Task] = None
+
+    @property
+    def snapshot(self) -> ContentSnapshot:
+        if self._snapshot is None:
+            self.reload_if_changed()
+        return self._snapshot or EMPTY_SNAPSHOT
+
+    @property
+    def version(self) -> str:
+        return self.snapshot.version
+
+    def get_section(self, name: str) -> Optional[SectionInfo]:
+        """Get the indexed section, or None if the content doesn't define it."""
+        return self.snapshot.get_section(name)
+
+    def reload_if_changed(self) -> bool:
+        """Reload the content if the file changed. Returns True on reload."""
+        try:
+            stat = os.stat(self.path)
+            stat_key = (stat.st_mtime_ns, stat.st_size)
+            if stat_key == self._stat_key:
+                return False
+            with open(self.path, "rb") as f:
+                raw = f.read()
+        except OSError as e:
+            logger.error(f"Error loading workshop content: {e}")
+            return False
+
+        version = hashlib.sha256(raw).hexdigest()[:16]
+        self._stat_key = stat_key
+        if self._snapshot is not None and self._snapshot.version == version:
+            return False
+
+        try:
+            snapshot = ContentSnapshot(json.loads(raw), version)
+        except ValueError as e:
+            # Keep serving the previous version until the file is fixed
+            logger.error(f"Invalid workshop content in {self.path}: {e}")
+            return False
+
+        self._snapshot = snapshot
+        logger.info(f"Loaded workshop content version {version}")
+        return True
+
+    def start(self) -> None:
+        """Load the content and start watching the file for changes."""
+        self.reload_if_changed()
+        if self._watcher is None and self.reload_interval > 0:
+            self._watcher = asyncio.get_event_loop().create_task(self._watch())
+
+    async def stop(self) -> None:
+        """Stop watching the file."""
+        if self._watcher is not None:
+            self._watcher.cancel()
+            try:
+                await self._watcher
+            except asyncio.CancelledError:
+                pass
+            self._watcher = None
+
+    async def _watch(self) -> None:
+        while True:
+            await asyncio.sleep(self.reload_interval)
+            try:
+                await asyncio.to_thread(self.reload_if_changed)
+            except Exception as e:
+                logger.error(f"Error reloading workshop content: {e}")
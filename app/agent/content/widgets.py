@@ -0,0 +1,139 @@
+import hashlib
+from typing import Callable, Dict, Hashable, Optional
+
+from agent.content.repository import SectionInfo
+from agent.models import WidgetSpec
+from agent.utils.serialization import EncodedJSON, dumps
+
+# Bump when the hard-coded widget tables in the graph nodes change
+STATIC_WIDGET_VERSION = "1"
+
+class CachedWidget:
+    """A widget payload serialized once for a given content version.
+
+    ``payload`` is the dict sent to clients, carrying its own encoding so
+    frames splice it in rather than encoding it again; ``encoded`` is those
+    JSON bytes and ``details`` the encoded details. The ``etag`` only
+    depends on the widget's type and details, so clients can skip
+    re-rendering a widget they have already shown.
+    """
+
+    def __init__(self, spec: WidgetSpec, version: Optional[str]):
+        self.type = spec.type
+        self.version = version
+        details = dumps(spec.details)
+        self.details = details.decode()
+        self.etag = hashlib.sha1(f"{self.type}:{self.details}".encode()).hexdigest()[:16]
+        self.payload = EncodedJSON(
+            {
+                "type": self.type,
+                "details": spec.details,
+                "etag": self.etag,
+                "version": version
+            },
+            b'{"type":%s,"details":%s,"etag":"%s","version":%s}' % (dumps(self.type), details, self.etag.encode(), dumps(version))
+        )
+        self.encoded = self.payload.encoded
+
+class WidgetCache:
+    """Serialized widget payloads keyed by section and content version.
+
+    Each key holds one entry; building it for a new version replaces the
+    previous one, so the cache stays bounded by the number of sections.
+    """
+
+    def __init__(self):
+        self._entries: Dict[Hashable, CachedWidget] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(
+        self,
+        key: Hashable,
+        version: str,
+        build: Callable[[], Optional[WidgetSpec]]
+    ) -> Optional[CachedWidget]:
+        """Return the cached widget for key at version, building it on a miss.
+
+        Args:
+            key: Identifies the widget, e.g. ("section", "population_data")
+            version: Content version the widget was built from
+            build: Returns the widget's spec, or None for no widget
+
+        Returns:
+            The cached widget, or None if build produced no widget
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry.version == version:
+            self.hits += 1
+            return entry
+
+        self.misses += 1
+        spec = build()
+        if spec is None:
+            self._entries.pop(key, None)
+            return None
+        entry = CachedWidget(spec, version)
+        self._entries[key] = entry
+        return entry
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+widget_cache = WidgetCache()
+
+def section_widget(section: SectionInfo, version: str) -> Optional[CachedWidget]:
+    """Get the widget defined by a section's content, built once per version."""
+    return widget_cache.get(
+        ("section", section.name),
+        version,
+        lambda: build_section_widget(section.content)
+    )
+
+def build_section_widget(section: dict) -> Optional[WidgetSpec]:
+    """Build the widget spec for a section's content."""
+    widget_type = section.get('widget_type')
+    if not widget_type:
+        return None
+        
+    if widget_type == 'checklist':
+        return create_checklist_widget(section)
+    elif widget_type == 'flowchart':
+        return create_flowchart_widget(section)
+    elif widget_type == 'data_table':
+        return create_data_table_widget(section)
+    elif widget_type == 'chart':
+        return create_chart_widget(section)
+    
+    return None
+
+def create_checklist_widget(section: dict) -> WidgetSpec:
+    """Create a checklist widget for sections that need it."""
+    return WidgetSpec('checklist', {
+        'items': section.get('checklist_items', []),
+        'title': section.get('title', 'Checklist'),
+        'instructions': section.get('instructions', '')
+    })
+
+def create_flowchart_widget(section: dict) -> WidgetSpec:
+    """Create a flowchart widget for service user journey mapping."""
+    return WidgetSpec('flowchart', {
+        'nodes': section.get('flowchart_nodes', []),
+        'edges': section.get('flowchart_edges', []),
+        'title': section.get('title', 'Service User Journey')
+    })
+
+def create_data_table_widget(section: dict) -> WidgetSpec:
+    """Create a data table widget for population data and statistics."""
+    return WidgetSpec('data_table', {
+        'headers': section.get('table_headers', []),
+        'rows': section.get('table_data', []),
+        'title': section.get('title', 'Population Data')
+    })
+
+def create_chart_widget(section: dict) -> WidgetSpec:
+    """Create a chart widget for outcome comparisons."""
+    return WidgetSpec('chart', {
+        'chartData': section.get('chart_data', []),
+        'title': section.get('title', 'Chart')
+    })
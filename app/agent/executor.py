@@ -1,164 +1,359 @@
-from typing import List, Dict, Any
-import json
-import os
-from agent.utils.llm import initialize_llm_client
+import asyncio
+import logging
+from functools import partial
+from typing import List, Dict, Any, AsyncIterator, Optional, Set
+from agent.utils.llm import initialize_llm_client, stream_chat_completion
+from agent.utils.llm_scheduler import Priority
+from agent.utils.prompts import prompt_cache
+from agent.utils.streaming import (
+    SentenceBuffer,
+    text_delta_frame,
+    sentence_frame,
+    widget_frame,
+    task_frame,
+    final_frame,
+    merge_streams
+)
+from agent.content import ContentRepository, SectionInfo
+from agent.content.bundle import BundleServer, ScriptedTurn
+from agent.cache import ResponseCache, SectionPrefetcher, conversation_context
+from agent.cache.prefetch import PREFETCH_THRESHOLD
+from agent.state import WorkshopState, HistoryManager, ConversationLog, SECTION_INDEX, create_session_store, session_key
+from agent.graph import GraphRunner
+from agent.observability.metrics import metrics
+from agent.observability.tracing import tracer
+from agent.runtime.breakout import BreakoutManager
+from agent.runtime.timers import timer_scheduler
 from agent.graph.nodes import (
     CustomerResponse,
     Widget,
-    TaskDescriptionResponse
+    TaskDescription
 )
 
-class WorkshopState:
-    def __init__(self):
-        self.current_section = 0
-        self.sections = [
-            "introduction",
-            "key_concepts",
-            "scenario_discussion",
-            "population_data",
-            "community_resources",
-            "health_inequalities",
-            "checklist_practice",
-            "service_user_journey",
-            "policy_review",
-            "assessment_tools",
-            "cultural_formulation",
-            "presenting_issues",
-            "intervention_adaptation",
-            "role_play",
-            "risk_assessment",
-            "risk_management",
-            "cultural_broker",
-            "rehabilitation_programs",
-            "spirituality_guidelines",
-            "discharge_planning",
-            "staff_assessment",
-            "training_program",
-            "recruitment_retention",
-            "performance_indicators",
-            "feedback_methods",
-            "action_planning",
-            "conclusion"
-        ]
-        self.completion_status = {section: False for section in self.sections}
-        self.participant_inputs = {}
-        self.current_discussion = None
+logger = logging.getLogger(__name__)
 
 llm_client = initialize_llm_client()
-workshop_state = WorkshopState()
-
-def load_workshop_content():
-    """Load the workshop content from a JSON file."""
-    try:
-        with open('workshop_content.json', 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        print(f"Error loading workshop content: {e}")
-        return {}
-
-def get_section_content(section_name: str) -> dict:
-    """Get content for a specific workshop section."""
-    content = load_workshop_content()
-    return content.get(section_name, {})
+session_store = create_session_store()
+content_repository = ContentRepository()
+graph_runner = GraphRunner({
+    "CustomerResponse": CustomerResponse(),
+    "Widget": Widget(),
+    "TaskDescription": TaskDescription()
+})
+
+SUMMARY_PROMPT = """
+    You keep notes for a cultural competency workshop facilitator.
+    Update the running summary of the discussion with the new turns below.
+    Keep participants' key points, questions and agreed actions. Be concise: at most five sentences.
+    """
+
+async def summarize_turns(summary: str, messages: List[Dict[str, Any]]) -> str:
+    """Fold older conversation turns into a section's running summary."""
+    transcript = "\n".join(f"{message.get('role', 'user')}: {message.get('content', '')}" for message in messages)
+    prompt = [
+        {"role": "system", "content": SUMMARY_PROMPT},
+        {"role": "user", "content": f"Current summary:\n{summary or '(none)'}\n\nNew turns:\n{transcript}"}
+    ]
+    chunks = [delta async for delta in stream_chat_completion(
+        llm_client, prompt, priority=Priority.BACKGROUND, temperature=0.2, max_tokens=200
+    )]
+    return "".join(chunks).strip()
+
+history_manager = HistoryManager(session_store, summarize_turns)
+conversation_log = ConversationLog(session_store.redis)
+response_cache = ResponseCache(session_store.redis)
+# Cache writes run after the turn; held here so they aren't collected early
+_cache_writes: Set[asyncio.Task] = set()
+section_prefetcher = SectionPrefetcher()
+bundle_server = BundleServer()
+
+def cache_lookups() -> Dict[tuple, float]:
+    """Hits and misses of this worker's caches, for the metrics endpoint."""
+    return {
+        ("response", "hit"): response_cache.hits,
+        ("response", "similar_hit"): response_cache.similar_hits,
+        ("response", "miss"): response_cache.misses,
+        ("prompt", "hit"): prompt_cache.hits,
+        ("prompt", "miss"): prompt_cache.misses,
+        ("prefetch", "hit"): section_prefetcher.hits,
+        ("prefetch", "miss"): section_prefetcher.misses,
+        ("bundle", "hit"): bundle_server.scripted,
+        ("bundle", "miss"): bundle_server.turns - bundle_server.scripted
+    }
+
+metrics.counter("workshop_cache_lookups_total", "Cache lookups by cache and result", ["cache", "result"], callback=cache_lookups)
+
+OPENING_PROMPT = (
+    "We are starting this section now. Welcome the participants to it, "
+    "explain what it covers and introduce its first activity."
+)
+
+def get_section_content(section_name: str) -> Optional[SectionInfo]:
+    """Get the indexed content for a specific workshop section."""
+    with tracer.span("content.section", section=section_name):
+        return content_repository.get_section(section_name)
 
 def format_facilitator_message(content: str) -> str:
     """Format the facilitator's message with appropriate tone."""
     return f"Facilitator: {content}"
 
-def get_next_section() -> str:
+def peek_next_section(state: WorkshopState) -> Optional[str]:
+    """The section get_next_section() would move to, without moving."""
+    if state.current_section < len(state.sections):
+        return state.sections[state.current_section]
+    return None
+
+def section_progress(session_id: str, section_name: str) -> Optional[float]:
+    """Fraction of a section's timer that has elapsed, if it has one."""
+    timer = timer_scheduler.get_timer(session_id, f"section:{section_name}")
+    if timer is None or not timer.duration:
+        return None
+    remaining = timer_scheduler.time_remaining(session_id, f"section:{section_name}") or 0
+    return 1 - remaining / timer.duration
+
+def get_next_section(state: WorkshopState) -> str:
     """Get the next workshop section based on current state."""
-    if workshop_state.current_section < len(workshop_state.sections):
-        next_section = workshop_state.sections[workshop_state.current_section]
-        workshop_state.current_section += 1
+    if state.current_section < len(state.sections):
+        next_section = state.sections[state.current_section]
+        state.current_section += 1
         return next_section
     return "conclusion"
 
-async def single_turn_agent(messages: List[dict]) -> dict:
-    """Process a single turn of the workshop conversation."""
-    user_message = messages[-1]["content"] if messages else ""
-    current_section = get_section_content(workshop_state.sections[workshop_state.current_section - 1])
+async def advance_section(session: Dict[str, Any] = None) -> str:
+    """Move a session on to its next workshop section and start its timer."""
+    session_id = session_key(session)
+    state = await session_store.load(session_id)
+    next_section = get_next_section(state)
+    await session_store.save(session_id, state)
     
-    prompt = f"""
-    You are a cultural competency workshop facilitator for forensic mental health services.
-    Current section: {current_section.get('title', '')}
-    User input: {user_message}
+    section = get_section_content(next_section)
+    if section and isinstance(section.duration, (int, float)) and section.duration > 0:
+        timer_scheduler.start_timer(session_id, f"section:{next_section}", section.duration, [section.duration - 60])
+    return next_section
+
+def build_workshop_context(
+    state: WorkshopState,
+    section: Optional[SectionInfo],
+    session_id: str = "default"
+) -> Dict[str, Any]:
+    """Build the context the graph nodes read for the current section."""
+    section_name = state.current_section_name
+    activity = section.activities[0] if section and section.activities else {}
+    section_complete = state.is_complete(section_name)
+    return {
+        "current_section": section_name,
+        "section_info": section,
+        "content_version": content_repository.version,
+        "widget_type": section.widget_type if section else None,
+        "requires_visual_aid": bool(section and section.has_visual_aid),
+        "interactive_mode": bool(activity),
+        "task_type": activity.get("type", ""),
+        "duration": activity.get("duration", 180),
+        "section_complete": section_complete,
+        "section_status": "complete" if section_complete else "in_progress",
+        "current_discussion": state.current_discussion,
+        "time_remaining": timer_scheduler.time_remaining(session_id)
+    }
+
+def _cache_write_done(task: asyncio.Task) -> None:
+    _cache_writes.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.warning(f"Failed to cache response: {str(task.exception())}")
+
+async def generate_text(messages: List[Dict[str, Any]], priority: Priority = Priority.LIVE) -> AsyncIterator[dict]:
+    """Stream the facilitator's reply as text delta and sentence frames."""
+    sentences = SentenceBuffer()
+    sentence_count = 0
+    async for delta in stream_chat_completion(llm_client, messages, priority=priority, temperature=0.7):
+        yield text_delta_frame(delta)
+        for sentence in sentences.feed(delta):
+            yield sentence_frame(sentence, sentence_count)
+            sentence_count += 1
     
-    Based on the workshop content and user input, provide an appropriate facilitator response.
-    Keep the response engaging and interactive while maintaining professional tone.
+    remainder = sentences.flush()
+    if remainder:
+        yield sentence_frame(remainder, sentence_count)
+
+async def replay_text(text: str) -> AsyncIterator[dict]:
+    """Stream a cached reply as text delta and sentence frames at once."""
+    yield text_delta_frame(text)
+    sentences = SentenceBuffer()
+    sentence_count = 0
+    for sentence in sentences.feed(text):
+        yield sentence_frame(sentence, sentence_count)
+        sentence_count += 1
+    remainder = sentences.flush()
+    if remainder:
+        yield sentence_frame(remainder, sentence_count)
+
+async def opening_frames(
+    state: WorkshopState,
+    section_name: str,
+    session_id: str,
+    priority: Priority = Priority.LIVE
+) -> AsyncIterator[dict]:
+    """Stream the facilitator's opening turn for a section.
+
+    The opening doesn't depend on the conversation so far, only on the
+    section and its content, which is what makes it safe to prefetch.
     """
+    opening_state = WorkshopState.from_dict(state.to_dict())
+    opening_state.current_section = SECTION_INDEX[section_name] + 1
+    section = get_section_content(section_name)
+    with tracer.span("prompt.build", section=section_name):
+        prompt_messages = prompt_cache.build_messages(section_name, section, content_repository.version, OPENING_PROMPT)
+    workshop_context = build_workshop_context(opening_state, section, session_id)
+    workshop_context["time_remaining"] = None
+    async for frame in merge_streams(
+        generate_text(prompt_messages, priority),
+        run_graph([{"role": "user", "content": OPENING_PROMPT}], workshop_context)
+    ):
+        yield frame
+
+async def scripted_frames(turn: ScriptedTurn) -> AsyncIterator[dict]:
+    """Stream a turn answered from the content bundle."""
+    if turn.widget:
+        yield widget_frame(turn.widget)
+    if turn.task:
+        yield task_frame(turn.task["content"], turn.task["metadata"])
+    async for frame in replay_text(turn.text):
+        yield frame
+
+async def replay_frames(frames: List[dict]) -> AsyncIterator[dict]:
+    """Stream frames that were generated ahead of time."""
+    for frame in frames:
+        yield frame
+
+def maybe_prefetch(session_id: str, state: WorkshopState) -> None:
+    """Build the next section's opening turn once this section is far enough along."""
+    next_section = peek_next_section(state)
+    if next_section is None:
+        return
+    progress = section_progress(session_id, state.current_section_name)
+    if progress is None or progress < PREFETCH_THRESHOLD:
+        return
     
-    response = llm_client.chat.completions.create(
-        model=os.environ['LLM_MODEL_ID'],
-        messages=[{"role": "system", "content": prompt}],
-        temperature=0.7
-    )
+    async def build() -> List[dict]:
+        return [frame async for frame in opening_frames(state, next_section, session_id, Priority.BACKGROUND)]
     
-    facilitator_response = response.choices[0].message.content
+    section_prefetcher.schedule(session_id, next_section, content_repository.version, build)
+
+async def run_graph(messages: List[Dict[str, Any]], workshop_context: Dict[str, Any]) -> AsyncIterator[dict]:
+    """Run the node graph and turn its outputs into widget and task frames."""
+    async for output in graph_runner.run("CustomerResponse", messages, workshop_context=workshop_context):
+        if output.node == "Widget" and output.output:
+            yield widget_frame(output.output)
+        elif output.node == "TaskDescription":
+            yield task_frame(output.output, output.metadata)
+
+async def single_turn_agent(
+    messages: List[dict],
+    session: Dict[str, Any] = None,
+    priority: Priority = Priority.LIVE,
+    opening: bool = False
+) -> AsyncIterator[dict]:
+    """Process a single turn of the workshop conversation.
+
+    The LLM reply and the node graph run concurrently, and frames are yielded
+    as soon as either produces them: ``widget`` and ``task`` frames from the
+    graph, ``text_delta`` frames for each token chunk and ``sentence`` frames
+    whenever a sentence boundary is reached. One ``final`` frame carrying the
+    formatted message and widget ends the turn.
+
+    Requests for the task, the time left or the visual aid are answered
+    from the pre-rendered content bundle without an LLM call. With
+    ``opening`` the turn introduces the session's current section instead
+    of answering the last message, served from the prefetched opening turn
+    when there is one.
+    """
+    session_id = session_key(session)
+    with tracer.span("single_turn_agent", session_id=session_id, opening=opening, priority=priority.name) as span:
+        user_message = messages[-1]["content"] if messages else ""
+        state = await session_store.load(session_id)
+        section_name = state.current_section_name
+        span.set_attribute("section", section_name)
+        current_section = get_section_content(section_name)
+        content_version = content_repository.version
     
-    # Check if we need to show any visual aids
-    widget_output = None
-    if current_section.get('has_visual_aid', False):
-        widget_output = create_widget_for_section(current_section)
+        cached_text = None
+        cache_context = ""
+        scripted = None
+        if not opening and messages:
+            # Task, time and widget requests are answered from the pre-rendered bundle
+            scripted = bundle_server.match(
+                content_repository.snapshot,
+                section_name,
+                user_message,
+                timer_scheduler.time_remaining(session_id)
+            )
     
-    # Format the response
-    message = {
-        "role": "assistant",
-        "content": format_facilitator_message(facilitator_response)
-    }
+        if scripted is not None:
+            span.set_attribute("path", "scripted")
+            frames = scripted_frames(scripted)
+        elif opening:
+            prefetched = await section_prefetcher.take(session_id, section_name, content_version)
+            if prefetched is not None:
+                span.set_attribute("path", "prefetched")
+                frames = replay_frames(prefetched)
+            else:
+                span.set_attribute("path", "opening")
+                frames = opening_frames(state, section_name, session_id, priority)
+        else:
+            # Near-identical questions in a section are answered from the cache
+            cache_context = conversation_context(user_message, messages)
+            cached_text = await response_cache.lookup(section_name, content_version, user_message, cache_context) if messages else None
+            if cached_text is not None:
+                span.set_attribute("path", "cached")
+                text_frames = replay_text(cached_text)
+            else:
+                span.set_attribute("path", "llm")
+                with tracer.span("prompt.build", section=section_name):
+                    prompt_messages = prompt_cache.build_messages(
+                        section_name,
+                        current_section,
+                        content_version,
+                        user_message,
+                        history=history_manager.build_history(session_id, state, messages) if messages else None
+                    )
+                text_frames = generate_text(prompt_messages, priority)
+            workshop_context = build_workshop_context(state, current_section, session_id)
+            frames = merge_streams(text_frames, run_graph(messages, workshop_context))
     
-    out = {
-        "messages": [message],
-        "node": "CustomerResponse",
-        "output": message['content'],
-        "widget": widget_output
-    }
+        chunks = []
+        widget_output = None
+        async for frame in frames:
+            if frame["type"] == "text_delta":
+                chunks.append(frame["content"])
+            elif frame["type"] == "widget":
+                widget_output = frame["widget"]
+            yield frame
     
-    return out
-
-def create_widget_for_section(section: dict) -> dict:
-    """Create appropriate widget based on section content."""
-    widget_type = section.get('widget_type')
-    if not widget_type:
-        return None
-        
-    if widget_type == 'checklist':
-        return create_checklist_widget(section)
-    elif widget_type == 'flowchart':
-        return create_flowchart_widget(section)
-    elif widget_type == 'data_table':
-        return create_data_table_widget(section)
+        facilitator_response = "".join(chunks)
+        if not opening and scripted is None and cached_text is None and messages:
+            # Off the response path; the final frame shouldn't wait on Redis
+            store = asyncio.ensure_future(response_cache.store(section_name, content_version, user_message, facilitator_response, cache_context))
+            _cache_writes.add(store)
+            store.add_done_callback(_cache_write_done)
+        if not opening:
+            maybe_prefetch(session_id, state)
     
-    return None
-
-def create_checklist_widget(section: dict) -> dict:
-    """Create a checklist widget for sections that need it."""
-    return {
-        'type': 'checklist',
-        'details': json.dumps({
-            'items': section.get('checklist_items', []),
-            'title': section.get('title', 'Checklist'),
-            'instructions': section.get('instructions', '')
-        })
-    }
-
-def create_flowchart_widget(section: dict) -> dict:
-    """Create a flowchart widget for service user journey mapping."""
-    return {
-        'type': 'flowchart',
-        'details': json.dumps({
-            'nodes': section.get('flowchart_nodes', []),
-            'edges': section.get('flowchart_edges', []),
-            'title': section.get('title', 'Service User Journey')
-        })
-    }
+        # Format the response
+        message = {
+            "role": "assistant",
+            "content": format_facilitator_message(facilitator_response)
+        }
+    
+        out = {
+            "messages": [message],
+            "node": "CustomerResponse",
+            "output": message['content'],
+            "widget": widget_output
+        }
+    
+        yield final_frame(out)
 
-def create_data_table_widget(section: dict) -> dict:
-    """Create a data table widget for population data and statistics."""
-    return {
-        'type': 'data_table',
-        'details': json.dumps({
-            'headers': section.get('table_headers', []),
-            'rows': section.get('table_data', []),
-            'title': section.get('title', 'Population Data')
-        })
-    }
\ No newline at end of file
+breakout_manager = BreakoutManager(
+    partial(single_turn_agent, priority=Priority.BREAKOUT),
+    session_store,
+    summarize_turns
+)
@@ -1,4 +1,5 @@
 from .base import Node
 from .nodes import CustomerResponse, Widget, TaskDescription
+from .runner import GraphRunner
 
-__all__ = ['Node', 'CustomerResponse', 'Widget', 'TaskDescription']
\ No newline at end of file
+__all__ = ['Node', 'CustomerResponse', 'Widget', 'TaskDescription', 'GraphRunner']
\ No newline at end of file
@@ -1,11 +1,13 @@
 from abc import ABC, abstractmethod
 from typing import Dict, List, Any
 
+from agent.models import NodeOutput, Successor
+
 class Node(ABC):
     """Base class for all graph nodes in the workshop facilitator."""
 
     @abstractmethod
-    async def process(self, messages: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+    async def process(self, messages: List[Dict[str, Any]], **kwargs) -> NodeOutput:
         """Process input messages and generate output.
         
         Args:
@@ -13,19 +15,19 @@ class Node(ABC):
             **kwargs: Additional keyword arguments for processing
             
         Returns:
-            Dict containing processed output with messages and metadata
+            The node's output and metadata
         """
         pass
 
     @abstractmethod
-    async def get_successors(self, output: Dict[str, Any], **kwargs) -> List[Dict[str, Any]]:
+    async def get_successors(self, output: NodeOutput, **kwargs) -> List[Successor]:
         """Determine next nodes to process based on output.
         
         Args:
-            output: Output dictionary from process method
+            output: Output from the process method
             **kwargs: Additional keyword arguments
             
         Returns:
-            List of dictionaries containing next nodes and their inputs
+            The next nodes and their inputs
         """
         pass
\ No newline at end of file
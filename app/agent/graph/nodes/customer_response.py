@@ -1,17 +1,14 @@
 from typing import Dict, List, Any
 from xrx_agent_framework import Node
+from agent.models import NodeOutput, Successor
 
 class CustomerResponse(Node):
     """Node for generating workshop facilitator responses."""
     
-    async def process(self, messages: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+    async def process(self, messages: List[Dict[str, Any]], **kwargs) -> NodeOutput:
         """Process messages and generate a facilitator response."""
         if not messages:
-            return {
-                "messages": [],
-                "output": "No input provided",
-                "node": "CustomerResponse"
-            }
+            return NodeOutput("CustomerResponse", "No input provided")
             
         last_message = messages[-1]["content"] if messages else ""
         
@@ -36,37 +33,28 @@ class CustomerResponse(Node):
         if is_section_complete:
             output_message += "\nLet's move on to the next section."
         
-        output = {
-            "messages": messages,
-            "output": output_message,
-            "node": "CustomerResponse",
-            "workshop_section": current_section,
-            "metadata": {
+        return NodeOutput(
+            "CustomerResponse",
+            output_message,
+            section=current_section,
+            metadata={
                 "time_remaining": time_remaining,
                 "section_status": workshop_context.get("section_status", "in_progress"),
                 "requires_visual_aid": workshop_context.get("requires_visual_aid", False),
                 "interactive_mode": workshop_context.get("interactive_mode", False)
             }
-        }
-        
-        return output
+        )
         
-    async def get_successors(self, output: Dict[str, Any], **kwargs) -> List[Dict[str, Any]]:
+    async def get_successors(self, output: NodeOutput, **kwargs) -> List[Successor]:
         """Determine next nodes to process."""
         successors = []
         
         # Check if we need visual aids
-        if output.get("metadata", {}).get("requires_visual_aid"):
-            successors.append({
-                "node": "Widget",
-                "input": output
-            })
+        if output.metadata.get("requires_visual_aid"):
+            successors.append(Successor("Widget", output))
         
         # Check if we need task description
-        if output.get("metadata", {}).get("interactive_mode"):
-            successors.append({
-                "node": "TaskDescription",
-                "input": output
-            })
+        if output.metadata.get("interactive_mode"):
+            successors.append(Successor("TaskDescription", output))
         
         return successors
\ No newline at end of file
@@ -1,44 +1,44 @@
-# Previously created task_description# app/agent/graph/nodes/task_description.py
-from typing import Dict, List, Any
+# app/agent/graph/nodes/task_description.py
+from typing import Dict, List, Any, Tuple
 from xrx_agent_framework import Node
+from agent.models import NodeOutput, Successor
+
+DEFAULT_TASK_DURATION = 180  # 3 minutes
+GROUP_WORK_TASKS = ["discussion", "role_play", "breakout"]
+MATERIAL_TASKS = ["checklist", "assessment", "planning"]
 
 class TaskDescription(Node):
     """Node for generating workshop task descriptions and instructions."""
     
-    async def process(self, messages: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+    async def process(self, messages: List[Dict[str, Any]], **kwargs) -> NodeOutput:
         """Generate appropriate task descriptions based on workshop context."""
         if not messages:
-            return {
-                "messages": [],
-                "output": "No task specified",
-                "node": "TaskDescription"
-            }
+            return NodeOutput("TaskDescription", "No task specified")
         
         workshop_context = kwargs.get("workshop_context", {})
         current_section = workshop_context.get("current_section", "")
         task_type = workshop_context.get("task_type", "")
-        duration = workshop_context.get("duration", 180)  # Default 3 minutes
+        duration = workshop_context.get("duration", DEFAULT_TASK_DURATION)
         
-        # Generate task description and instructions
-        task_description = self.get_task_description(current_section, task_type)
-        time_info = f"We'll spend {duration // 60} minutes on this task." if duration >= 60 else ""
+        output_text, metadata = self.describe_task(current_section, task_type, duration)
         
-        output_text = f"{task_description} {time_info}"
-        
-        output = {
-            "messages": messages,
-            "output": output_text,
-            "node": "TaskDescription",
-            "section": current_section,
-            "metadata": {
-                "task_type": task_type,
-                "duration": duration,
-                "requires_group_work": task_type in ["discussion", "role_play", "breakout"],
-                "requires_materials": task_type in ["checklist", "assessment", "planning"]
-            }
+        return NodeOutput("TaskDescription", output_text, section=current_section, metadata=metadata)
+    
+    def describe_task(self, section: str, task_type: str, duration: int = DEFAULT_TASK_DURATION) -> Tuple[str, Dict[str, Any]]:
+        """Task description with timing, and the task's metadata.
+
+        Shared with the content bundle, whose scripted task answers must
+        match what this node says.
+        """
+        time_info = f"We'll spend {duration // 60} minutes on this task." if duration >= 60 else ""
+        content = f"{self.get_task_description(section, task_type)} {time_info}".strip()
+        metadata = {
+            "task_type": task_type,
+            "duration": duration,
+            "requires_group_work": task_type in GROUP_WORK_TASKS,
+            "requires_materials": task_type in MATERIAL_TASKS
         }
-        
-        return output
+        return content, metadata
     
     def get_task_description(self, section: str, task_type: str) -> str:
         """Get specific task description based on workshop section and type."""
@@ -74,18 +74,12 @@ class TaskDescription(Node):
         
         return section_tasks.get(task_type, default_description)
     
-    async def get_successors(self, output: Dict[str, Any], **kwargs) -> List[Dict[str, Any]]:
+    async def get_successors(self, output: NodeOutput, **kwargs) -> List[Successor]:
         """Determine next nodes to process."""
-        successors = [{
-            "node": "CustomerResponse",
-            "input": output
-        }]
+        successors = [Successor("CustomerResponse", output)]
         
         # If task requires materials, add Widget node
-        if output.get("metadata", {}).get("requires_materials"):
-            successors.append({
-                "node": "Widget",
-                "input": output
-            })
+        if output.metadata.get("requires_materials"):
+            successors.append(Successor("Widget", output))
         
-        return successors.py content
+        return successors
@@ -1,50 +1,75 @@
 # app/agent/graph/nodes/widget.py
 from typing import Dict, List, Any
-import json
 from xrx_agent_framework import Node
+from agent.models import NodeOutput, Successor, WidgetSpec
+from agent.content.widgets import CachedWidget, widget_cache, section_widget, STATIC_WIDGET_VERSION
+
+# Sections whose widgets come entirely from the tables below
+STATIC_WIDGET_SECTIONS = {
+    ("checklist", "cultural_competency"),
+    ("flowchart", "service_user_journey"),
+    ("data_table", "population_data"),
+    ("chart", "health_inequalities")
+}
 
 class Widget(Node):
     """Node for managing workshop visual aids and interactive elements."""
     
-    async def process(self, messages: List[Dict[str, Any]], **kwargs) -> Dict[str, Any]:
+    WIDGET_BUILDERS = {
+        "checklist": "create_checklist_widget",
+        "flowchart": "create_flowchart_widget",
+        "data_table": "create_data_table_widget",
+        "chart": "create_chart_widget"
+    }
+    
+    async def process(self, messages: List[Dict[str, Any]], **kwargs) -> NodeOutput:
         """Process widget requests and generate appropriate visual aids."""
         if not messages:
-            return {
-                "messages": [],
-                "output": {},
-                "node": "Widget"
-            }
+            return NodeOutput("Widget", {})
         
         workshop_context = kwargs.get("workshop_context", {})
         current_section = workshop_context.get("current_section", "")
         widget_type = workshop_context.get("widget_type", "")
         
-        # Generate appropriate widget based on section and type
-        widget_output = self.generate_widget_output(widget_type, current_section, workshop_context)
+        # Widgets defined in the workshop content take precedence over the
+        # built-in tables, so facilitators' edits show up
+        widget_output = {}
+        section_info = workshop_context.get("section_info")
+        if section_info is not None and section_info.has_visual_aid:
+            widget = section_widget(section_info, workshop_context.get("content_version"))
+            if widget is not None:
+                widget_output = widget.payload
         
-        output = {
-            "messages": messages,
-            "output": widget_output,
-            "node": "Widget",
-            "widget_type": widget_type
-        }
+        # Otherwise generate appropriate widget based on section and type
+        if not widget_output:
+            widget_output = self.generate_widget_output(widget_type, current_section, workshop_context)
         
-        return output
+        return NodeOutput("Widget", widget_output, widget_type=widget_type)
     
     def generate_widget_output(self, widget_type: str, section: str, context: Dict) -> Dict[str, Any]:
-        """Generate specific widget content based on type and section."""
-        if widget_type == "checklist":
-            return self.create_checklist_widget(section, context)
-        elif widget_type == "flowchart":
-            return self.create_flowchart_widget(section, context)
-        elif widget_type == "data_table":
-            return self.create_data_table_widget(section, context)
-        elif widget_type == "chart":
-            return self.create_chart_widget(section, context)
-        return {}
+        """Generate specific widget content based on type and section.
+        
+        Widgets built only from the static tables, or from content carrying a
+        ``content_version``, are serialized once and served from the cache.
+        """
+        builder_name = self.WIDGET_BUILDERS.get(widget_type)
+        if builder_name is None:
+            return {}
+        builder = getattr(self, builder_name)
+        
+        content_version = context.get("content_version")
+        if content_version is None and (widget_type, section) not in STATIC_WIDGET_SECTIONS:
+            return CachedWidget(builder(section, context), None).payload
+        
+        widget = widget_cache.get(
+            ("node", widget_type, section),
+            f"{STATIC_WIDGET_VERSION}:{content_version}",
+            lambda: builder(section, context)
+        )
+        return widget.payload
     
-    def create_checklist_widget(self, section: str, context: Dict) -> Dict[str, Any]:
-        """Create checklist widget content."""
+    def create_checklist_widget(self, section: str, context: Dict) -> WidgetSpec:
+        """Create checklist widget spec."""
         items = context.get("checklist_items", [])
         if section == "cultural_competency":
             items = [
@@ -55,17 +80,14 @@ class Widget(Node):
                 "Cultural communication skills"
             ]
         
-        return {
-            "type": "checklist",
-            "details": json.dumps({
-                "title": f"Checklist for {section}",
-                "items": items,
-                "instructions": "Please check items as they are discussed"
-            })
-        }
+        return WidgetSpec("checklist", {
+            "title": f"Checklist for {section}",
+            "items": items,
+            "instructions": "Please check items as they are discussed"
+        })
     
-    def create_flowchart_widget(self, section: str, context: Dict) -> Dict[str, Any]:
-        """Create flowchart widget content."""
+    def create_flowchart_widget(self, section: str, context: Dict) -> WidgetSpec:
+        """Create flowchart widget spec."""
         nodes = context.get("flowchart_nodes", [])
         edges = context.get("flowchart_edges", [])
         
@@ -85,68 +107,50 @@ class Widget(Node):
                 {"from": "5", "to": "3"}
             ]
         
-        return {
-            "type": "flowchart",
-            "details": json.dumps({
-                "title": f"Process Flow for {section}",
-                "nodes": nodes,
-                "edges": edges
-            })
-        }
+        return WidgetSpec("flowchart", {
+            "title": f"Process Flow for {section}",
+            "nodes": nodes,
+            "edges": edges
+        })
     
-    def create_data_table_widget(self, section: str, context: Dict) -> Dict[str, Any]:
-        """Create data table widget content."""
+    def create_data_table_widget(self, section: str, context: Dict) -> WidgetSpec:
+        """Create data table widget spec."""
         if section == "population_data":
-            return {
-                "type": "data_table",
-                "details": json.dumps({
-                    "title": "Service User Demographics",
-                    "headers": ["Ethnic Group", "Medium Secure", "Low Secure", "Local Borough"],
-                    "rows": [
-                        ["White British", "45%", "48%", "55%"],
-                        ["Black Caribbean", "15%", "14%", "8%"],
-                        ["Black African", "12%", "11%", "6%"],
-                        ["Asian", "10%", "9%", "15%"],
-                        ["Other", "18%", "18%", "16%"]
-                    ]
-                })
-            }
-        return {
-            "type": "data_table",
-            "details": json.dumps({
-                "title": f"Data for {section}",
-                "headers": context.get("headers", []),
-                "rows": context.get("rows", [])
+            return WidgetSpec("data_table", {
+                "title": "Service User Demographics",
+                "headers": ["Ethnic Group", "Medium Secure", "Low Secure", "Local Borough"],
+                "rows": [
+                    ["White British", "45%", "48%", "55%"],
+                    ["Black Caribbean", "15%", "14%", "8%"],
+                    ["Black African", "12%", "11%", "6%"],
+                    ["Asian", "10%", "9%", "15%"],
+                    ["Other", "18%", "18%", "16%"]
+                ]
             })
-        }
+        return WidgetSpec("data_table", {
+            "title": f"Data for {section}",
+            "headers": context.get("headers", []),
+            "rows": context.get("rows", [])
+        })
     
-    def create_chart_widget(self, section: str, context: Dict) -> Dict[str, Any]:
-        """Create chart widget content."""
+    def create_chart_widget(self, section: str, context: Dict) -> WidgetSpec:
+        """Create chart widget spec."""
         if section == "health_inequalities":
-            return {
-                "type": "chart",
-                "details": json.dumps({
-                    "title": "Health Outcomes by Group",
-                    "chartData": [
-                        {"name": "Group A", "value": 85},
-                        {"name": "Group B", "value": 72},
-                        {"name": "Group C", "value": 68},
-                        {"name": "Group D", "value": 90}
-                    ]
-                })
-            }
-        return {
-            "type": "chart",
-            "details": json.dumps({
-                "title": f"Chart for {section}",
-                "chartData": context.get("chart_data", [])
+            return WidgetSpec("chart", {
+                "title": "Health Outcomes by Group",
+                "chartData": [
+                    {"name": "Group A", "value": 85},
+                    {"name": "Group B", "value": 72},
+                    {"name": "Group C", "value": 68},
+                    {"name": "Group D", "value": 90}
+                ]
             })
-        }
+        return WidgetSpec("chart", {
+            "title": f"Chart for {section}",
+            "chartData": context.get("chart_data", [])
+        })
     
-    async def get_successors(self, output: Dict[str, Any], **kwargs) -> List[Dict[str, Any]]:
+    async def get_successors(self, output: NodeOutput, **kwargs) -> List[Successor]:
         """Determine next nodes to process."""
         # After showing a widget, usually return to customer response
-        return [{
-            "node": "CustomerResponse",
-            "input": output
-        }]
+        return [Successor("CustomerResponse", output)]
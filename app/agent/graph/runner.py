@@ -0,0 +1,94 @@
+import asyncio
+import logging
+import os
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+from agent.models import NodeOutput, Successor
+from agent.observability.metrics import ERRORS
+from agent.observability.tracing import tracer
+
+from .base import Node
+
+logger = logging.getLogger(__name__)
+
+MAX_GRAPH_DEPTH = int(os.environ.get("MAX_GRAPH_DEPTH", "4"))
+
+class GraphRunner:
+    """Executes the node graph for one turn.
+
+    Starting from one node, each node's successors are launched as soon as it
+    finishes, so independent branches (e.g. Widget and TaskDescription after
+    CustomerResponse) run concurrently. Outputs are yielded in completion
+    order rather than graph order. Each node runs at most once per turn,
+    which breaks cycles such as Widget -> CustomerResponse, and branches stop
+    at max_depth.
+    """
+
+    def __init__(self, nodes: Dict[str, Node], max_depth: int = MAX_GRAPH_DEPTH):
+        self.nodes = nodes
+        self.max_depth = max_depth
+
+    async def run(self, start: str, messages: List[Dict[str, Any]], **kwargs) -> AsyncIterator[NodeOutput]:
+        """Run the graph from start, yielding each node's output when ready.
+
+        Args:
+            start: Name of the first node
+            messages: Conversation messages passed to every node
+            **kwargs: Passed to every node's process and get_successors
+
+        Yields:
+            Node outputs in completion order
+        """
+        visited = {start}
+        pending: Set[asyncio.Task] = set()
+
+        def launch(name: str, depth: int, upstream: Optional[NodeOutput]) -> None:
+            pending.add(asyncio.ensure_future(self._run_node(name, depth, upstream, messages, kwargs)))
+
+        launch(start, 0, None)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result = task.result()
+                    if result is None:
+                        continue
+                    name, depth, output, successors = result
+                    yield output
+
+                    for successor in successors:
+                        successor_name = successor.node
+                        if successor_name in visited:
+                            logger.debug(f"Skipping {name} -> {successor_name}: already ran this turn")
+                            continue
+                        if successor_name not in self.nodes:
+                            logger.warning(f"Unknown graph node {successor_name} after {name}")
+                            continue
+                        if depth + 1 > self.max_depth:
+                            logger.warning(f"Graph depth limit {self.max_depth} reached at {name} -> {successor_name}")
+                            continue
+                        visited.add(successor_name)
+                        launch(successor_name, depth + 1, successor.input)
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _run_node(
+        self,
+        name: str,
+        depth: int,
+        upstream: Optional[NodeOutput],
+        messages: List[Dict[str, Any]],
+        kwargs: Dict[str, Any]
+    ) -> Optional[Tuple[str, int, NodeOutput, List[Successor]]]:
+        node = self.nodes[name]
+        try:
+            with tracer.span(f"node.{name}", depth=depth):
+                output = await node.process(messages, upstream=upstream, **kwargs)
+                successors = await node.get_successors(output, **kwargs)
+        except Exception as e:
+            # One failing branch shouldn't take down the rest of the turn
+            logger.error(f"Error in graph node {name}: {str(e)}")
+            ERRORS.inc(source="node", type=type(e).__name__)
+            return None
+        return name, depth, output, successors
@@ -0,0 +1,56 @@
+from typing import Any, Dict, Optional
+
+# Messages stay the plain {"role", "content"} dicts they arrive as from the
+# client and go out as to the LLM; they are passed around by reference.
+Message = Dict[str, Any]
+
+class WidgetSpec:
+    """A widget's type and the details its renderer needs."""
+
+    __slots__ = ("type", "details")
+
+    def __init__(self, type: str, details: Dict[str, Any]):
+        self.type = type
+        self.details = details
+
+    def __repr__(self) -> str:
+        return f"WidgetSpec({self.type!r})"
+
+class NodeOutput:
+    """What a graph node produced for one turn.
+
+    Outputs don't carry the conversation: every node is given the same
+    messages, so successors read them from their own arguments rather
+    than from a copy embedded at each hop.
+    """
+
+    __slots__ = ("node", "output", "section", "metadata", "widget_type")
+
+    def __init__(
+        self,
+        node: str,
+        output: Any,
+        section: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        widget_type: Optional[str] = None
+    ):
+        self.node = node
+        self.output = output
+        self.section = section
+        self.metadata = metadata if metadata is not None else {}
+        self.widget_type = widget_type
+
+    def __repr__(self) -> str:
+        return f"NodeOutput({self.node!r})"
+
+class Successor:
+    """A node to run next, with the output that led to it."""
+
+    __slots__ = ("node", "input")
+
+    def __init__(self, node: str, input: Optional[NodeOutput] = None):
+        self.node = node
+        self.input = input
+
+    def __repr__(self) -> str:
+        return f"Successor({self.node!r})"
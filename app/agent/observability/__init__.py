@@ -0,0 +1,3 @@
+from .tracing import Span, Trace, Tracer, tracer
+
+__all__ = ['Span', 'Trace', 'Tracer', 'tracer']
@@ -0,0 +1,306 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Each uvicorn worker writes its snapshot here so /metrics on any worker
+# can report the sum over all of them. Empty disables sharing.
+METRICS_DIR = os.environ.get(
+    "METRICS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "metrics")
+)
+METRICS_PUBLISH_INTERVAL = float(os.environ.get("METRICS_PUBLISH_INTERVAL", "5"))
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelValues = Tuple[str, ...]
+# A callback returns one value, or values keyed by label values
+Callback = Callable[[], Union[float, Dict[LabelValues, float]]]
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra is not None:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+class Metric:
+    """Base for the metric types: a name, help text and label names.
+
+    Values live in a dict keyed by label values and are only touched from
+    the event loop, so updates need no locking. A metric built with a
+    callback has no stored values; the callback is read at collect time,
+    which suits numbers other components already keep.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), callback: Optional[Callback] = None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.callback = callback
+        self.values: Dict[LabelValues, Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def samples(self) -> List[List[Any]]:
+        """Current values as [label values, value] pairs."""
+        if self.callback is None:
+            return [[list(key), value] for key, value in self.values.items()]
+        try:
+            value = self.callback()
+        except Exception as e:
+            logger.warning(f"Failed to collect metric {self.name}: {str(e)}")
+            return []
+        if isinstance(value, dict):
+            return [[list(key), float(item)] for key, item in value.items()]
+        return [[[], float(value)]]
+
+    def describe(self) -> Dict[str, Any]:
+        return {"type": self.kind, "help": self.documentation, "labelnames": list(self.labelnames), "samples": self.samples()}
+
+class Counter(Metric):
+    """A monotonically increasing count."""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+class Gauge(Metric):
+    """A value that goes up and down; summed over live workers."""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels) -> None:
+        self.values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = self._key(labels)
+        self.values[key] = self.values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels) -> None:
+        self.inc(-amount, **labels)
+
+class Histogram(Metric):
+    """Observations counted into fixed buckets, plus their sum and count."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        entry = self.values.get(key)
+        if entry is None:
+            # Per-bucket (not cumulative) counts, the last one for +Inf
+            entry = self.values[key] = {"buckets": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+        entry["buckets"][bisect_left(self.buckets, value)] += 1
+        entry["sum"] += value
+        entry["count"] += 1
+
+    def describe(self) -> Dict[str, Any]:
+        described = super().describe()
+        described["buckets"] = list(self.buckets)
+        return described
+
+class MetricsRegistry:
+    """This worker's metrics, and the merged view over every worker.
+
+    Workers of one server share METRICS_DIR: each writes its snapshot to
+    <pid>.json every publish_interval, and render() merges the files of
+    workers with the same parent process. Counters and histograms of a
+    worker that has died are kept so totals don't go backwards; gauges
+    only count live workers. Snapshots left by earlier server runs are
+    removed.
+
+    Metric callbacks read event loop state, so snapshots are taken on the
+    loop; the file reads and writes behind them run in a worker thread via
+    publish_async() and render_async().
+    """
+
+    def __init__(self, directory: str = METRICS_DIR, publish_interval: float = METRICS_PUBLISH_INTERVAL):
+        self.directory = directory
+        self.publish_interval = publish_interval
+        self.metrics: Dict[str, Metric] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, metric: Metric) -> Metric:
+        existing = self.metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = (), callback: Optional[Callback] = None) -> Counter:
+        return self.register(Counter(name, documentation, labelnames, callback))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), callback: Optional[Callback] = None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, callback))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """This worker's metrics in a JSON-serializable form."""
+        return {
+            "pid": os.getpid(),
+            "ppid": os.getppid(),
+            "updated_at": time.time(),
+            "metrics": {name: metric.describe() for name, metric in self.metrics.items()}
+        }
+
+    def publish(self, snapshot: Optional[Dict[str, Any]] = None) -> None:
+        """Write this worker's snapshot for the other workers to read."""
+        if not self.directory:
+            return
+        if snapshot is None:
+            snapshot = self.snapshot()
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"{os.getpid()}.json")
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(snapshot, f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    async def publish_async(self) -> None:
+        """Publish this worker's snapshot without blocking the event loop."""
+        if self.directory:
+            await asyncio.to_thread(self.publish, self.snapshot())
+
+    def worker_snapshots(self, own: Optional[Dict[str, Any]] = None) -> List[Tuple[Dict[str, Any], bool]]:
+        """Snapshots of every worker of this server, with whether each is alive."""
+        if own is None:
+            own = self.snapshot()
+        snapshots = [(own, True)]
+        if not self.directory or not os.path.isdir(self.directory):
+            return snapshots
+        for name in os.listdir(self.directory):
+            if not name.endswith(".json") or name == f"{own['pid']}.json":
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                with open(path) as f:
+                    snapshot = json.load(f)
+            except (OSError, ValueError):
+                continue
+            alive = _pid_alive(snapshot.get("pid", 0))
+            if snapshot.get("ppid") != own["ppid"]:
+                if not alive:
+                    # Left over from an earlier run of the server
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                continue
+            snapshots.append((snapshot, alive))
+        return snapshots
+
+    def render(self, own: Optional[Dict[str, Any]] = None) -> str:
+        """The merged metrics in the Prometheus text exposition format."""
+        merged: Dict[str, Dict[str, Any]] = {}
+        for snapshot, alive in self.worker_snapshots(own):
+            for name, metric in snapshot["metrics"].items():
+                if metric["type"] == "gauge" and not alive:
+                    continue
+                target = merged.setdefault(name, {**metric, "samples": {}})
+                for labels, value in metric["samples"]:
+                    key = tuple(labels)
+                    if metric["type"] == "histogram":
+                        entry = target["samples"].setdefault(key, {"buckets": [0] * len(value["buckets"]), "sum": 0.0, "count": 0})
+                        entry["buckets"] = [a + b for a, b in zip(entry["buckets"], value["buckets"])]
+                        entry["sum"] += value["sum"]
+                        entry["count"] += value["count"]
+                    else:
+                        target["samples"][key] = target["samples"].get(key, 0.0) + value
+
+        lines = []
+        for name, metric in merged.items():
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            labelnames = metric["labelnames"]
+            for labels, value in metric["samples"].items():
+                if metric["type"] != "histogram":
+                    lines.append(f"{name}{_labels(labelnames, labels)} {_format_value(value)}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(list(metric["buckets"]) + [float("inf")], value["buckets"]):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_labels(labelnames, labels, ('le', _format_value(bound)))} {cumulative}")
+                lines.append(f"{name}_sum{_labels(labelnames, labels)} {_format_value(value['sum'])}")
+                lines.append(f"{name}_count{_labels(labelnames, labels)} {value['count']}")
+        return "\n".join(lines) + "\n"
+
+    async def render_async(self) -> str:
+        """render(), reading the other workers' snapshots off the event loop."""
+        return await asyncio.to_thread(self.render, self.snapshot())
+
+    def start(self) -> None:
+        """Start publishing this worker's snapshot in the background."""
+        if self.directory and self._task is None:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        """Stop publishing, writing one last snapshot."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await self.publish_async()
+        except OSError as e:
+            logger.warning(f"Failed to publish metrics: {str(e)}")
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.publish_async()
+            except OSError as e:
+                logger.warning(f"Failed to publish metrics: {str(e)}")
+            await asyncio.sleep(self.publish_interval)
+
+# Shared by every module in the process
+metrics = MetricsRegistry()
+
+TURN_SECONDS = metrics.histogram(
+    "workshop_turn_seconds", "Time from request to the end of a turn's stream", ["kind"]
+)
+LLM_TIME_TO_FIRST_TOKEN_SECONDS = metrics.histogram(
+    "workshop_llm_time_to_first_token_seconds", "Time from sending an LLM call to its first token", ["priority"]
+)
+LLM_QUEUE_WAIT_SECONDS = metrics.histogram(
+    "workshop_llm_queue_wait_seconds", "Time an LLM call waited for a scheduler slot", ["priority"]
+)
+CANCELLATIONS = metrics.counter("workshop_cancellations_total", "Turns stopped by a cancellation")
+ERRORS = metrics.counter("workshop_errors_total", "Errors by where they were caught and their type", ["source", "type"])
@@ -0,0 +1,368 @@
+import asyncio
+import functools
+import json
+import logging
+import os
+import random
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Fraction of turns traced; the decision is made once, at the root span
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", "1.0"))
+# Finished traces kept in memory for /traces
+TRACE_BUFFER_SIZE = int(os.environ.get("TRACE_BUFFER_SIZE", "256"))
+TRACE_MAX_SPANS = int(os.environ.get("TRACE_MAX_SPANS", "512"))
+# When set, finished traces are appended here as OTLP/JSON lines
+TRACE_EXPORT_PATH = os.environ.get("TRACE_EXPORT_PATH", "")
+TRACE_FLUSH_INTERVAL = float(os.environ.get("TRACE_FLUSH_INTERVAL", "1.0"))
+SERVICE_NAME = os.environ.get("OTEL_SERVICE_NAME", "workshop-facilitator")
+
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+def _otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+class Span:
+    """One timed operation within a trace."""
+
+    def __init__(self, trace: "Trace", name: str, parent_id: Optional[str], attributes: Dict[str, Any]):
+        self.trace = trace
+        self.name = name
+        self.span_id = "%016x" % random.getrandbits(64)
+        self.parent_id = parent_id
+        self.attributes = attributes
+        self.events: List[Dict[str, Any]] = []
+        self.status = STATUS_OK
+        self.status_message = ""
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes) -> None:
+        """Mark a point in time within the span, e.g. the first token."""
+        self.events.append({"name": name, "time_ns": time.time_ns(), "attributes": attributes})
+
+    def record_exception(self, error: BaseException) -> None:
+        if isinstance(error, asyncio.CancelledError):
+            self.attributes["cancelled"] = True
+            return
+        self.status = STATUS_ERROR
+        self.status_message = f"{type(error).__name__}: {error}"
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+            self.trace.add(self)
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or self.start_ns),
+            "attributes": _otlp_attributes(self.attributes),
+            "events": [
+                {"timeUnixNano": str(event["time_ns"]), "name": event["name"], "attributes": _otlp_attributes(event["attributes"])}
+                for event in self.events
+            ],
+            "status": {"code": self.status, "message": self.status_message} if self.status == STATUS_ERROR else {"code": self.status}
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+class _NoopSpan:
+    """Stands in for a span when the trace isn't sampled."""
+
+    name = ""
+    span_id = ""
+    duration_ms = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def add_event(self, name: str, **attributes) -> None:
+        pass
+
+    def record_exception(self, error: BaseException) -> None:
+        pass
+
+    def end(self) -> None:
+        pass
+
+NOOP_SPAN = _NoopSpan()
+
+class Trace:
+    """The spans of one turn, finished when its root span ends."""
+
+    def __init__(self, tracer: "Tracer", trace_id: str, max_spans: int):
+        self.tracer = tracer
+        self.trace_id = trace_id
+        self.max_spans = max_spans
+        self.spans: List[Span] = []
+        self.root: Optional[Span] = None
+        self.finished = False
+        self.dropped = 0
+
+    def add(self, span: Span) -> None:
+        # Spans ending after the root (e.g. background work the turn started)
+        # arrive too late to be exported with it
+        if self.finished or (span is not self.root and len(self.spans) >= self.max_spans):
+            self.dropped += 1
+            return
+        self.spans.append(span)
+        if span is self.root:
+            self.finished = True
+            self.tracer._finish(self)
+
+    def summary(self) -> Dict[str, Any]:
+        root = self.root
+        return {
+            "trace_id": self.trace_id,
+            "name": root.name if root else None,
+            "start_time_unix_nano": root.start_ns if root else None,
+            "duration_ms": root.duration_ms if root else None,
+            "status": "error" if any(span.status == STATUS_ERROR for span in self.spans) else "ok",
+            "spans": len(self.spans),
+            "dropped_spans": self.dropped,
+            "attributes": dict(root.attributes) if root else {}
+        }
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """The trace as an OTLP/JSON ExportTraceServiceRequest."""
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": SERVICE_NAME})},
+                "scopeSpans": [{
+                    "scope": {"name": "agent.observability"},
+                    "spans": [span.to_otlp() for span in self.spans]
+                }]
+            }]
+        }
+
+def normalize_trace_id(trace_id: str) -> str:
+    """Turn a task ID (a UUID) into a 32-hex-digit OTLP trace ID."""
+    return trace_id.replace("-", "").lower()
+
+class Tracer:
+    """In-process span collector for agent turns.
+
+    A turn is traced by opening a root span with trace(); span() and
+    traced() then attach child spans to whatever span is current in the
+    calling context, so spans opened in tasks the turn starts nest under
+    it too. Sampling is decided at the root: an unsampled turn's spans are
+    a no-op costing one context variable lookup.
+
+    Finished traces are kept in a ring buffer of the most recent
+    buffer_size. When export_path is set they are also queued, and a
+    background task started by start() appends them as OTLP/JSON lines
+    every flush_interval seconds, off the event loop; an OpenTelemetry
+    collector's file receiver can ingest the file. At most buffer_size
+    traces wait for export; older ones are dropped and counted.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = TRACE_SAMPLE_RATE,
+        buffer_size: int = TRACE_BUFFER_SIZE,
+        export_path: str = TRACE_EXPORT_PATH,
+        max_spans: int = TRACE_MAX_SPANS,
+        flush_interval: float = TRACE_FLUSH_INTERVAL
+    ):
+        self.sample_rate = sample_rate
+        self.buffer_size = buffer_size
+        self.export_path = export_path
+        self.max_spans = max_spans
+        self.flush_interval = flush_interval
+        self._traces: "OrderedDict[str, Trace]" = OrderedDict()
+        self._pending: Deque[Trace] = deque()
+        self._exporter: Optional[asyncio.Task] = None
+        self.started = 0
+        self.sampled = 0
+        self.exported = 0
+        self.export_errors = 0
+        self.export_dropped = 0
+
+    @contextmanager
+    def trace(self, name: str, trace_id: Optional[str] = None, **attributes) -> Iterator[Any]:
+        """Open the root span of a new trace, sampling it or not."""
+        self.started += 1
+        if self.sample_rate <= 0 or (self.sample_rate < 1 and random.random() >= self.sample_rate):
+            # Children of an unsampled root see no current span and skip themselves
+            token = _current_span.set(None)
+            try:
+                yield NOOP_SPAN
+            finally:
+                self._reset(token, None)
+            return
+
+        self.sampled += 1
+        trace = Trace(self, normalize_trace_id(trace_id) if trace_id else "%032x" % random.getrandbits(128), self.max_spans)
+        root = Span(trace, name, None, attributes)
+        trace.root = root
+        with self._activate(root):
+            yield root
+
+    @contextmanager
+    def span(self, name: str, **attributes) -> Iterator[Any]:
+        """Time a block as a child of the current span."""
+        parent = _current_span.get()
+        if parent is None:
+            yield NOOP_SPAN
+            return
+        with self._activate(Span(parent.trace, name, parent.span_id, attributes)):
+            yield _current_span.get()
+
+    def start_span(self, name: str, **attributes) -> Any:
+        """Start a child span without making it current; call end() on it."""
+        parent = _current_span.get()
+        if parent is None:
+            return NOOP_SPAN
+        return Span(parent.trace, name, parent.span_id, attributes)
+
+    def current_span(self) -> Any:
+        return _current_span.get() or NOOP_SPAN
+
+    def traced(self, name: str) -> Callable:
+        """Decorate a sync or async function to run inside a span."""
+        def decorator(func: Callable) -> Callable:
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(name):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def get(self, trace_id: str) -> Optional[Trace]:
+        return self._traces.get(normalize_trace_id(trace_id))
+
+    def recent(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Summaries of the most recent finished traces, newest first."""
+        traces = list(self._traces.values())[-limit:] if limit > 0 else []
+        return [trace.summary() for trace in reversed(traces)]
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "sample_rate": self.sample_rate,
+            "started": self.started,
+            "sampled": self.sampled,
+            "buffered": len(self._traces),
+            "exported": self.exported,
+            "export_pending": len(self._pending),
+            "export_errors": self.export_errors,
+            "export_dropped": self.export_dropped
+        }
+
+    def start(self) -> None:
+        """Start the background exporter when an export path is set."""
+        if self.export_path and self._exporter is None:
+            self._exporter = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        """Stop the exporter and write out the traces still queued."""
+        if self._exporter is not None:
+            self._exporter.cancel()
+            try:
+                await self._exporter
+            except asyncio.CancelledError:
+                pass
+            self._exporter = None
+        await self.flush()
+
+    async def flush(self) -> bool:
+        """Append every queued trace to the export file.
+
+        Returns:
+            False if the write failed; the traces are dropped
+        """
+        if not self._pending:
+            return True
+        batch = list(self._pending)
+        self._pending.clear()
+        try:
+            await asyncio.to_thread(self._write, batch)
+        except Exception as e:
+            self.export_errors += 1
+            self.export_dropped += len(batch)
+            logger.warning(f"Failed to export {len(batch)} traces: {str(e)}")
+            return False
+        self.exported += len(batch)
+        return True
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def _write(self, batch: List[Trace]) -> None:
+        data = "".join(json.dumps(trace.to_otlp(), separators=(",", ":")) + "\n" for trace in batch)
+        with open(self.export_path, "a") as f:
+            f.write(data)
+
+    @contextmanager
+    def _activate(self, span: Span) -> Iterator[None]:
+        previous = _current_span.get()
+        token = _current_span.set(span)
+        try:
+            yield
+        except BaseException as e:
+            if not isinstance(e, GeneratorExit):
+                span.record_exception(e)
+            raise
+        finally:
+            span.end()
+            self._reset(token, previous)
+
+    def _reset(self, token, fallback: Optional[Span]) -> None:
+        try:
+            _current_span.reset(token)
+        except ValueError:
+            # An async generator closed from another task's context
+            _current_span.set(fallback)
+
+    def _finish(self, trace: Trace) -> None:
+        self._traces[trace.trace_id] = trace
+        while len(self._traces) > self.buffer_size:
+            self._traces.popitem(last=False)
+        if self.export_path:
+            if len(self._pending) >= self.buffer_size:
+                self._pending.popleft()
+                self.export_dropped += 1
+            self._pending.append(trace)
+
+# Shared by every module in the process
+tracer = Tracer()
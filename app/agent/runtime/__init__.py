@@ -0,0 +1,8 @@
+from .cancellation import CancellationRegistry, cancellations, run_cancellable
+from .tasks import TaskTracker
+from .events import EventSink, JsonlSegmentStore, event_sink
+from .timers import TimerScheduler, timer_scheduler, with_alerts
+from .breakout import Breakout, BreakoutManager
+from .channel import SessionChannel, logged_turn
+
+__all__ = ['CancellationRegistry', 'cancellations', 'run_cancellable', 'TaskTracker', 'EventSink', 'JsonlSegmentStore', 'event_sink', 'TimerScheduler', 'timer_scheduler', 'with_alerts', 'Breakout', 'BreakoutManager', 'SessionChannel', 'logged_turn']
\ No newline at end of file
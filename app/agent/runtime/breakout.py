@@ -0,0 +1,318 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from agent.runtime.timers import TimerScheduler, timer_scheduler
+from agent.state import InputKind, SessionStateStore, WorkshopState
+
+logger = logging.getLogger(__name__)
+
+# Group turns across every breakout in the worker share this many LLM slots
+BREAKOUT_LLM_CONCURRENCY = int(os.environ.get("BREAKOUT_LLM_CONCURRENCY", "16"))
+# How long past the deadline a group message may wait for its reply
+BREAKOUT_REPLY_GRACE = float(os.environ.get("BREAKOUT_REPLY_GRACE", "30"))
+MAX_FINISHED_BREAKOUTS = 256
+
+TurnRunner = Callable[[List[Dict[str, Any]], Dict[str, Any]], AsyncIterator[Dict[str, Any]]]
+Summarizer = Callable[[str, List[Dict[str, Any]]], Awaitable[str]]
+
+class BreakoutGroup:
+    """One breakout group: its own session, conversation and inbox."""
+
+    def __init__(self, group_id: str, participants: List[Any], session_id: str):
+        self.group_id = group_id
+        self.participants = participants
+        self.session_id = session_id
+        self.messages: List[Dict[str, Any]] = []
+        self.inbox: asyncio.Queue = asyncio.Queue()
+        self.turns = 0
+        self.last_output: Optional[str] = None
+
+class Breakout:
+    """A set of groups running against one shared deadline."""
+
+    def __init__(self, breakout_id: str, plenary_session_id: str, duration: float, prompt: Optional[str]):
+        self.breakout_id = breakout_id
+        self.plenary_session_id = plenary_session_id
+        self.duration = duration
+        self.prompt = prompt
+        self.deadline = time.monotonic() + duration
+        self.groups: Dict[str, BreakoutGroup] = {}
+        self.status = "running"
+        self.result: Optional[Dict[str, Any]] = None
+        self.task: Optional[asyncio.Task] = None
+        self.end_requested = asyncio.Event()
+
+    def describe(self) -> Dict[str, Any]:
+        """Current status of the breakout and its groups."""
+        return {
+            "breakout_id": self.breakout_id,
+            "session_id": self.plenary_session_id,
+            "status": self.status,
+            "time_remaining": int(max(0.0, self.deadline - time.monotonic())),
+            "groups": {
+                group.group_id: {
+                    "session_id": group.session_id,
+                    "participants": group.participants,
+                    "turns": group.turns,
+                    "last_output": group.last_output
+                }
+                for group in self.groups.values()
+            },
+            "result": self.result
+        }
+
+class BreakoutManager:
+    """Runs breakout groups as concurrent facilitator loops.
+
+    Each group gets its own session, seeded from the plenary session's
+    state, and its own turn loop that answers the group's messages. All
+    groups of a breakout share one deadline: when it passes, unfinished
+    turns are cancelled, each group's conversation is summarized and the
+    summaries are written back into the plenary session. Group turns from
+    every breakout share one LLM concurrency budget, so a large cohort
+    queues for the provider instead of overwhelming it.
+    """
+
+    def __init__(
+        self,
+        run_turn: TurnRunner,
+        store: SessionStateStore,
+        summarize: Optional[Summarizer] = None,
+        llm_concurrency: int = BREAKOUT_LLM_CONCURRENCY,
+        timers: TimerScheduler = timer_scheduler,
+        reply_grace: float = BREAKOUT_REPLY_GRACE
+    ):
+        self.run_turn = run_turn
+        self.store = store
+        self.summarize = summarize
+        self.llm_concurrency = llm_concurrency
+        self.reply_grace = reply_grace
+        self.timers = timers
+        self._breakouts: "OrderedDict[str, Breakout]" = OrderedDict()
+        self._budget: Optional[asyncio.Semaphore] = None
+
+    def get(self, breakout_id: str) -> Optional[Breakout]:
+        return self._breakouts.get(breakout_id)
+
+    async def start(
+        self,
+        plenary_session_id: str,
+        groups: List[Dict[str, Any]],
+        duration: float,
+        prompt: Optional[str] = None
+    ) -> Breakout:
+        """Split a session into breakout groups and start their loops.
+
+        Args:
+            plenary_session_id: Session the groups break out from
+            groups: Group definitions, each with an optional "id" and
+                "participants"
+            duration: Seconds until every group is brought back
+            prompt: Activity brief; each group opens with a turn on it
+
+        Returns:
+            The running breakout
+        """
+        if not groups:
+            raise ValueError("A breakout needs at least one group")
+        breakout = Breakout(uuid.uuid4().hex[:12], plenary_session_id, duration, prompt)
+        for index, spec in enumerate(groups):
+            group_id = str(spec.get("id", index + 1))
+            session_id = f"{plenary_session_id}:breakout:{breakout.breakout_id}:{group_id}"
+            breakout.groups[group_id] = BreakoutGroup(group_id, spec.get("participants", []), session_id)
+
+        # Groups pick up the plenary's section and progress
+        plenary = await self.store.load(plenary_session_id)
+        snapshot = plenary.to_dict()
+        await asyncio.gather(*(
+            self.store.save(group.session_id, WorkshopState.from_dict(snapshot))
+            for group in breakout.groups.values()
+        ))
+
+        timer_id = f"breakout:{breakout.breakout_id}"
+        for session_id in [plenary_session_id] + [group.session_id for group in breakout.groups.values()]:
+            self.timers.start_timer(session_id, timer_id, duration, [duration - 60])
+
+        self._breakouts[breakout.breakout_id] = breakout
+        breakout.task = asyncio.ensure_future(self._supervise(breakout))
+        return breakout
+
+    async def send(self, breakout_id: str, group_id: str, content: str) -> Dict[str, Any]:
+        """Run a turn for a group's message and return its final frame.
+
+        Raises:
+            KeyError: If the breakout or group doesn't exist
+            ValueError: If the breakout has ended or ends before the turn runs
+            asyncio.TimeoutError: If no reply comes within reply_grace
+                seconds of the deadline
+        """
+        breakout = self._breakouts.get(breakout_id)
+        if breakout is None or group_id not in breakout.groups:
+            raise KeyError(f"Unknown breakout group {breakout_id}/{group_id}")
+        if breakout.status != "running":
+            raise ValueError(f"Breakout {breakout_id} has ended")
+        reply = asyncio.get_event_loop().create_future()
+        breakout.groups[group_id].inbox.put_nowait((content, reply))
+        timeout = max(0.0, breakout.deadline - time.monotonic()) + self.reply_grace
+        return await asyncio.wait_for(reply, timeout)
+
+    async def end(self, breakout_id: str) -> Dict[str, Any]:
+        """Bring every group back early and return the aggregated result."""
+        breakout = self._breakouts.get(breakout_id)
+        if breakout is None:
+            raise KeyError(f"Unknown breakout {breakout_id}")
+        breakout.end_requested.set()
+        await asyncio.shield(breakout.task)
+        return breakout.result
+
+    async def stop(self) -> None:
+        """Cancel every running breakout without aggregating."""
+        for breakout in self._breakouts.values():
+            if breakout.task is not None and not breakout.task.done():
+                breakout.task.cancel()
+        await asyncio.gather(
+            *(breakout.task for breakout in self._breakouts.values() if breakout.task is not None),
+            return_exceptions=True
+        )
+
+    def _llm_budget(self) -> asyncio.Semaphore:
+        # Created on first use so it binds to the running loop
+        if self._budget is None:
+            self._budget = asyncio.Semaphore(self.llm_concurrency)
+        return self._budget
+
+    async def _supervise(self, breakout: Breakout) -> None:
+        loops = [asyncio.ensure_future(self._group_loop(breakout, group)) for group in breakout.groups.values()]
+        try:
+            await asyncio.wait_for(breakout.end_requested.wait(), max(0.0, breakout.deadline - time.monotonic()))
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            # Refuse new messages before any loop stops reading its inbox
+            breakout.status = "ending"
+            for loop in loops:
+                loop.cancel()
+            await asyncio.gather(*loops, return_exceptions=True)
+            for group in breakout.groups.values():
+                self._fail_waiting(breakout, [item[1] for item in self._drain(group.inbox)])
+
+        try:
+            breakout.result = await self._aggregate(breakout)
+        except Exception as e:
+            logger.error(f"Failed to aggregate breakout {breakout.breakout_id}: {str(e)}")
+            breakout.result = {"breakout_id": breakout.breakout_id, "groups": {}}
+        finally:
+            breakout.status = "ended"
+            timer_id = f"breakout:{breakout.breakout_id}"
+            self.timers.cancel_timer(breakout.plenary_session_id, timer_id)
+            for group in breakout.groups.values():
+                self.timers.cancel_timer(group.session_id, timer_id)
+            self._forget_finished()
+
+    async def _group_loop(self, breakout: Breakout, group: BreakoutGroup) -> None:
+        reply = None
+        try:
+            if breakout.prompt:
+                try:
+                    await self._turn(group, breakout.prompt)
+                except Exception as e:
+                    # The group can still talk to the facilitator without its opening
+                    logger.error(f"Error opening breakout group {group.group_id}: {str(e)}")
+            while True:
+                content, reply = await group.inbox.get()
+                if reply.done():
+                    # The sender stopped waiting
+                    continue
+                try:
+                    frame = await self._turn(group, content)
+                except Exception as e:
+                    logger.error(f"Error in breakout group {group.group_id}: {str(e)}")
+                    if not reply.done():
+                        reply.set_exception(e)
+                else:
+                    if not reply.done():
+                        reply.set_result(frame)
+                reply = None
+        finally:
+            # Time is up: whoever is still waiting gets an answer
+            self._fail_waiting(breakout, [reply] + [item[1] for item in self._drain(group.inbox)])
+
+    async def _turn(self, group: BreakoutGroup, content: str) -> Dict[str, Any]:
+        group.messages.append({"role": "user", "content": content})
+        final = None
+        try:
+            async with self._llm_budget():
+                async for frame in self.run_turn(group.messages, {"session_id": group.session_id}):
+                    if frame.get("type") == "final":
+                        final = frame
+            if final is None:
+                raise RuntimeError("Turn ended without a final frame")
+        except Exception:
+            # Don't leave a message the facilitator never answered
+            group.messages.pop()
+            raise
+        group.messages.append({"role": "assistant", "content": final["output"]})
+        group.turns += 1
+        group.last_output = final["output"]
+        return final
+
+    async def _aggregate(self, breakout: Breakout) -> Dict[str, Any]:
+        groups = list(breakout.groups.values())
+        summaries = await asyncio.gather(*(self._summarize_group(group) for group in groups))
+        result = {
+            "breakout_id": breakout.breakout_id,
+            "prompt": breakout.prompt,
+            "groups": {
+                group.group_id: {
+                    "participants": group.participants,
+                    "turns": group.turns,
+                    "summary": summary
+                }
+                for group, summary in zip(groups, summaries)
+            }
+        }
+        # The plenary facilitator hears what the groups came back with
+        # through the section summary it already sends with each turn
+        state = await self.store.load(breakout.plenary_session_id)
+        reports = [f"{group.group_id}: {summary}" for group, summary in zip(groups, summaries) if summary]
+        if reports:
+            section = state.current_section_name
+            previous = state.summaries.get(section)
+            report = "Breakout groups reported back. " + " ".join(reports)
+            state.summaries[section] = f"{previous} {report}" if previous else report
+        state.record_input(InputKind.BREAKOUT, len(groups))
+        await self.store.save(breakout.plenary_session_id, state)
+        return result
+
+    async def _summarize_group(self, group: BreakoutGroup) -> Optional[str]:
+        if self.summarize is None or not group.messages:
+            return group.last_output
+        try:
+            async with self._llm_budget():
+                return await self.summarize("", group.messages)
+        except Exception as e:
+            logger.warning(f"Failed to summarize breakout group {group.group_id}: {str(e)}")
+            return group.last_output
+
+    def _forget_finished(self) -> None:
+        finished = [key for key, breakout in self._breakouts.items() if breakout.status == "ended"]
+        for key in finished[:max(0, len(finished) - MAX_FINISHED_BREAKOUTS)]:
+            del self._breakouts[key]
+
+    @staticmethod
+    def _fail_waiting(breakout: Breakout, replies: List[Optional[asyncio.Future]]) -> None:
+        for reply in replies:
+            if reply is not None and not reply.done():
+                reply.set_exception(ValueError(f"Breakout {breakout.breakout_id} has ended"))
+
+    @staticmethod
+    def _drain(queue: asyncio.Queue) -> List[Any]:
+        items = []
+        while not queue.empty():
+            items.append(queue.get_nowait())
+        return items
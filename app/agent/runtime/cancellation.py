@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Dict, Optional
+
+from agent.observability.metrics import CANCELLATIONS
+
+logger = logging.getLogger(__name__)
+
+CANCEL_CHANNEL = "reasoning-agent:cancel"
+# Cancellations that arrive before their turn has started are remembered
+# for a short while, bounded so other workers' task IDs can't pile up.
+MAX_PENDING_CANCELLATIONS = 1024
+PENDING_CANCELLATION_TTL = 30.0
+MAX_RECONNECT_DELAY = 5.0
+PUBSUB_POLL_TIMEOUT = 1.0
+
+class CancellationRegistry:
+    """In-process registry of running agent turns, keyed by task ID.
+
+    Cancelling a task cancels the asyncio task producing its frames, which
+    aborts the upstream LLM stream and releases its connection. Workers
+    share cancellations over Redis pub/sub so a cancel request can land on
+    any worker.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._cancelled_at: Dict[str, float] = {}
+        self._pending: "OrderedDict[str, float]" = OrderedDict()
+        self._listener: Optional[asyncio.Task] = None
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._tasks
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+    def register(self, task_id: str, task: asyncio.Task) -> None:
+        """Track a running turn; cancels it at once if a cancel is pending."""
+        self._tasks[task_id] = task
+        requested_at = self._pending.pop(task_id, None)
+        if requested_at is not None and time.monotonic() - requested_at < PENDING_CANCELLATION_TTL:
+            self.cancel(task_id)
+
+    def unregister(self, task_id: str) -> Optional[float]:
+        """Stop tracking a turn.
+
+        Returns:
+            Milliseconds between the cancel request and the turn stopping,
+            or None if the turn was not cancelled
+        """
+        self._tasks.pop(task_id, None)
+        cancelled_at = self._cancelled_at.pop(task_id, None)
+        if cancelled_at is None:
+            return None
+        return (time.perf_counter() - cancelled_at) * 1000
+
+    def cancel(self, task_id: str) -> bool:
+        """Cancel a turn running on this worker. Returns True if found."""
+        task = self._tasks.get(task_id)
+        if task is None:
+            self._pending[task_id] = time.monotonic()
+            while len(self._pending) > MAX_PENDING_CANCELLATIONS:
+                self._pending.popitem(last=False)
+            return False
+        if not task.done():
+            self._cancelled_at.setdefault(task_id, time.perf_counter())
+            task.cancel()
+        return True
+
+    async def publish(self, redis_client, task_id: str) -> None:
+        """Ask every worker to cancel a turn."""
+        await redis_client.publish(CANCEL_CHANNEL, task_id)
+
+    def start_listener(self, redis_client) -> None:
+        """Start listening for cancellations published by other workers."""
+        if self._listener is None:
+            self._listener = asyncio.get_event_loop().create_task(self._listen(redis_client))
+
+    async def stop_listener(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            try:
+                await self._listener
+            except asyncio.CancelledError:
+                pass
+            self._listener = None
+
+    async def _listen(self, redis_client) -> None:
+        failures = 0
+        while True:
+            pubsub = redis_client.pubsub()
+            try:
+                await pubsub.subscribe(CANCEL_CHANNEL)
+                failures = 0
+                while True:
+                    # A bounded wait rather than listen(): a blocking read
+                    # on an idle channel would trip the socket timeout
+                    message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=PUBSUB_POLL_TIMEOUT)
+                    if message is None or message.get("type") != "message":
+                        continue
+                    task_id = message["data"]
+                    if isinstance(task_id, bytes):
+                        task_id = task_id.decode()
+                    self.cancel(task_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                failures += 1
+                delay = min(MAX_RECONNECT_DELAY, 0.1 * 2 ** failures)
+                logger.warning(f"Cancellation listener lost Redis connection, retrying in {delay:.1f}s: {str(e)}")
+                await asyncio.sleep(delay)
+            finally:
+                await pubsub.close()
+
+cancellations = CancellationRegistry()
+
+async def run_cancellable(
+    task_id: str,
+    frames: AsyncIterator[Dict[str, Any]],
+    registry: CancellationRegistry = cancellations
+) -> AsyncIterator[Dict[str, Any]]:
+    """Drive a turn's frames in its own task so it can be cancelled mid-stream.
+
+    Cancelling the task ID stops the producing task wherever it is awaiting,
+    typically inside the LLM stream, and ends this iterator without error.
+    Errors raised by the turn are re-raised to the caller.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    done = object()
+
+    async def pump():
+        async for frame in frames:
+            queue.put_nowait(frame)
+
+    producer = asyncio.get_event_loop().create_task(pump())
+    # Runs however the producer ends, even if cancelled before it started
+    producer.add_done_callback(lambda _: queue.put_nowait(done))
+    registry.register(task_id, producer)
+    try:
+        while True:
+            frame = await queue.get()
+            if frame is done:
+                break
+            yield frame
+        if not producer.cancelled():
+            producer.result()
+    finally:
+        if not producer.done():
+            producer.cancel()
+        stop_latency = registry.unregister(task_id)
+        if stop_latency is not None:
+            CANCELLATIONS.inc()
+            logger.info(f"Task {task_id} stopped {stop_latency:.1f}ms after cancellation")
@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import os
+import uuid
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from agent.runtime.cancellation import CancellationRegistry, cancellations
+from agent.runtime.timers import TimerScheduler, timer_scheduler
+from agent.state.conversation import ConversationLog, SequenceMismatch, validate_messages
+from agent.utils.serialization import dumps, loads
+from agent.utils.streaming import alert_frame
+
+logger = logging.getLogger(__name__)
+
+# Frames buffered per connection before a turn waits for the client to
+# catch up
+WS_SEND_QUEUE_SIZE = int(os.environ.get("WS_SEND_QUEUE_SIZE", "256"))
+WS_MAX_MESSAGE_BYTES = int(os.environ.get("WS_MAX_MESSAGE_BYTES", str(1024 * 1024)))
+
+# (task_id, session, messages, opening) -> the turn's frames
+RunTurn = Callable[[str, Dict[str, Any], List[Dict[str, Any]], bool], AsyncIterator[Dict[str, Any]]]
+
+async def logged_turn(
+    conversations: ConversationLog,
+    session_id: str,
+    run: Callable[[List[Dict[str, Any]]], AsyncIterator[Dict[str, Any]]]
+) -> AsyncIterator[Dict[str, Any]]:
+    """Run a turn on a session's logged history and log the reply.
+
+    Ends with an ``ack`` frame carrying the seq the client is now at.
+    """
+    history = list(await conversations.load(session_id))
+    reply = None
+    async for frame in run(history):
+        if frame.get("type") == "final" and frame.get("messages"):
+            reply = frame["messages"][0]
+        yield frame
+    seq = await conversations.append(session_id, [reply] if reply else [])
+    yield {"type": "ack", "seq": seq}
+
+class SessionChannel:
+    """One persistent connection carrying a session's turns.
+
+    The client sends only the messages added since the sequence number the
+    server last acknowledged; the history is kept in the conversation log.
+    Turn frames (tagged with the client's turn_id), timer alerts and
+    acknowledgements share the connection.
+
+    Client frames:
+        {"type": "turn", "turn_id": ..., "messages": [...], "base_seq": n, "advance_section": false}
+        {"type": "cancel", "turn_id": ...}
+        {"type": "ping"}
+
+    Server frames: ready, started, the turn's own frames, ack (with the
+    new seq once the reply is logged), alert, pong and error.
+
+    Outgoing frames pass through a bounded queue, so a slow client holds
+    the turn back rather than letting frames pile up in memory, and text
+    deltas that queued up behind each other are sent as one frame.
+    """
+
+    def __init__(
+        self,
+        session_id: str,
+        run_turn: RunTurn,
+        conversations: ConversationLog,
+        timers: TimerScheduler = timer_scheduler,
+        registry: CancellationRegistry = cancellations,
+        send_queue_size: int = WS_SEND_QUEUE_SIZE,
+        max_message_bytes: int = WS_MAX_MESSAGE_BYTES
+    ):
+        self.session_id = session_id
+        self.session = {"session_id": session_id}
+        self.run_turn = run_turn
+        self.conversations = conversations
+        self.timers = timers
+        self.registry = registry
+        self.send_queue_size = send_queue_size
+        self.max_message_bytes = max_message_bytes
+        self.turn_id: Optional[str] = None
+        self.task_id: Optional[str] = None
+        self._turn: Optional[asyncio.Task] = None
+        self._outgoing: Optional[asyncio.Queue] = None
+
+    async def serve(self, receive: Callable[[], Awaitable[str]], send: Callable[[str], Awaitable[None]]) -> None:
+        """Handle the connection until receive raises, e.g. on disconnect."""
+        self._outgoing = asyncio.Queue(self.send_queue_size)
+        alerts = self.timers.subscribe(self.session_id)
+        sender = asyncio.ensure_future(self._send_loop(send))
+        forwarder = asyncio.ensure_future(self._forward_alerts(alerts))
+        try:
+            await self.send({"type": "ready", "session_id": self.session_id, "seq": await self.conversations.seq(self.session_id)})
+            while True:
+                await self.handle(await receive())
+        finally:
+            if self._turn is not None and not self._turn.done():
+                self._turn.cancel()
+            forwarder.cancel()
+            sender.cancel()
+            self.timers.unsubscribe(self.session_id, alerts)
+            await asyncio.gather(forwarder, sender, return_exceptions=True)
+
+    async def send(self, frame: Dict[str, Any]) -> None:
+        """Queue a frame, waiting while the client is behind."""
+        await self._outgoing.put(frame)
+
+    async def handle(self, text: str) -> None:
+        """Act on one client frame."""
+        # Characters never outnumber UTF-8 bytes; only encode when it matters
+        if len(text) > self.max_message_bytes or (len(text) * 4 > self.max_message_bytes and len(text.encode()) > self.max_message_bytes):
+            await self.send({"type": "error", "code": "too_large", "error": f"Frames are limited to {self.max_message_bytes} bytes"})
+            return
+        try:
+            frame = loads(text)
+        except ValueError:
+            await self.send({"type": "error", "code": "bad_frame", "error": "Frames must be JSON objects"})
+            return
+        if not isinstance(frame, dict):
+            await self.send({"type": "error", "code": "bad_frame", "error": "Frames must be JSON objects"})
+            return
+
+        kind = frame.get("type")
+        if kind == "turn":
+            await self._start_turn(frame)
+        elif kind == "cancel":
+            if self.task_id is not None and frame.get("turn_id") in (None, self.turn_id):
+                self.registry.cancel(self.task_id)
+        elif kind == "ping":
+            await self.send({"type": "pong"})
+        else:
+            await self.send({"type": "error", "code": "bad_frame", "error": f"Unknown frame type: {kind}"})
+
+    async def _start_turn(self, frame: Dict[str, Any]) -> None:
+        turn_id = str(frame.get("turn_id") or uuid.uuid4())
+        if self._turn is not None and not self._turn.done():
+            await self.send({"type": "error", "code": "busy", "turn_id": turn_id, "error": f"Turn {self.turn_id} is still running"})
+            return
+        messages = frame.get("messages") or []
+        try:
+            validate_messages(messages)
+        except ValueError as e:
+            await self.send({"type": "error", "code": "bad_frame", "turn_id": turn_id, "error": str(e)})
+            return
+        try:
+            await self.conversations.append(self.session_id, messages, frame.get("base_seq"))
+        except SequenceMismatch as e:
+            await self.send({"type": "error", "code": "seq_mismatch", "turn_id": turn_id, "seq": e.seq, "error": str(e)})
+            return
+
+        self.turn_id = turn_id
+        self.task_id = str(uuid.uuid4())
+        self._turn = asyncio.ensure_future(self._run(turn_id, self.task_id, bool(frame.get("advance_section"))))
+
+    async def _run(self, turn_id: str, task_id: str, opening: bool) -> None:
+        try:
+            await self.send({"type": "started", "turn_id": turn_id, "task_id": task_id})
+            frames = logged_turn(
+                self.conversations,
+                self.session_id,
+                lambda history: self.run_turn(task_id, self.session, history, opening)
+            )
+            async for frame in frames:
+                await self.send({**frame, "turn_id": turn_id})
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Error in session channel {self.session_id}: {str(e)}")
+            await self.send({"type": "error", "code": "turn_failed", "turn_id": turn_id, "error": str(e)})
+
+    async def _forward_alerts(self, alerts: asyncio.Queue) -> None:
+        while True:
+            await self.send(alert_frame(await alerts.get()))
+
+    async def _send_loop(self, send: Callable[[str], Awaitable[None]]) -> None:
+        pending: Optional[Dict[str, Any]] = None
+        while True:
+            frame = pending if pending is not None else await self._outgoing.get()
+            pending = None
+            # Coalesce text deltas the client hasn't been sent yet
+            while frame.get("type") == "text_delta" and not self._outgoing.empty():
+                following = self._outgoing.get_nowait()
+                if following.get("type") != "text_delta" or following.get("turn_id") != frame.get("turn_id"):
+                    pending = following
+                    break
+                frame = {**frame, "content": frame["content"] + following["content"]}
+            await send(dumps(frame).decode())
@@ -0,0 +1,203 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+EVENTS_DIR = os.environ.get(
+    "EVENTS_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), "data", "events")
+)
+EVENT_BATCH_SIZE = int(os.environ.get("EVENT_BATCH_SIZE", "200"))
+EVENT_FLUSH_INTERVAL = float(os.environ.get("EVENT_FLUSH_INTERVAL", "1.0"))
+EVENT_BUFFER_SIZE = int(os.environ.get("EVENT_BUFFER_SIZE", "10000"))
+EVENT_SEGMENT_BYTES = int(os.environ.get("EVENT_SEGMENT_BYTES", str(16 * 1024 * 1024)))
+
+class JsonlSegmentStore:
+    """Append-only store of events as JSON lines in size-capped segments.
+
+    Each batch is written with one write call and fsynced, so a batch is
+    either fully on disk or (after a crash mid-write) ends in a partial
+    last line that readers skip. Segments are never rewritten.
+    """
+
+    def __init__(self, directory: str = EVENTS_DIR, segment_bytes: int = EVENT_SEGMENT_BYTES):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self._path: Optional[str] = None
+        self._size = 0
+
+    def append(self, events: List[Dict[str, Any]]) -> None:
+        """Write a batch of events to the current segment."""
+        data = "".join(json.dumps(event, default=str) + "\n" for event in events).encode()
+        if self._path is None or self._size + len(data) > self.segment_bytes:
+            self._rotate()
+        with open(self._path, "ab") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self._size += len(data)
+
+    def segments(self) -> List[str]:
+        """Paths of all segments, oldest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        names = sorted(name for name in os.listdir(self.directory) if name.endswith(".jsonl"))
+        return [os.path.join(self.directory, name) for name in names]
+
+    def read(self) -> List[Dict[str, Any]]:
+        """Read back every stored event, skipping a torn trailing line."""
+        events = []
+        for path in self.segments():
+            with open(path, "rb") as f:
+                for line in f:
+                    try:
+                        events.append(json.loads(line))
+                    except ValueError:
+                        continue
+        return events
+
+    def _rotate(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        self._path = os.path.join(self.directory, f"events-{time.time_ns()}.jsonl")
+        self._size = 0
+
+class EventSink:
+    """Buffers workshop events in memory and persists them in batches.
+
+    ``emit`` only appends to the buffer, so recording an event costs the
+    turn nothing. A background task writes the buffer to the store when it
+    reaches batch_size or every flush_interval seconds. The buffer is
+    bounded at max_buffer events, including while writes are failing:
+    ``put`` waits for the flusher to make space, while ``emit``, which
+    must not block the event loop on disk, drops the event and counts it
+    in ``dropped``. ``stop`` drains the buffer.
+    """
+
+    def __init__(
+        self,
+        store: JsonlSegmentStore,
+        batch_size: int = EVENT_BATCH_SIZE,
+        flush_interval: float = EVENT_FLUSH_INTERVAL,
+        max_buffer: int = EVENT_BUFFER_SIZE
+    ):
+        self.store = store
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_buffer = max_buffer
+        self._buffer: Deque[Dict[str, Any]] = deque()
+        self._write_lock = threading.Lock()
+        self._wake: Optional[asyncio.Event] = None
+        self._space: Optional[asyncio.Condition] = None
+        self._flusher: Optional[asyncio.Task] = None
+        self._stopping = False
+        self.written = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    def emit(self, kind: str, payload: Dict[str, Any]) -> bool:
+        """Record an event without waiting for it to be persisted.
+
+        Returns False, and drops the event, if the buffer is full.
+        """
+        if len(self._buffer) >= self.max_buffer:
+            if not self.dropped:
+                logger.warning(f"Workshop event buffer full at {self.max_buffer} events; dropping new events")
+            self.dropped += 1
+            if self._wake is not None:
+                self._wake.set()
+            return False
+        self._buffer.append({"kind": kind, "recorded_at": time.time(), **payload})
+        if self._wake is not None and len(self._buffer) >= self.batch_size:
+            self._wake.set()
+        return True
+
+    async def put(self, kind: str, payload: Dict[str, Any]) -> None:
+        """Record an event, waiting for buffer space if the sink is full."""
+        if self._space is not None:
+            async with self._space:
+                await self._space.wait_for(lambda: len(self._buffer) < self.max_buffer)
+        self.emit(kind, payload)
+
+    def start(self) -> None:
+        """Start the background flusher."""
+        if self._flusher is None:
+            self._wake = asyncio.Event()
+            self._space = asyncio.Condition()
+            self._flusher = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flusher and persist everything still buffered."""
+        if self._flusher is not None:
+            # Let an in-progress write finish rather than cancelling it
+            self._stopping = True
+            self._wake.set()
+            await self._flusher
+            self._flusher = None
+            self._stopping = False
+        while self._buffer:
+            if not await self.flush():
+                break
+        self._wake = None
+        self._space = None
+
+    async def flush(self) -> bool:
+        """Write up to one batch of buffered events to the store.
+
+        Returns:
+            False if the write failed; the events are kept for the next flush
+        """
+        batch = self._take()
+        if not batch:
+            return True
+        try:
+            await asyncio.to_thread(self._write, batch)
+        except Exception as e:
+            logger.warning(f"Failed to persist {len(batch)} workshop events: {str(e)}")
+            self._requeue(batch)
+            return False
+        finally:
+            if self._space is not None:
+                async with self._space:
+                    self._space.notify_all()
+        return True
+
+    async def _run(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            while self._buffer:
+                if not await self.flush():
+                    break
+
+    def _requeue(self, batch: List[Dict[str, Any]]) -> None:
+        # Events emitted during the write may have used the space; the
+        # oldest of the batch go first so the buffer stays bounded
+        room = max(0, self.max_buffer - len(self._buffer))
+        if room < len(batch):
+            self.dropped += len(batch) - room
+            batch = batch[len(batch) - room:]
+        self._buffer.extendleft(reversed(batch))
+
+    def _take(self) -> List[Dict[str, Any]]:
+        count = min(len(self._buffer), self.batch_size)
+        return [self._buffer.popleft() for _ in range(count)]
+
+    def _write(self, batch: List[Dict[str, Any]]) -> None:
+        if not batch:
+            return
+        with self._write_lock:
+            self.store.append(batch)
+        self.written += len(batch)
+
+event_sink = EventSink(JsonlSegmentStore())
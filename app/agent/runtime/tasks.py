@@ -0,0 +1,40 @@
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+TASK_KEY_PREFIX = "reasoning-task:"
+# Abandoned tasks expire instead of piling up in Redis
+TASK_TTL = int(os.environ.get("TASK_TTL", "600"))
+
+class TaskTracker:
+    """Records the status of agent turns in Redis.
+
+    Bookkeeping is best-effort: failures are logged and never fail the turn.
+    Each status update is a single SET with an expiry, so it costs one
+    round-trip.
+    """
+
+    def __init__(self, redis_client, ttl: int = TASK_TTL):
+        self.redis = redis_client
+        self.ttl = ttl
+
+    async def set_status(self, task_id: str, status: str) -> None:
+        try:
+            await self.redis.set(TASK_KEY_PREFIX + task_id, status, ex=self.ttl)
+        except Exception as e:
+            logger.warning(f"Failed to set status of task {task_id}: {str(e)}")
+
+    async def get_status(self, task_id: str):
+        try:
+            status = await self.redis.get(TASK_KEY_PREFIX + task_id)
+        except Exception as e:
+            logger.warning(f"Failed to get status of task {task_id}: {str(e)}")
+            return None
+        return status.decode() if isinstance(status, bytes) else status
+
+    async def finish(self, task_id: str) -> None:
+        try:
+            await self.redis.delete(TASK_KEY_PREFIX + task_id)
+        except Exception as e:
+            logger.warning(f"Failed to clear task {task_id}: {str(e)}")
@@ -0,0 +1,240 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import os
+import time
+from collections import OrderedDict, deque
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+
+from agent.utils.streaming import alert_frame
+
+logger = logging.getLogger(__name__)
+
+# Alerts for sessions with no open stream are held for their next turn
+MAX_PENDING_ALERTS = int(os.environ.get("TIMER_MAX_PENDING_ALERTS", "8"))
+MAX_PENDING_SESSIONS = int(os.environ.get("TIMER_MAX_PENDING_SESSIONS", "4096"))
+
+TimerKey = Tuple[str, str]
+
+def describe_remaining(seconds: int) -> str:
+    """Spoken form of the time left, e.g. "One minute left."."""
+    if seconds <= 0:
+        return "Time's up."
+    if seconds == 60:
+        return "One minute left."
+    if seconds % 60 == 0:
+        return f"{seconds // 60} minutes left."
+    if seconds < 60:
+        return f"{seconds} seconds left."
+    return f"About {round(seconds / 60)} minutes left."
+
+class Timer:
+    """A running discussion or activity timer."""
+
+    def __init__(self, session_id: str, discussion_id: str, duration: float, alert_at: List[int], started_at: float):
+        self.session_id = session_id
+        self.discussion_id = discussion_id
+        self.duration = duration
+        self.alert_at = alert_at
+        self.started_at = started_at
+        self.deadline = started_at + duration
+
+    def remaining(self, now: float) -> float:
+        return max(0.0, self.deadline - now)
+
+class TimerScheduler:
+    """Runs every discussion timer in the worker from one asyncio task.
+
+    Alert deadlines live in a single heap. The scheduler task sleeps until
+    the earliest one, fires everything that is due and sleeps again, so
+    thousands of timers cost one task and no polling. Restarting or
+    cancelling a timer leaves its old heap entries behind; they are skipped
+    when popped because the timer they point to has been replaced.
+
+    Alerts are pushed to the session's subscribers (its open client
+    streams), or held briefly until the session's next turn.
+    """
+
+    def __init__(self):
+        self._timers: Dict[TimerKey, Timer] = {}
+        # Most recently started timer per session, for time_remaining lookups
+        self._current: Dict[str, str] = {}
+        self._heap: List[Tuple[float, int, Timer, int]] = []
+        self._seq = itertools.count()
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._pending: "OrderedDict[str, Deque[Dict[str, Any]]]" = OrderedDict()
+        self._changed: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.fired = 0
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def start_timer(
+        self,
+        session_id: str,
+        discussion_id: str,
+        duration: float,
+        alert_at: Optional[List[int]] = None
+    ) -> Timer:
+        """Start (or restart) a timer for a discussion in a session.
+
+        Args:
+            session_id: Session whose streams receive the alerts
+            discussion_id: Identifies the discussion within the session
+            duration: Length of the discussion in seconds
+            alert_at: Seconds after the start at which to alert; a final
+                alert always fires when time is up
+
+        Returns:
+            The new timer
+        """
+        offsets = sorted({int(offset) for offset in (alert_at or []) if 0 < offset < duration})
+        timer = Timer(session_id, discussion_id, duration, offsets, time.monotonic())
+        key = (session_id, discussion_id)
+        self._timers[key] = timer
+        self._current[session_id] = discussion_id
+
+        earliest = self._heap[0][0] if self._heap else None
+        for offset in offsets + [duration]:
+            heapq.heappush(self._heap, (timer.started_at + offset, next(self._seq), timer, int(duration - offset)))
+        if self._changed is not None and (earliest is None or self._heap[0][0] < earliest):
+            self._changed.set()
+        return timer
+
+    def cancel_timer(self, session_id: str, discussion_id: str) -> bool:
+        """Stop a timer; its pending alerts are dropped."""
+        timer = self._timers.pop((session_id, discussion_id), None)
+        if timer is None:
+            return False
+        if self._current.get(session_id) == discussion_id:
+            del self._current[session_id]
+        return True
+
+    def get_timer(self, session_id: str, discussion_id: Optional[str] = None) -> Optional[Timer]:
+        """The session's timer for a discussion, or its latest one."""
+        if discussion_id is None:
+            discussion_id = self._current.get(session_id)
+            if discussion_id is None:
+                return None
+        return self._timers.get((session_id, discussion_id))
+
+    def time_remaining(self, session_id: str, discussion_id: Optional[str] = None) -> Optional[int]:
+        """Seconds left on a timer, or None if there is no such timer."""
+        timer = self.get_timer(session_id, discussion_id)
+        if timer is None:
+            return None
+        return int(timer.remaining(time.monotonic()))
+
+    def subscribe(self, session_id: str) -> asyncio.Queue:
+        """Receive the session's alerts, starting with any held for it."""
+        queue: asyncio.Queue = asyncio.Queue()
+        for alert in self._pending.pop(session_id, ()):
+            queue.put_nowait(alert)
+        self._subscribers.setdefault(session_id, set()).add(queue)
+        return queue
+
+    def unsubscribe(self, session_id: str, queue: asyncio.Queue) -> None:
+        queues = self._subscribers.get(session_id)
+        if queues is None:
+            return
+        queues.discard(queue)
+        if not queues:
+            del self._subscribers[session_id]
+
+    def start(self) -> None:
+        """Start the scheduler task."""
+        if self._task is None:
+            self._changed = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._changed = None
+
+    def fire_due(self, now: Optional[float] = None) -> int:
+        """Deliver every alert whose deadline has passed.
+
+        Returns:
+            The number of alerts delivered
+        """
+        now = time.monotonic() if now is None else now
+        fired = 0
+        while self._heap and self._heap[0][0] <= now:
+            _, _, timer, remaining = heapq.heappop(self._heap)
+            key = (timer.session_id, timer.discussion_id)
+            if self._timers.get(key) is not timer:
+                continue
+            if remaining <= 0:
+                self.cancel_timer(*key)
+            self._deliver(timer.session_id, {
+                "discussion_id": timer.discussion_id,
+                "time_remaining": remaining,
+                "message": describe_remaining(remaining)
+            })
+            fired += 1
+        self.fired += fired
+        return fired
+
+    async def _run(self) -> None:
+        while True:
+            self._changed.clear()
+            timeout = self._heap[0][0] - time.monotonic() if self._heap else None
+            if timeout is None or timeout > 0:
+                try:
+                    await asyncio.wait_for(self._changed.wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+            try:
+                self.fire_due()
+            except Exception as e:
+                logger.error(f"Error delivering timer alerts: {str(e)}")
+
+    def _deliver(self, session_id: str, alert: Dict[str, Any]) -> None:
+        queues = self._subscribers.get(session_id)
+        if queues:
+            for queue in queues:
+                queue.put_nowait(alert)
+            return
+        pending = self._pending.get(session_id)
+        if pending is None:
+            pending = self._pending[session_id] = deque(maxlen=MAX_PENDING_ALERTS)
+            while len(self._pending) > MAX_PENDING_SESSIONS:
+                self._pending.popitem(last=False)
+        pending.append(alert)
+
+async def with_alerts(frames: AsyncIterator[Dict[str, Any]], alerts: asyncio.Queue) -> AsyncIterator[Dict[str, Any]]:
+    """Yield a turn's frames, interleaving alert frames as they arrive.
+
+    Ends when the turn's frames end; alerts still queued are left for the
+    caller.
+    """
+    iterator = frames.__aiter__()
+    next_frame = asyncio.ensure_future(iterator.__anext__())
+    next_alert = asyncio.ensure_future(alerts.get())
+    try:
+        while True:
+            await asyncio.wait({next_frame, next_alert}, return_when=asyncio.FIRST_COMPLETED)
+            if next_alert.done():
+                yield alert_frame(next_alert.result())
+                next_alert = asyncio.ensure_future(alerts.get())
+            if next_frame.done():
+                try:
+                    frame = next_frame.result()
+                except StopAsyncIteration:
+                    break
+                yield frame
+                next_frame = asyncio.ensure_future(iterator.__anext__())
+    finally:
+        next_alert.cancel()
+        if not next_frame.done():
+            next_frame.cancel()
+
+timer_scheduler = TimerScheduler()
@@ -0,0 +1,20 @@
+from .workshop_state import WorkshopState, InputKind, Section, SECTIONS, SECTION_INDEX
+from .store import SessionStateStore, create_session_store, session_key
+from .history import HistoryManager, estimate_tokens
+from .conversation import ConversationLog, SequenceMismatch, validate_messages
+
+__all__ = [
+    'WorkshopState',
+    'InputKind',
+    'Section',
+    'SECTIONS',
+    'SECTION_INDEX',
+    'SessionStateStore',
+    'create_session_store',
+    'session_key',
+    'HistoryManager',
+    'estimate_tokens',
+    'ConversationLog',
+    'SequenceMismatch',
+    'validate_messages'
+]
\ No newline at end of file
@@ -0,0 +1,166 @@
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from agent.state.store import SESSION_LOCAL_TTL, SESSION_LRU_SIZE, SESSION_TTL
+from agent.utils.serialization import dumps, loads
+
+logger = logging.getLogger(__name__)
+
+CONVERSATION_KEY_PREFIX = "conversation:"
+# Appends only while the list is the length the appending worker last
+# saw, so two workers can't interleave a session's messages
+APPEND_SCRIPT = """
+local length = redis.call('LLEN', KEYS[1])
+if length ~= tonumber(ARGV[1]) then
+    return {0, length}
+end
+for i = 3, #ARGV do
+    redis.call('RPUSH', KEYS[1], ARGV[i])
+end
+redis.call('EXPIRE', KEYS[1], ARGV[2])
+return {1, length + #ARGV - 2}
+"""
+# Unsequenced appends retry this many times when another worker got in first
+APPEND_ATTEMPTS = 3
+
+Message = Dict[str, Any]
+
+def validate_messages(messages: Any) -> None:
+    """Check that client-supplied messages are objects with string content.
+
+    Raises:
+        ValueError: If messages isn't a list of such objects
+    """
+    if not isinstance(messages, list):
+        raise ValueError("messages must be a list")
+    for index, message in enumerate(messages):
+        if (
+            not isinstance(message, dict)
+            or not isinstance(message.get("content"), str)
+            or not isinstance(message.get("role", "user"), str)
+        ):
+            raise ValueError(f"messages[{index}] must be an object with string role and content")
+
+class SequenceMismatch(ValueError):
+    """A client's base sequence number doesn't match the server's log."""
+
+    def __init__(self, seq: int, base_seq: int):
+        super().__init__(f"Conversation is at seq {seq}, not {base_seq}")
+        self.seq = seq
+        self.base_seq = base_seq
+
+class ConversationLog:
+    """Server-side copy of each session's messages.
+
+    Messages are numbered in order, and a session's sequence number is the
+    count of messages logged so far. A client that has been acknowledged at
+    seq n only sends the messages after it, and the turn runs on the full
+    history rebuilt here.
+
+    Like SessionStateStore, recently used sessions are kept in an
+    in-process LRU tier that writes through to a Redis list. After
+    local_ttl the list's length is checked and only the messages appended
+    elsewhere are fetched, so neither tier re-reads a whole history.
+    Appends to Redis are conditional on the list still having the length
+    this worker saw, so a stale local tier is caught rather than written
+    past.
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        max_sessions: int = SESSION_LRU_SIZE,
+        local_ttl: float = SESSION_LOCAL_TTL,
+        ttl: int = SESSION_TTL
+    ):
+        self.redis = redis_client
+        self.max_sessions = max_sessions
+        self.local_ttl = local_ttl
+        self.ttl = ttl
+        self._local: "OrderedDict[str, Tuple[List[Message], float]]" = OrderedDict()
+        self._append_script = redis_client.register_script(APPEND_SCRIPT) if redis_client is not None else None
+
+    def __len__(self) -> int:
+        return len(self._local)
+
+    async def load(self, session_id: str) -> List[Message]:
+        """Return a session's messages, oldest first."""
+        cached = self._local.get(session_id)
+        now = time.monotonic()
+        if cached and (self.redis is None or now - cached[1] < self.local_ttl):
+            self._local.move_to_end(session_id)
+            return cached[0]
+
+        messages = cached[0] if cached else []
+        if self.redis is not None:
+            key = CONVERSATION_KEY_PREFIX + session_id
+            try:
+                length = await self.redis.llen(key)
+                if length > len(messages):
+                    tail = await self.redis.lrange(key, len(messages), -1)
+                    messages = messages + [loads(item) for item in tail]
+                elif length < len(messages):
+                    # Expired or deleted elsewhere; Redis is the source of truth
+                    messages = [loads(item) for item in await self.redis.lrange(key, 0, -1)]
+            except Exception as e:
+                logger.warning(f"Failed to load conversation {session_id} from Redis: {str(e)}")
+        self._remember(session_id, messages, now)
+        return messages
+
+    async def seq(self, session_id: str) -> int:
+        """The sequence number a client is acknowledged at."""
+        return len(await self.load(session_id))
+
+    async def append(self, session_id: str, messages: List[Message], base_seq: Optional[int] = None) -> int:
+        """Log new messages and return the session's new sequence number.
+
+        Raises:
+            SequenceMismatch: If base_seq is given and isn't the current seq,
+                or, without it, other workers kept appending first
+            ValueError: If messages aren't valid (see validate_messages)
+        """
+        validate_messages(messages)
+        new = [{"role": message.get("role", "user"), "content": message["content"]} for message in messages]
+        for _ in range(APPEND_ATTEMPTS):
+            history = await self.load(session_id)
+            if base_seq is not None and base_seq != len(history):
+                raise SequenceMismatch(len(history), base_seq)
+            if not new:
+                return len(history)
+            if await self._append_shared(session_id, len(history), new):
+                history.extend(new)
+                self._remember(session_id, history, time.monotonic())
+                return len(history)
+            # Another worker appended since this one last read; the next
+            # load fetches what it added
+            self._remember(session_id, history, float("-inf"))
+        raise SequenceMismatch(len(await self.load(session_id)), len(history))
+
+    async def _append_shared(self, session_id: str, expected: int, new: List[Message]) -> bool:
+        # False only when Redis holds a different number of messages; if
+        # Redis is unavailable the local tier carries on alone
+        if self._append_script is None:
+            return True
+        try:
+            appended, _ = await self._append_script(
+                keys=[CONVERSATION_KEY_PREFIX + session_id],
+                args=[expected, self.ttl] + [dumps(message) for message in new]
+            )
+        except Exception as e:
+            logger.warning(f"Failed to append to conversation {session_id} in Redis: {str(e)}")
+            return True
+        return bool(appended)
+
+    async def delete(self, session_id: str) -> None:
+        """Forget a session's messages in both tiers."""
+        self._local.pop(session_id, None)
+        if self.redis is not None:
+            await self.redis.delete(CONVERSATION_KEY_PREFIX + session_id)
+
+    def _remember(self, session_id: str, messages: List[Message], loaded_at: float) -> None:
+        self._local[session_id] = (messages, loaded_at)
+        self._local.move_to_end(session_id)
+        while len(self._local) > self.max_sessions:
+            self._local.popitem(last=False)
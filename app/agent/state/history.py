@@ -0,0 +1,118 @@
+import asyncio
+import logging
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Tuple
+
+from agent.state.store import SessionStateStore
+from agent.state.workshop_state import WorkshopState
+
+logger = logging.getLogger(__name__)
+
+HISTORY_TOKEN_BUDGET = int(os.environ.get("HISTORY_TOKEN_BUDGET", "1500"))
+
+# Summarizes (previous summary, older messages) into a new summary
+Summarizer = Callable[[str, List[Dict[str, Any]]], Awaitable[str]]
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count; about four characters per token for English."""
+    return len(text) // 4 + 1
+
+class HistoryManager:
+    """Keeps the conversation sent to the LLM within a token budget.
+
+    The most recent turns that fit in the budget are sent verbatim. Turns
+    that fall out of the window are compacted into a per-section summary by
+    a background task, off the response path, and the summary is stored in
+    the session's state so later turns reuse it.
+    """
+
+    def __init__(
+        self,
+        store: SessionStateStore,
+        summarize: Summarizer,
+        token_budget: int = HISTORY_TOKEN_BUDGET
+    ):
+        self.store = store
+        self.summarize = summarize
+        self.token_budget = token_budget
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def window(self, messages: List[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], int]:
+        """Select the most recent messages that fit in the token budget.
+
+        Returns:
+            The windowed messages and the index where the window starts
+        """
+        used = 0
+        start = len(messages)
+        while start > 0:
+            tokens = estimate_tokens(str(messages[start - 1].get("content", "")))
+            if used + tokens > self.token_budget:
+                break
+            used += tokens
+            start -= 1
+        # Messages already in {"role", "content"} form (e.g. from the
+        # conversation log) are shared rather than copied
+        window = [
+            message if len(message) == 2 and "role" in message and "content" in message
+            else {"role": message.get("role", "user"), "content": message.get("content", "")}
+            for message in messages[start:]
+        ]
+        return window, start
+
+    def build_history(
+        self,
+        session_id: str,
+        state: WorkshopState,
+        messages: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Build the bounded history to send before the latest user message.
+
+        Args:
+            session_id: Session the turn belongs to
+            state: The session's current state
+            messages: Full conversation, ending with the latest user message
+
+        Returns:
+            The section summary (if any) followed by the recent window
+        """
+        prior = messages[:-1]
+        window, start = self.window(prior)
+        if start > state.summarized_upto:
+            self.schedule_summary(session_id, state.current_section_name, prior[state.summarized_upto:start], start)
+
+        history = []
+        summary = state.summaries.get(state.current_section_name)
+        if summary:
+            history.append({
+                "role": "system",
+                "content": f"Summary of the earlier discussion in this section: {summary}"
+            })
+        return history + window
+
+    def schedule_summary(
+        self,
+        session_id: str,
+        section: str,
+        older: List[Dict[str, Any]],
+        upto: int
+    ) -> None:
+        """Compact older messages into the section summary in the background."""
+        running = self._tasks.get(session_id)
+        if running is not None and not running.done():
+            return
+        task = asyncio.ensure_future(self._summarize(session_id, section, older, upto))
+        self._tasks[session_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(session_id, None))
+
+    async def _summarize(self, session_id: str, section: str, older: List[Dict[str, Any]], upto: int) -> None:
+        try:
+            state = await self.store.load(session_id)
+            summary = await self.summarize(state.summaries.get(section, ""), older)
+            # Reload so progress made while summarizing isn't overwritten
+            state = await self.store.load(session_id)
+            state.summaries[section] = summary
+            state.summarized_upto = max(state.summarized_upto, upto)
+            await self.store.save(session_id, state)
+        except Exception as e:
+            logger.warning(f"Failed to summarize history for session {session_id}: {str(e)}")
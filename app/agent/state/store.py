@@ -0,0 +1,112 @@
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Tuple, Union
+
+from agent.observability.tracing import tracer
+from agent.state.workshop_state import WorkshopState
+
+logger = logging.getLogger(__name__)
+
+SESSION_KEY_PREFIX = "workshop-state:"
+SESSION_LRU_SIZE = int(os.environ.get("SESSION_LRU_SIZE", "1024"))
+# How long a session may be served from this worker's memory before it is
+# re-read from Redis. Sessions are normally routed to one worker, so this only
+# bounds staleness when a session moves between workers.
+SESSION_LOCAL_TTL = float(os.environ.get("SESSION_LOCAL_TTL", "2"))
+SESSION_TTL = int(os.environ.get("SESSION_TTL", str(24 * 60 * 60)))
+DEFAULT_SESSION_ID = "default"
+
+def session_key(session: Union[Dict[str, Any], str, None]) -> str:
+    """Derive the store key from the ``session`` sent with a request."""
+    if isinstance(session, str) and session:
+        return session
+    if isinstance(session, dict):
+        for field in ("session_id", "id"):
+            if session.get(field):
+                return str(session[field])
+    return DEFAULT_SESSION_ID
+
+class SessionStateStore:
+    """Session-keyed WorkshopState store.
+
+    Keeps recently used sessions in an in-process LRU tier and writes through
+    to Redis so every worker and replica sees the same progress. Without a
+    Redis client the store is purely in-process.
+    """
+
+    def __init__(
+        self,
+        redis_client=None,
+        max_sessions: int = SESSION_LRU_SIZE,
+        local_ttl: float = SESSION_LOCAL_TTL,
+        ttl: int = SESSION_TTL
+    ):
+        self.redis = redis_client
+        self.max_sessions = max_sessions
+        self.local_ttl = local_ttl
+        self.ttl = ttl
+        self._local: "OrderedDict[str, Tuple[WorkshopState, float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._local)
+
+    async def load(self, session_id: str) -> WorkshopState:
+        """Return the state for a session, creating a fresh one if unknown."""
+        cached = self._local.get(session_id)
+        now = time.monotonic()
+        if cached and (self.redis is None or now - cached[1] < self.local_ttl):
+            self._local.move_to_end(session_id)
+            return cached[0]
+
+        state = None
+        if self.redis is not None:
+            try:
+                with tracer.span("redis.get", key="session"):
+                    payload = await self.redis.get(SESSION_KEY_PREFIX + session_id)
+                if payload:
+                    state = WorkshopState.deserialize(payload)
+            except Exception as e:
+                logger.warning(f"Failed to load session {session_id} from Redis: {str(e)}")
+
+        if state is None:
+            state = cached[0] if cached else WorkshopState()
+        self._remember(session_id, state, now)
+        return state
+
+    async def save(self, session_id: str, state: WorkshopState) -> None:
+        """Store a session's state in both tiers."""
+        self._remember(session_id, state, time.monotonic())
+        if self.redis is None:
+            return
+        try:
+            with tracer.span("redis.set", key="session"):
+                await self.redis.set(SESSION_KEY_PREFIX + session_id, state.serialize(), ex=self.ttl)
+        except Exception as e:
+            logger.warning(f"Failed to save session {session_id} to Redis: {str(e)}")
+
+    async def delete(self, session_id: str) -> None:
+        """Forget a session in both tiers."""
+        self._local.pop(session_id, None)
+        if self.redis is not None:
+            await self.redis.delete(SESSION_KEY_PREFIX + session_id)
+
+    async def close(self) -> None:
+        """Close the Redis tier's connections."""
+        if self.redis is not None:
+            await self.redis.close()
+
+    def _remember(self, session_id: str, state: WorkshopState, loaded_at: float) -> None:
+        self._local[session_id] = (state, loaded_at)
+        self._local.move_to_end(session_id)
+        while len(self._local) > self.max_sessions:
+            self._local.popitem(last=False)
+
+def create_session_store() -> SessionStateStore:
+    """Create the session store configured by the environment."""
+    if os.environ.get("SESSION_STORE_BACKEND", "redis") != "redis":
+        return SessionStateStore()
+
+    from agent.utils.redis_pool import get_redis_client
+    return SessionStateStore(get_redis_client())
@@ -0,0 +1,217 @@
+import struct
+from collections.abc import MutableMapping
+from enum import IntEnum
+from typing import Dict, Any, Iterator, Optional
+
+from agent.utils.serialization import dumps, loads
+
+SECTIONS = [
+    "introduction",
+    "key_concepts",
+    "scenario_discussion",
+    "population_data",
+    "community_resources",
+    "health_inequalities",
+    "checklist_practice",
+    "service_user_journey",
+    "policy_review",
+    "assessment_tools",
+    "cultural_formulation",
+    "presenting_issues",
+    "intervention_adaptation",
+    "role_play",
+    "risk_assessment",
+    "risk_management",
+    "cultural_broker",
+    "rehabilitation_programs",
+    "spirituality_guidelines",
+    "discharge_planning",
+    "staff_assessment",
+    "training_program",
+    "recruitment_retention",
+    "performance_indicators",
+    "feedback_methods",
+    "action_planning",
+    "conclusion"
+]
+
+# Sections by position, shared by every session; a section's value is its
+# bit in WorkshopState.completed
+Section = IntEnum("Section", {name.upper(): index for index, name in enumerate(SECTIONS)})
+SECTION_INDEX = {name: index for index, name in enumerate(SECTIONS)}
+ALL_SECTIONS = (1 << len(SECTIONS)) - 1
+
+class InputKind(IntEnum):
+    """Kinds of participant input counted per session."""
+
+    COMMENT = 0
+    QUESTION = 1
+    REFLECTION = 2
+    BREAKOUT = 3
+
+NO_INPUTS = (0,) * len(InputKind)
+MAX_INPUT_COUNT = 0xFFFF
+
+# Binary session encoding: format version, current section, summarized_upto,
+# the completion bits and the input counters, then JSON for the rarely set
+# fields, if any. Payloads of the to_dict() JSON shape start with "{".
+_BINARY_FORMAT = 2
+_HEADER = struct.Struct("<BBI")
+_FLAG_BYTES = (len(SECTIONS) + 7) // 8
+_COUNTS = struct.Struct("<%dH" % len(InputKind))
+
+class CompletionStatus(MutableMapping):
+    """Section name -> completed view over a state's completion bits."""
+
+    __slots__ = ("state",)
+
+    def __init__(self, state: "WorkshopState"):
+        self.state = state
+
+    def __getitem__(self, section: str) -> bool:
+        return bool(self.state.completed >> SECTION_INDEX[section] & 1)
+
+    def __setitem__(self, section: str, complete: bool) -> None:
+        self.state.mark_complete(section, complete)
+
+    def __delitem__(self, section: str) -> None:
+        self.state.mark_complete(section, False)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(SECTIONS)
+
+    def __len__(self) -> int:
+        return len(SECTIONS)
+
+class WorkshopState:
+    """Progress of a single workshop session.
+
+    Completion is a bitset indexed by Section and participant input is
+    kept as small counters indexed by InputKind; the section list itself
+    is shared by every session. What participants actually said lives in
+    the conversation and the section summaries, not here.
+    """
+
+    # Thousands are resident at once in the session store's LRU
+    __slots__ = (
+        "current_section",
+        "completed",
+        "input_counts",
+        "current_discussion",
+        "summaries",
+        "summarized_upto"
+    )
+
+    sections = SECTIONS
+
+    def __init__(self):
+        self.current_section = 0
+        self.completed = 0
+        self.input_counts = NO_INPUTS
+        self.current_discussion = None
+        # Rolling per-section summaries of turns outside the history window
+        self.summaries = {}
+        self.summarized_upto = 0
+
+    @property
+    def current_section_name(self) -> str:
+        """Name of the section currently being facilitated."""
+        return self.sections[max(self.current_section - 1, 0)]
+
+    @property
+    def completion_status(self) -> CompletionStatus:
+        """Completion by section name, backed by the bitset."""
+        return CompletionStatus(self)
+
+    def is_complete(self, section: str) -> bool:
+        """Whether a section has been completed."""
+        return bool(self.completed >> SECTION_INDEX[section] & 1)
+
+    def mark_complete(self, section: str, complete: bool = True) -> None:
+        """Set or clear a section's completion bit."""
+        bit = 1 << SECTION_INDEX[section]
+        self.completed = self.completed | bit if complete else self.completed & ~bit
+
+    def record_input(self, kind: InputKind, count: int = 1) -> None:
+        """Count participant input of one kind."""
+        counts = list(self.input_counts)
+        counts[kind] = min(counts[kind] + count, MAX_INPUT_COUNT)
+        self.input_counts = tuple(counts)
+
+    def next_incomplete(self) -> Optional[str]:
+        """The first section not yet completed, or None once all are."""
+        remaining = ~self.completed & ALL_SECTIONS
+        if not remaining:
+            return None
+        # Lowest set bit
+        return SECTIONS[(remaining & -remaining).bit_length() - 1]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Compact representation that omits default values."""
+        data: Dict[str, Any] = {"c": self.current_section}
+        if self.completed:
+            data["d"] = self.completed
+        if self.input_counts != NO_INPUTS:
+            data["i"] = list(self.input_counts)
+        data.update(self._extras())
+        if self.summaries:
+            data["u"] = self.summarized_upto
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "WorkshopState":
+        """Rebuild a state from its compact representation."""
+        state = cls()
+        state.current_section = data.get("c", 0)
+        state.completed = data.get("d", 0)
+        counts = data.get("i")
+        if counts:
+            state.input_counts = tuple(counts[:len(InputKind)]) + NO_INPUTS[len(counts):]
+        state.summarized_upto = data.get("u", 0)
+        state._load_extras(data)
+        return state
+
+    def serialize(self) -> bytes:
+        """Encode the state for the shared session store."""
+        payload = _HEADER.pack(_BINARY_FORMAT, self.current_section, self.summarized_upto)
+        payload += self.completed.to_bytes(_FLAG_BYTES, "little")
+        payload += _COUNTS.pack(*self.input_counts)
+        extras = self._extras()
+        if extras:
+            payload += dumps(extras)
+        return payload
+
+    @classmethod
+    def deserialize(cls, payload: Optional[bytes]) -> "WorkshopState":
+        """Decode a state produced by serialize().
+
+        Raises:
+            ValueError: If the payload is in neither the binary nor the JSON format
+        """
+        if not payload:
+            return cls()
+        if payload[:1] == b"{":
+            return cls.from_dict(loads(payload))
+        if payload[0] != _BINARY_FORMAT:
+            raise ValueError(f"Unknown session state format {payload[0]}")
+        state = cls()
+        _, state.current_section, state.summarized_upto = _HEADER.unpack_from(payload)
+        start = _HEADER.size + _FLAG_BYTES
+        state.completed = int.from_bytes(payload[_HEADER.size:start], "little")
+        state.input_counts = _COUNTS.unpack_from(payload, start)
+        start += _COUNTS.size
+        if len(payload) > start:
+            state._load_extras(loads(payload[start:]))
+        return state
+
+    def _extras(self) -> Dict[str, Any]:
+        extras: Dict[str, Any] = {}
+        if self.current_discussion is not None:
+            extras["x"] = self.current_discussion
+        if self.summaries:
+            extras["s"] = self.summaries
+        return extras
+
+    def _load_extras(self, data: Dict[str, Any]) -> None:
+        self.current_discussion = data.get("x")
+        self.summaries = data.get("s", {})
@@ -1,21 +1,30 @@
-# Previously created work# app/agent/tools/workshop_tools.py
+# app/agent/tools/workshop_tools.py
 from typing import Dict, List, Optional
 import time
+import uuid
 from xrx_agent_framework import observability_decorator
+from agent.observability.tracing import tracer
+from agent.runtime.events import event_sink
+from agent.runtime.timers import timer_scheduler
 
 @observability_decorator(name="start_discussion")
-def start_discussion(topic: str, duration: int = 180) -> dict:
+@tracer.traced("tool.start_discussion")
+def start_discussion(topic: str, duration: int = 180, session_id: str = "default") -> dict:
     """
     Start a timed discussion on a specific topic.
     
     Args:
         topic (str): The discussion topic
         duration (int): Duration in seconds (default: 180 seconds / 3 minutes)
+        session_id (str): Session whose stream receives the time alerts
     
     Returns:
         dict: Discussion details including topic and remaining time
     """
+    discussion_id = uuid.uuid4().hex[:12]
+    timer_scheduler.start_timer(session_id, discussion_id, duration, [duration - 60])
     return {
+        "discussion_id": discussion_id,
         "topic": topic,
         "start_time": time.time(),
         "duration": duration,
@@ -23,24 +32,26 @@ def start_discussion(topic: str, duration: int = 180) -> dict:
     }
 
 @observability_decorator(name="check_discussion_time")
-def check_discussion_time(discussion_id: str) -> dict:
+@tracer.traced("tool.check_discussion_time")
+def check_discussion_time(discussion_id: str, session_id: str = "default") -> dict:
     """
     Check remaining time in the current discussion.
     
     Args:
         discussion_id (str): The discussion identifier
+        session_id (str): Session the discussion belongs to
     
     Returns:
-        dict: Time remaining and status
+        dict: Time remaining in seconds and status
     """
-    # In a real implementation, this would fetch from a database
-    current_time = time.time()
+    time_remaining = timer_scheduler.time_remaining(session_id, discussion_id)
     return {
-        "time_remaining": "Time check placeholder",
-        "status": "active"
+        "time_remaining": time_remaining,
+        "status": "active" if time_remaining else "ended"
     }
 
 @observability_decorator(name="record_participant_input")
+@tracer.traced("tool.record_participant_input")
 def record_participant_input(participant_id: str, input_type: str, content: str) -> dict:
     """
     Record participant input during discussions.
@@ -53,15 +64,18 @@ def record_participant_input(participant_id: str, input_type: str, content: str)
     Returns:
         dict: Confirmation of recording
     """
-    return {
+    record = {
         "participant_id": participant_id,
         "input_type": input_type,
         "content": content,
         "timestamp": time.time(),
         "status": "recorded"
     }
+    event_sink.emit("participant_input", record)
+    return record
 
 @observability_decorator(name="show_visual_aid")
+@tracer.traced("tool.show_visual_aid")
 def show_visual_aid(aid_type: str, content: Dict) -> dict:
     """
     Display a visual aid during the workshop.
@@ -88,6 +102,7 @@ def show_visual_aid(aid_type: str, content: Dict) -> dict:
     }
 
 @observability_decorator(name="manage_breakout")
+@tracer.traced("tool.manage_breakout")
 def manage_breakout(groups: List[Dict], duration: int = 180) -> dict:
     """
     Manage breakout sessions during the workshop.
@@ -107,6 +122,7 @@ def manage_breakout(groups: List[Dict], duration: int = 180) -> dict:
     }
 
 @observability_decorator(name="track_completion")
+@tracer.traced("tool.track_completion")
 def track_completion(section: str, status: bool) -> dict:
     """
     Track completion status of workshop sections.
@@ -118,13 +134,16 @@ def track_completion(section: str, status: bool) -> dict:
     Returns:
         dict: Updated completion status
     """
-    return {
+    record = {
         "section": section,
         "completed": status,
         "timestamp": time.time()
     }
+    event_sink.emit("completion", record)
+    return record
 
 @observability_decorator(name="collect_feedback")
+@tracer.traced("tool.collect_feedback")
 def collect_feedback(section: str, rating: int, comments: Optional[str] = None) -> dict:
     """
     Collect participant feedback for workshop sections.
@@ -143,30 +162,37 @@ def collect_feedback(section: str, rating: int, comments: Optional[str] = None)
             "message": "Rating must be between 1 and 5"
         }
         
-    return {
+    record = {
         "section": section,
         "rating": rating,
         "comments": comments,
         "timestamp": time.time(),
         "status": "received"
     }
+    event_sink.emit("feedback", record)
+    return record
 
 @observability_decorator(name="set_timer")
-def set_timer(duration: int, alert_at: Optional[List[int]] = None) -> dict:
+@tracer.traced("tool.set_timer")
+def set_timer(duration: int, alert_at: Optional[List[int]] = None, session_id: str = "default") -> dict:
     """
     Set a timer for workshop activities.
     
     Args:
         duration (int): Total duration in seconds
         alert_at (List[int], optional): List of times (in seconds) to send alerts
+        session_id (str): Session whose stream receives the alerts
     
     Returns:
         dict: Timer configuration details
     """
     if alert_at is None:
         alert_at = [duration // 2, duration - 60]  # Alert at halfway and 1 minute remaining
-        
+    
+    timer_id = uuid.uuid4().hex[:12]
+    timer_scheduler.start_timer(session_id, timer_id, duration, alert_at)
     return {
+        "timer_id": timer_id,
         "duration": duration,
         "alert_at": alert_at,
         "start_time": time.time(),
@@ -174,6 +200,7 @@ def set_timer(duration: int, alert_at: Optional[List[int]] = None) -> dict:
     }
 
 @observability_decorator(name="record_action_item")
+@tracer.traced("tool.record_action_item")
 def record_action_item(item: str, assigned_to: str, deadline: str) -> dict:
     """
     Record action items from the workshop.
@@ -186,15 +213,18 @@ def record_action_item(item: str, assigned_to: str, deadline: str) -> dict:
     Returns:
         dict: Action item details
     """
-    return {
+    record = {
         "item": item,
         "assigned_to": assigned_to,
         "deadline": deadline,
         "status": "pending",
         "created_at": time.time()
     }
+    event_sink.emit("action_item", record)
+    return record
 
 @observability_decorator(name="manage_resources")
+@tracer.traced("tool.manage_resources")
 def manage_resources(resource_type: str, content: Dict) -> dict:
     """
     Manage workshop resources and materials.
@@ -218,4 +248,4 @@ def manage_resources(resource_type: str, content: Dict) -> dict:
         "content": content,
         "status": "available",
         "timestamp": time.time()
-    }shop_tools.py content
+    }
@@ -1,15 +1,35 @@
 from .llm import (
     initialize_llm_client,
+    close_llm_client,
+    stream_chat_completion,
     create_system_prompt,
     process_llm_response,
     format_facilitator_response,
     generate_activity_prompt
 )
+from .llm_scheduler import LLMScheduler, Priority, llm_scheduler
+from .prompts import PromptCache, prompt_cache
+from .serialization import EncodedJSON, JSON_BACKEND
+from .streaming import (
+    SentenceBuffer,
+    encode_frame
+)
 
 __all__ = [
     'initialize_llm_client',
+    'close_llm_client',
+    'stream_chat_completion',
     'create_system_prompt',
     'process_llm_response',
     'format_facilitator_response',
-    'generate_activity_prompt'
+    'generate_activity_prompt',
+    'LLMScheduler',
+    'Priority',
+    'llm_scheduler',
+    'PromptCache',
+    'prompt_cache',
+    'EncodedJSON',
+    'JSON_BACKEND',
+    'SentenceBuffer',
+    'encode_frame'
 ]
\ No newline at end of file
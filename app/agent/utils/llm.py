@@ -1,17 +1,108 @@
 import os
-from openai import OpenAI
-from typing import List, Dict, Any
+import time
+import httpx
+from openai import AsyncOpenAI
+from typing import List, Dict, Any, AsyncIterator, Optional
 
-def initialize_llm_client() -> OpenAI:
-    """Initialize and return the LLM client."""
-    return OpenAI(
+from agent.observability.metrics import LLM_QUEUE_WAIT_SECONDS, LLM_TIME_TO_FIRST_TOKEN_SECONDS
+from agent.observability.tracing import tracer
+from agent.utils.llm_scheduler import Priority, estimate_request_tokens, llm_scheduler
+
+# Connection pool and timeout settings for the LLM HTTP transport
+LLM_MAX_CONNECTIONS = int(os.environ.get("LLM_MAX_CONNECTIONS", "100"))
+LLM_MAX_KEEPALIVE_CONNECTIONS = int(os.environ.get("LLM_MAX_KEEPALIVE_CONNECTIONS", "20"))
+LLM_KEEPALIVE_EXPIRY = float(os.environ.get("LLM_KEEPALIVE_EXPIRY", "30"))
+LLM_CONNECT_TIMEOUT = float(os.environ.get("LLM_CONNECT_TIMEOUT", "5"))
+LLM_REQUEST_TIMEOUT = float(os.environ.get("LLM_REQUEST_TIMEOUT", "60"))
+LLM_MAX_RETRIES = int(os.environ.get("LLM_MAX_RETRIES", "2"))
+
+def initialize_llm_client() -> AsyncOpenAI:
+    """Initialize and return the async LLM client.
+    
+    The client shares one pooled, keep-alive HTTP transport across all
+    sessions, so concurrent turns overlap their LLM waits on the event loop.
+    """
+    http_client = httpx.AsyncClient(
+        limits=httpx.Limits(
+            max_connections=LLM_MAX_CONNECTIONS,
+            max_keepalive_connections=LLM_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=LLM_KEEPALIVE_EXPIRY
+        ),
+        timeout=httpx.Timeout(LLM_REQUEST_TIMEOUT, connect=LLM_CONNECT_TIMEOUT)
+    )
+    return AsyncOpenAI(
         api_key=os.environ["LLM_API_KEY"],
-        base_url=os.environ["LLM_BASE_URL"]
+        base_url=os.environ["LLM_BASE_URL"],
+        http_client=http_client,
+        max_retries=LLM_MAX_RETRIES
     )
 
-def create_system_prompt(section: str, context: Dict = None) -> str:
-    """Create a system prompt for the workshop facilitator."""
-    base_prompt = """
+async def close_llm_client(client: AsyncOpenAI) -> None:
+    """Close the LLM client and release its pooled connections."""
+    await client.close()
+
+async def stream_chat_completion(
+    client: AsyncOpenAI,
+    messages: List[Dict[str, Any]],
+    timeout: Optional[float] = None,
+    priority: Priority = Priority.LIVE,
+    **kwargs
+) -> AsyncIterator[str]:
+    """Stream a chat completion and yield its text deltas.
+    
+    The call waits for a slot from the shared LLM scheduler, which caps
+    in-flight calls and applies rate limits, and holds it until the stream
+    ends.
+    
+    Args:
+        client: Async LLM client
+        messages: Chat messages to send
+        timeout: Per-call timeout in seconds (defaults to LLM_REQUEST_TIMEOUT)
+        priority: Scheduling class; live replies go ahead of background work
+        **kwargs: Extra completion parameters such as temperature
+        
+    Yields:
+        Non-empty text deltas in arrival order
+    """
+    estimated_tokens = estimate_request_tokens(messages, kwargs.get("max_tokens"))
+    output_chars = 0
+    with tracer.span("llm.completion", priority=priority.name, estimated_tokens=estimated_tokens) as span:
+        queued_at = time.perf_counter()
+        async with llm_scheduler.slot(priority, estimated_tokens):
+            started_at = time.perf_counter()
+            span.set_attribute("queue_ms", (started_at - queued_at) * 1000)
+            LLM_QUEUE_WAIT_SECONDS.observe(started_at - queued_at, priority=priority.name.lower())
+            stream = await client.chat.completions.create(
+                model=os.environ['LLM_MODEL_ID'],
+                messages=messages,
+                stream=True,
+                timeout=timeout if timeout is not None else LLM_REQUEST_TIMEOUT,
+                **kwargs
+            )
+            first_token_at = None
+            try:
+                async for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        if first_token_at is None:
+                            first_token_at = time.perf_counter()
+                            span.add_event("first_token")
+                            span.set_attribute("ttft_ms", (first_token_at - started_at) * 1000)
+                            LLM_TIME_TO_FIRST_TOKEN_SECONDS.observe(first_token_at - started_at, priority=priority.name.lower())
+                        output_chars += len(delta)
+                        yield delta
+            finally:
+                # Release the pooled connection even if the consumer stops early
+                await stream.response.aclose()
+                used_tokens = estimate_request_tokens(messages, output_chars // 4)
+                llm_scheduler.settle(estimated_tokens, used_tokens)
+                if first_token_at is not None:
+                    span.set_attribute("generation_ms", (time.perf_counter() - first_token_at) * 1000)
+                span.set_attribute("output_chars", output_chars)
+
+BASE_PROMPT = """
     You are an expert cultural competency workshop facilitator for forensic mental health services. 
     Your role is to guide participants through discussions and activities professionally and engagingly.
     Maintain a supportive, inclusive tone while ensuring discussions stay focused and productive.
@@ -23,30 +114,32 @@ def create_system_prompt(section: str, context: Dict = None) -> str:
     - Manage sensitive topics professionally
     - Support learning through practical examples
     """
-    
-    section_prompts = {
-        "introduction": """
+
+SECTION_PROMPTS = {
+    "introduction": """
         Focus on creating a welcoming atmosphere and establishing workshop expectations.
         Encourage brief introductions and highlight the importance of cultural competency in forensic settings.
         """,
-        
-        "key_concepts": """
+    
+    "key_concepts": """
         Explain core concepts clearly, using practical examples from forensic mental health.
         Encourage participants to share their understanding and experiences.
         """,
-        
-        "scenario_discussion": """
+    
+    "scenario_discussion": """
         Guide analysis of case scenarios, highlighting cultural factors and their impact.
         Help participants identify potential biases and cultural safety considerations.
         """,
-        
-        "population_data": """
+    
+    "population_data": """
         Facilitate discussion of demographic data and its implications.
         Help participants understand patterns and disparities in service use.
         """
-    }
-    
-    prompt = f"{base_prompt}\n\nCurrent Section Focus: {section_prompts.get(section, '')}\n"
+}
+
+def create_system_prompt(section: str, context: Dict = None) -> str:
+    """Create a system prompt for the workshop facilitator."""
+    prompt = f"{BASE_PROMPT}\n\nCurrent Section Focus: {SECTION_PROMPTS.get(section, '')}\n"
     
     if context:
         prompt += f"\nAdditional Context: {context}"
@@ -0,0 +1,162 @@
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+# 0 disables the corresponding rate limit
+LLM_MAX_CONCURRENCY = int(os.environ.get("LLM_MAX_CONCURRENCY", "64"))
+LLM_REQUESTS_PER_MINUTE = float(os.environ.get("LLM_REQUESTS_PER_MINUTE", "0"))
+LLM_TOKENS_PER_MINUTE = float(os.environ.get("LLM_TOKENS_PER_MINUTE", "0"))
+
+class Priority(IntEnum):
+    """Scheduling class of an LLM call; lower values go first."""
+    LIVE = 0
+    BREAKOUT = 1
+    BACKGROUND = 2
+
+def estimate_request_tokens(messages: List[Dict[str, Any]], max_tokens: Optional[int] = None) -> int:
+    """Rough token cost of a call: about four characters per token."""
+    prompt_chars = sum(len(str(message.get("content", ""))) for message in messages)
+    return prompt_chars // 4 + (max_tokens if max_tokens is not None else 256)
+
+class TokenBucket:
+    """Token bucket refilled continuously at rate_per_minute.
+
+    Taking more than is available drives the balance negative and returns
+    how long the caller must wait, so reservations are granted in the
+    order they are made.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    def take(self, amount: float) -> float:
+        """Reserve amount tokens and return the seconds to wait before using them."""
+        self._refill()
+        self._tokens -= amount
+        if self._tokens >= 0:
+            return 0.0
+        return -self._tokens / self.rate
+
+    def refund(self, amount: float) -> None:
+        """Return tokens that a call reserved but did not use."""
+        self._refill()
+        self._tokens = min(self.capacity, self._tokens + amount)
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+class LLMScheduler:
+    """Admission control for LLM calls across every session in the worker.
+
+    At most max_concurrency calls are in flight. Further calls queue and
+    are admitted by priority, then arrival order, so live voice replies
+    overtake queued summaries. Admitted calls also wait on request and
+    token rate limits when those are configured.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        requests_per_minute: float = LLM_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = LLM_TOKENS_PER_MINUTE
+    ):
+        self.max_concurrency = max_concurrency
+        self.requests = TokenBucket(requests_per_minute) if requests_per_minute > 0 else None
+        self.tokens = TokenBucket(tokens_per_minute) if tokens_per_minute > 0 else None
+        self.in_flight = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._queued = {priority: 0 for priority in Priority}
+        self._admitted = {priority: 0 for priority in Priority}
+        self._wait_total = {priority: 0.0 for priority in Priority}
+        self._wait_max = {priority: 0.0 for priority in Priority}
+
+    @asynccontextmanager
+    async def slot(self, priority: Priority = Priority.LIVE, estimated_tokens: int = 0) -> AsyncIterator[None]:
+        """Hold one in-flight slot for the duration of a call."""
+        queued_at = time.monotonic()
+        await self._acquire(priority)
+        try:
+            delay = 0.0
+            if self.requests is not None:
+                delay = max(delay, self.requests.take(1))
+            if self.tokens is not None and estimated_tokens:
+                delay = max(delay, self.tokens.take(estimated_tokens))
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._record_wait(priority, time.monotonic() - queued_at)
+            yield
+        finally:
+            self._release()
+
+    def settle(self, estimated_tokens: int, used_tokens: int) -> None:
+        """Correct the token budget once a call's real size is known."""
+        if self.tokens is not None and estimated_tokens > used_tokens:
+            self.tokens.refund(estimated_tokens - used_tokens)
+        elif self.tokens is not None and used_tokens > estimated_tokens:
+            self.tokens.take(used_tokens - estimated_tokens)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, in-flight calls and wait times per priority class."""
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrency": self.max_concurrency,
+            "queue_depth": sum(self._queued.values()),
+            "classes": {
+                priority.name.lower(): {
+                    "queued": self._queued[priority],
+                    "admitted": self._admitted[priority],
+                    "wait_seconds_total": self._wait_total[priority],
+                    "wait_seconds_max": self._wait_max[priority]
+                }
+                for priority in Priority
+            }
+        }
+
+    async def _acquire(self, priority: Priority) -> None:
+        if self.in_flight < self.max_concurrency and not self._waiters:
+            self.in_flight += 1
+            return
+        waiter = asyncio.get_event_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._seq), waiter))
+        self._queued[priority] += 1
+        self._dispatch()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Admitted just as we were cancelled: hand the slot on
+                self._release()
+            raise
+        finally:
+            self._queued[priority] -= 1
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        # Cancelled waiters stay in the heap until they reach the top
+        while self._waiters and self.in_flight < self.max_concurrency:
+            _, _, waiter = heapq.heappop(self._waiters)
+            if waiter.done():
+                continue
+            self.in_flight += 1
+            waiter.set_result(None)
+
+    def _record_wait(self, priority: Priority, waited: float) -> None:
+        self._admitted[priority] += 1
+        self._wait_total[priority] += waited
+        self._wait_max[priority] = max(self._wait_max[priority], waited)
+
+llm_scheduler = LLMScheduler()
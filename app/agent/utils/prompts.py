@@ -0,0 +1,95 @@
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+from agent.utils.llm import BASE_PROMPT, SECTION_PROMPTS
+
+RESPONSE_GUIDANCE = """
+    Based on the workshop content and the participant's message, provide an appropriate facilitator response.
+    Keep the response engaging and interactive while maintaining professional tone.
+    """
+
+def build_section_prefix(section_name: str, section=None) -> str:
+    """Build the static system prompt for a section.
+
+    Only content that is fixed for the section goes here. Anything that
+    changes per turn belongs in the messages after it, so the provider can
+    reuse its cached processing of this prefix across turns and sessions.
+    """
+    parts = [BASE_PROMPT, f"Current Section Focus: {SECTION_PROMPTS.get(section_name, '')}"]
+    if section is not None:
+        parts.append(f"Current section: {section.title}")
+        if section.content.get("content"):
+            parts.append(f"Section overview: {section.content['content']}")
+        if section.content.get("key_topics"):
+            parts.append("Key topics: " + "; ".join(section.content["key_topics"]))
+    parts.append(RESPONSE_GUIDANCE)
+    return "\n".join(parts)
+
+class PromptCache:
+    """Precomputed, interned system prompt prefixes per section.
+
+    Prefixes are keyed by section name and content version, so an edit to
+    workshop_content.json produces new prefixes while identical turns keep
+    sending byte-identical ones.
+    """
+
+    def __init__(self):
+        self._prefixes: Dict[Tuple[str, str], str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.prefix_chars = 0
+        self.suffix_chars = 0
+
+    def warm(self, snapshot) -> None:
+        """Precompute the prefix of every section in a content snapshot."""
+        for name, section in snapshot.sections.items():
+            self._store(name, section, snapshot.version)
+
+    def prefix(self, section_name: str, section, version: str) -> str:
+        """Get the static system prompt for a section at a content version."""
+        prefix = self._prefixes.get((section_name, version))
+        if prefix is not None:
+            self.hits += 1
+            return prefix
+        self.misses += 1
+        return self._store(section_name, section, version)
+
+    def build_messages(
+        self,
+        section_name: str,
+        section,
+        version: str,
+        user_message: str,
+        history: Optional[List[Dict[str, Any]]] = None
+    ) -> List[Dict[str, Any]]:
+        """Assemble the static prefix followed by the per-turn suffix."""
+        prefix = self.prefix(section_name, section, version)
+        messages = [{"role": "system", "content": prefix}]
+        if history:
+            messages.extend(history)
+        messages.append({"role": "user", "content": user_message})
+
+        self.prefix_chars += len(prefix)
+        self.suffix_chars += sum(len(str(message.get("content", ""))) for message in messages[1:])
+        return messages
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and the share of prompt text that is cacheable."""
+        lookups = self.hits + self.misses
+        total_chars = self.prefix_chars + self.suffix_chars
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "prefix_share": self.prefix_chars / total_chars if total_chars else 0.0
+        }
+
+    def _store(self, section_name: str, section, version: str) -> str:
+        # Drop prefixes built from older content versions of this section
+        for key in [key for key in self._prefixes if key[0] == section_name]:
+            del self._prefixes[key]
+        prefix = sys.intern(build_section_prefix(section_name, section))
+        self._prefixes[(section_name, version)] = prefix
+        return prefix
+
+prompt_cache = PromptCache()
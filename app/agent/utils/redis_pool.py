@@ -0,0 +1,74 @@
+import asyncio
+import logging
+import os
+from typing import Any, Dict, Optional
+
+from redis.asyncio import Redis
+from redis.asyncio.retry import Retry
+from redis.backoff import ExponentialBackoff
+from redis.exceptions import ConnectionError, TimeoutError
+
+logger = logging.getLogger(__name__)
+
+REDIS_HOST = os.environ.get("REDIS_HOST", "xrx-redis")
+REDIS_PORT = int(os.environ.get("REDIS_PORT", "6379"))
+REDIS_MAX_CONNECTIONS = int(os.environ.get("REDIS_MAX_CONNECTIONS", "50"))
+REDIS_SOCKET_TIMEOUT = float(os.environ.get("REDIS_SOCKET_TIMEOUT", "2"))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.environ.get("REDIS_HEALTH_CHECK_INTERVAL", "15"))
+REDIS_RETRIES = int(os.environ.get("REDIS_RETRIES", "3"))
+
+_client: Optional[Redis] = None
+
+def create_redis_client() -> Redis:
+    """Create an async Redis client over a bounded connection pool.
+
+    Idle connections are pinged before reuse once they have been idle for
+    REDIS_HEALTH_CHECK_INTERVAL seconds, and commands that hit a dropped
+    connection are retried on a fresh one with exponential backoff, so a
+    short Redis blip doesn't fail in-flight turns.
+    """
+    return Redis(
+        host=REDIS_HOST,
+        port=REDIS_PORT,
+        max_connections=REDIS_MAX_CONNECTIONS,
+        socket_timeout=REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=REDIS_SOCKET_TIMEOUT,
+        socket_keepalive=True,
+        health_check_interval=REDIS_HEALTH_CHECK_INTERVAL,
+        retry=Retry(ExponentialBackoff(cap=1.0, base=0.05), REDIS_RETRIES),
+        retry_on_error=[ConnectionError, TimeoutError]
+    )
+
+def get_redis_client() -> Redis:
+    """Get the process-wide pooled Redis client."""
+    global _client
+    if _client is None:
+        _client = create_redis_client()
+    return _client
+
+async def close_redis_client() -> None:
+    """Close the shared client and disconnect its pool."""
+    global _client
+    if _client is not None:
+        await _client.close()
+        await _client.connection_pool.disconnect()
+        _client = None
+
+async def check_redis(client: Redis, timeout: float = 1.0) -> bool:
+    """Return True if Redis answers a PING within timeout."""
+    try:
+        return bool(await asyncio.wait_for(client.ping(), timeout))
+    except Exception as e:
+        logger.warning(f"Redis health check failed: {str(e)}")
+        return False
+
+def pool_stats(client: Redis) -> Dict[str, Any]:
+    """Connection pool usage for the shared client."""
+    pool = client.connection_pool
+    in_use = len(getattr(pool, "_in_use_connections", ()))
+    available = len(getattr(pool, "_available_connections", ()))
+    return {
+        "max_connections": pool.max_connections,
+        "in_use": in_use,
+        "idle": available
+    }
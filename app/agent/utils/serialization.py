@@ -0,0 +1,96 @@
+import json
+import uuid
+from typing import Any, Dict, List, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson is several times faster than the stdlib encoder; it's optional
+JSON_BACKEND = "orjson" if orjson is not None else "json"
+# Lets orjson splice pre-encoded bytes itself (orjson >= 3.9)
+_FRAGMENT = getattr(orjson, "Fragment", None)
+
+# Random per process, so no string in a payload can pass for one
+_PLACEHOLDER = "\x00encoded:" + uuid.uuid4().hex + ":%d\x00"
+# json.dumps builds a new encoder whenever it's given options
+_STDLIB_ENCODER = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False)
+
+class EncodedJSON(dict):
+    """A dict that carries its own JSON encoding.
+
+    dumps() splices ``encoded`` into its output verbatim instead of
+    encoding the dict again, so a payload built once, like a widget, is
+    serialized once however many frames it goes out in. To everything else,
+    json.dumps included, it is a plain dict. Don't mutate it: the encoding
+    would go stale.
+    """
+
+    __slots__ = ("encoded",)
+
+    def __init__(self, value: Dict[str, Any], encoded: Optional[bytes] = None):
+        super().__init__(value)
+        self.encoded = encoded if encoded is not None else dumps(value)
+
+def _encode(value: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+    return _STDLIB_ENCODER.encode(value).encode()
+
+def _default(value: Any) -> Any:
+    if isinstance(value, EncodedJSON):
+        return _FRAGMENT(value.encoded)
+    # Other subclasses (e.g. IntEnum priorities) as their base type
+    for base in (str, int, float, dict, list):
+        if isinstance(value, base):
+            return base(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+# Types _swap looks inside (exact types: checked on every value)
+_NESTED = {dict, list, tuple, EncodedJSON}
+
+def _swap(value: Any, fragments: List[bytes]) -> Any:
+    """Replace EncodedJSON values with placeholders.
+
+    Only the containers on the way to one are copied; anything else is
+    returned as is.
+    """
+    if type(value) is EncodedJSON:
+        fragments.append(value.encoded)
+        return _PLACEHOLDER % (len(fragments) - 1)
+    if isinstance(value, dict):
+        swapped = None
+        for key, item in value.items():
+            if type(item) in _NESTED:
+                replacement = _swap(item, fragments)
+                if replacement is not item:
+                    if swapped is None:
+                        swapped = dict(value)
+                    swapped[key] = replacement
+        return value if swapped is None else swapped
+    items = None
+    for index, item in enumerate(value):
+        if type(item) in _NESTED:
+            replacement = _swap(item, fragments)
+            if replacement is not item:
+                if items is None:
+                    items = list(value)
+                items[index] = replacement
+    return value if items is None else items
+
+def dumps(value: Any) -> bytes:
+    """Encode a value as compact UTF-8 JSON, splicing in pre-encoded parts."""
+    if _FRAGMENT is not None:
+        return orjson.dumps(value, default=_default, option=orjson.OPT_PASSTHROUGH_SUBCLASS | orjson.OPT_NON_STR_KEYS)
+    fragments: List[bytes] = []
+    encoded = _encode(_swap(value, fragments) if type(value) in _NESTED else value)
+    for index, fragment in enumerate(fragments):
+        encoded = encoded.replace(_encode(_PLACEHOLDER % index), fragment, 1)
+    return encoded
+
+def loads(data: Any) -> Any:
+    """Decode JSON from bytes or str."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
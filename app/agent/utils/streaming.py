@@ -0,0 +1,117 @@
+import asyncio
+import re
+from typing import Dict, Any, AsyncIterator, List, Optional
+
+from agent.utils.serialization import dumps
+
+# A sentence ends at terminal punctuation (optionally followed by closing
+# quotes/brackets) and whitespace. Abbreviations are rare enough in facilitator
+# speech that we accept the occasional early split.
+SENTENCE_END = re.compile(r'[.!?]+["\')\]]*\s+')
+
+# Don't hand the TTS service fragments it would speak unnaturally.
+MIN_SENTENCE_CHARS = 12
+
+STREAM_FORMATS = ("ndjson", "sse")
+
+
+class SentenceBuffer:
+    """Accumulate streamed text deltas and release complete sentences."""
+
+    def __init__(self, min_chars: int = MIN_SENTENCE_CHARS):
+        self.min_chars = min_chars
+        self._buffer = ""
+
+    def feed(self, delta: str) -> List[str]:
+        """Add a text delta and return any sentences it completed."""
+        self._buffer += delta
+        sentences = []
+        start = 0
+        for match in SENTENCE_END.finditer(self._buffer):
+            candidate = self._buffer[start:match.end()].strip()
+            if len(candidate) < self.min_chars:
+                continue
+            sentences.append(candidate)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> Optional[str]:
+        """Return whatever text is left once the stream has finished."""
+        remainder = self._buffer.strip()
+        self._buffer = ""
+        return remainder or None
+
+
+def text_delta_frame(content: str) -> Dict[str, Any]:
+    """Frame carrying a partial text delta."""
+    return {"type": "text_delta", "content": content}
+
+
+def sentence_frame(content: str, index: int) -> Dict[str, Any]:
+    """Frame carrying a complete sentence the TTS service can speak at once."""
+    return {"type": "sentence", "content": content, "index": index}
+
+
+def final_frame(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Frame carrying the complete turn result, including the widget."""
+    return {"type": "final", **result}
+
+
+def widget_frame(widget: Dict[str, Any]) -> Dict[str, Any]:
+    """Frame carrying a widget as soon as it is ready."""
+    return {"type": "widget", "widget": widget}
+
+
+def task_frame(content: str, metadata: Dict[str, Any]) -> Dict[str, Any]:
+    """Frame carrying a task description for the current activity."""
+    return {"type": "task", "content": content, "metadata": metadata}
+
+
+def alert_frame(alert: Dict[str, Any]) -> Dict[str, Any]:
+    """Frame carrying a timer alert, e.g. one minute left in a discussion."""
+    return {"type": "alert", **alert}
+
+
+async def merge_streams(*streams: AsyncIterator[Any]) -> AsyncIterator[Any]:
+    """Interleave async iterators, yielding each item as soon as it arrives.
+
+    Every stream runs in its own task. If one fails, the others are cancelled
+    and the error is raised to the caller.
+    """
+    queue: asyncio.Queue = asyncio.Queue()
+    finished = object()
+
+    async def pump(stream):
+        async for item in stream:
+            queue.put_nowait(item)
+
+    tasks = [asyncio.ensure_future(pump(stream)) for stream in streams]
+    for task in tasks:
+        task.add_done_callback(lambda task: queue.put_nowait((finished, task)))
+
+    remaining = len(tasks)
+    try:
+        while remaining:
+            item = await queue.get()
+            if isinstance(item, tuple) and item and item[0] is finished:
+                remaining -= 1
+                if not item[1].cancelled() and item[1].exception() is not None:
+                    raise item[1].exception()
+                continue
+            yield item
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+
+
+def encode_frame(frame: Dict[str, Any], stream_format: str = "ndjson") -> bytes:
+    """Encode a frame as an NDJSON line or an SSE event.
+
+    Pre-encoded payloads such as widgets are spliced in, not re-encoded.
+    """
+    data = dumps(frame)
+    if stream_format == "sse":
+        return b"event: %s\ndata: %s\n\n" % (frame.get("type", "message").encode(), data)
+    return data + b"\n"
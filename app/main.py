@@ -1,55 +1,214 @@
-from fastapi import FastAPI, WebSocket, HTTPException
-from fastapi.responses import StreamingResponse
-import json
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException
+from fastapi.responses import PlainTextResponse, StreamingResponse
+import asyncio
 import logging
+import time
 import uuid
-from typing import Dict, Any
-import redis
-from agent.executor import single_turn_agent
+from typing import Any, AsyncIterator, Dict, List
+from agent.executor import (
+    single_turn_agent,
+    advance_section,
+    llm_client,
+    content_repository,
+    breakout_manager,
+    bundle_server,
+    conversation_log
+)
+from agent.observability import tracer
+from agent.observability.metrics import ERRORS, TURN_SECONDS, metrics
+from agent.runtime import SessionChannel, TaskTracker, cancellations, event_sink, logged_turn, run_cancellable, timer_scheduler, with_alerts
+from agent.utils.llm import close_llm_client
+from agent.utils.llm_scheduler import llm_scheduler
+from agent.utils.prompts import prompt_cache
+from agent.utils.redis_pool import get_redis_client, close_redis_client, check_redis, pool_stats
+from agent.state import SequenceMismatch, session_key, validate_messages
+from agent.utils.streaming import STREAM_FORMATS, encode_frame
 
 app = FastAPI()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Initialize Redis client for task management
-redis_client = redis.Redis(
-    host="xrx-redis",
-    port=6379,
-    decode_responses=True
+# Pooled async Redis client shared by task bookkeeping, cancellation
+# delivery and the session store
+redis_client = get_redis_client()
+task_tracker = TaskTracker(redis_client)
+
+# Turns in flight on this worker, per session
+active_sessions: Dict[str, int] = {}
+
+metrics.gauge("workshop_active_sessions", "Sessions with a turn in flight", callback=lambda: len(active_sessions))
+WEBSOCKET_CONNECTIONS = metrics.gauge("workshop_websocket_connections", "Open session WebSocket connections")
+metrics.gauge("workshop_active_turns", "Turns in flight", callback=lambda: sum(active_sessions.values()))
+metrics.counter("workshop_events_dropped_total", "Workshop events dropped because the event buffer was full", callback=lambda: event_sink.dropped)
+metrics.gauge("workshop_llm_in_flight", "LLM calls holding a scheduler slot", callback=lambda: llm_scheduler.in_flight)
+metrics.gauge("workshop_llm_queue_depth", "LLM calls waiting for a scheduler slot", callback=lambda: llm_scheduler.stats()["queue_depth"])
+metrics.gauge(
+    "workshop_redis_pool_connections",
+    "Redis pool connections by state",
+    ["state"],
+    callback=lambda: {(state,): pool_stats(redis_client)[state] for state in ("in_use", "idle", "max_connections")}
 )
 
+@app.on_event("startup")
+async def startup():
+    """Load workshop content, precompute prompts and start background listeners."""
+    content_repository.start()
+    prompt_cache.warm(content_repository.snapshot)
+    bundle_server.bundle(content_repository.snapshot)
+    cancellations.start_listener(redis_client)
+    event_sink.start()
+    tracer.start()
+    timer_scheduler.start()
+    metrics.start()
+
+@app.on_event("shutdown")
+async def shutdown():
+    """Release pooled connections held by shared clients."""
+    await content_repository.stop()
+    await cancellations.stop_listener()
+    await breakout_manager.stop()
+    await event_sink.stop()
+    await tracer.stop()
+    await timer_scheduler.stop()
+    await metrics.stop()
+    await close_llm_client(llm_client)
+    await close_redis_client()
+
+@app.get("/health")
+async def health():
+    """
+    Report whether the service and its Redis connection are healthy.
+    """
+    redis_ok = await check_redis(redis_client)
+    return {
+        "status": "ok" if redis_ok else "degraded",
+        "redis": "ok" if redis_ok else "unavailable",
+        "redis_pool": pool_stats(redis_client),
+        "llm_scheduler": llm_scheduler.stats(),
+        "content_bundle": bundle_server.stats(),
+        "tracing": tracer.stats()
+    }
+
+@app.get("/metrics")
+async def get_metrics():
+    """
+    Report metrics in the Prometheus text format.
+    
+    Counts and histograms are summed over every worker of this server.
+    """
+    return PlainTextResponse(await metrics.render_async(), media_type="text/plain; version=0.0.4")
+
+async def turn_frames(
+    task_id: str,
+    session: Dict[str, Any],
+    messages: List[Dict[str, Any]],
+    opening: bool,
+    transport: str
+) -> AsyncIterator[Dict[str, Any]]:
+    """Run one turn, traced, timed and cancellable by its task ID.
+    
+    Errors end the turn with an ``error`` frame rather than raising.
+    """
+    session_id = session_key(session)
+    started = time.perf_counter()
+    active_sessions[session_id] = active_sessions.get(session_id, 0) + 1
+    # The trace ID is the task ID sent in X-Task-ID
+    with tracer.trace("run_agent", trace_id=task_id, task_id=task_id, session_id=session_id, transport=transport, opening=opening) as span:
+        try:
+            if opening:
+                await advance_section(session)
+            
+            # Process the request through the agent, frame by frame. A
+            # cancellation stops the turn and ends this loop immediately.
+            first_frame = True
+            async for frame in run_cancellable(task_id, single_turn_agent(messages, session, opening=opening)):
+                if first_frame:
+                    span.add_event("first_frame", type=frame["type"])
+                    first_frame = False
+                yield frame
+            
+        except Exception as e:
+            logger.error(f"Error in generate_response: {str(e)}")
+            span.record_exception(e)
+            ERRORS.inc(source="turn", type=type(e).__name__)
+            yield {"type": "error", "error": str(e)}
+        finally:
+            if active_sessions.get(session_id, 0) > 1:
+                active_sessions[session_id] -= 1
+            else:
+                active_sessions.pop(session_id, None)
+            TURN_SECONDS.observe(time.perf_counter() - started, kind="opening" if opening else "turn")
+            await task_tracker.finish(task_id)
+
 @app.post("/run-reasoning-agent")
 async def run_agent(request: Dict[str, Any]) -> StreamingResponse:
     """
     Execute the workshop facilitator agent and stream the results.
+    
+    With ``"stream": true`` the response carries incremental frames (text
+    deltas, speakable sentences, then a final frame with the widget) as
+    NDJSON lines, or as SSE events when ``"stream_format": "sse"``.
+    Otherwise only the final frame is sent. Streams also carry ``alert``
+    frames from the session's discussion timers as they come due.
+    
+    Workshop progress is tracked per ``session``; ``"advance_section": true``
+    moves the session on to its next section, and the turn is that
+    section's opening.
+    
+    With ``base_seq`` the request carries only the messages added since
+    that sequence number, and the history is rebuilt from the session's
+    server-side log. The stream then ends with an ``ack`` frame holding
+    the seq to send next time. A stale ``base_seq`` is rejected with 409
+    and the current seq, so the client can resend what the server lacks.
     """
+    stream_format = request.get("stream_format", "ndjson")
+    if stream_format not in STREAM_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported stream_format: {stream_format}")
+    try:
+        validate_messages(request.get("messages", []))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    base_seq = request.get("base_seq")
+    if base_seq is not None:
+        if not isinstance(base_seq, int) or isinstance(base_seq, bool) or base_seq < 0:
+            raise HTTPException(status_code=400, detail="base_seq must be a non-negative integer")
+        try:
+            await conversation_log.append(session_key(request.get("session", {})), request.get("messages", []), base_seq)
+        except SequenceMismatch as e:
+            raise HTTPException(status_code=409, detail={"error": str(e), "seq": e.seq})
+    
     task_id = str(uuid.uuid4())
     try:
         # Set initial task status
-        await redis_client.set(task_id, "running")
+        await task_tracker.set_status(task_id, "running")
         
         # Extract messages and session info from request
         messages = request.get("messages", [])
         session = request.get("session", {})
+        stream = request.get("stream", False)
+        opening = bool(request.get("advance_section"))
         
         async def generate_response():
+            alerts = timer_scheduler.subscribe(session_key(session)) if stream else None
             try:
-                # Process the request through the agent
-                result = await single_turn_agent(messages)
-                
-                # Check if task was cancelled
-                if await redis_client.get(task_id) == "cancelled":
-                    logger.info(f"Task {task_id} was cancelled")
-                    return
-                
-                # Stream the response
-                yield json.dumps(result) + "\n"
-                
-            except Exception as e:
-                logger.error(f"Error in generate_response: {str(e)}")
-                yield json.dumps({"error": str(e)}) + "\n"
+                if base_seq is not None:
+                    frames = logged_turn(
+                        conversation_log,
+                        session_key(session),
+                        lambda history: turn_frames(task_id, session, history, opening, "http")
+                    )
+                else:
+                    frames = turn_frames(task_id, session, messages, opening, "http")
+                if alerts is not None:
+                    frames = with_alerts(frames, alerts)
+                async for frame in frames:
+                    if not stream and frame["type"] not in ("final", "error", "ack"):
+                        continue
+                    yield encode_frame(frame, stream_format)
             finally:
-                await redis_client.delete(task_id)
+                if alerts is not None:
+                    timer_scheduler.unsubscribe(session_key(session), alerts)
         
         return StreamingResponse(
             generate_response(),
@@ -61,19 +220,116 @@ async def run_agent(request: Dict[str, Any]) -> StreamingResponse:
         logger.error(f"Error in run_agent: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def channel_turn(task_id: str, session: Dict[str, Any], messages: List[Dict[str, Any]], opening: bool) -> AsyncIterator[Dict[str, Any]]:
+    """Run a turn sent over a session's WebSocket."""
+    await task_tracker.set_status(task_id, "running")
+    async for frame in turn_frames(task_id, session, messages, opening, "websocket"):
+        yield frame
+
+@app.websocket("/ws/{session_id}")
+async def session_socket(websocket: WebSocket, session_id: str):
+    """
+    Persistent channel for one session's turns.
+    
+    Each turn is a single frame carrying only the messages added since the
+    last acknowledged ``seq``; the server keeps the history. Text,
+    widget, task and alert frames share the connection, and a ``cancel``
+    frame stops the running turn. See SessionChannel for the protocol.
+    """
+    await websocket.accept()
+    channel = SessionChannel(session_id, channel_turn, conversation_log)
+    WEBSOCKET_CONNECTIONS.inc()
+    try:
+        await channel.serve(websocket.receive_text, websocket.send_text)
+    except WebSocketDisconnect:
+        pass
+    finally:
+        WEBSOCKET_CONNECTIONS.dec()
+
 @app.post("/cancel-reasoning-agent/{task_id}")
 async def cancel_agent(task_id: str):
     """
     Cancel a running workshop facilitator task.
+    
+    The turn is interrupted wherever it is running: locally through the
+    cancellation registry, or on another worker via Redis pub/sub.
     """
     try:
-        await redis_client.set(task_id, "cancelled")
+        if not cancellations.cancel(task_id):
+            await cancellations.publish(redis_client, task_id)
+        await task_tracker.set_status(task_id, "cancelled")
         logger.info(f"Task {task_id} set to cancelled")
         return {"detail": f"Task {task_id} cancelled"}
     except Exception as e:
         logger.error(f"Error cancelling task: {str(e)}")
+        ERRORS.inc(source="cancel", type=type(e).__name__)
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/traces")
+async def list_traces(limit: int = 50):
+    """Summaries of the most recently traced turns, newest first."""
+    return {"traces": tracer.recent(limit), "stats": tracer.stats()}
+
+@app.get("/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    """
+    Return one traced turn as OTLP/JSON.
+    
+    The trace ID is the turn's task ID, with or without dashes.
+    """
+    trace = tracer.get(trace_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail=f"Unknown trace {trace_id}")
+    return trace.to_otlp()
+
+@app.post("/breakouts")
+async def start_breakout(request: Dict[str, Any]):
+    """
+    Split a session into breakout groups, each with its own facilitator.
+    
+    Expects ``session``, ``groups`` (each with ``id`` and ``participants``),
+    ``duration`` in seconds and an optional activity ``prompt``. All groups
+    are brought back together when the duration is up.
+    """
+    try:
+        breakout = await breakout_manager.start(
+            session_key(request.get("session", {})),
+            request.get("groups", []),
+            float(request.get("duration", 180)),
+            request.get("prompt")
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return breakout.describe()
+
+@app.get("/breakouts/{breakout_id}")
+async def get_breakout(breakout_id: str):
+    """Report a breakout's status, its groups and, once ended, the result."""
+    breakout = breakout_manager.get(breakout_id)
+    if breakout is None:
+        raise HTTPException(status_code=404, detail=f"Unknown breakout {breakout_id}")
+    return breakout.describe()
+
+@app.post("/breakouts/{breakout_id}/groups/{group_id}/messages")
+async def send_breakout_message(breakout_id: str, group_id: str, request: Dict[str, Any]):
+    """Send a group's message to its facilitator and return the reply."""
+    try:
+        return await breakout_manager.send(breakout_id, group_id, request.get("content", ""))
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail=f"No reply from breakout group {group_id}")
+
+@app.post("/breakouts/{breakout_id}/end")
+async def end_breakout(breakout_id: str):
+    """Bring every group back early and return their aggregated summaries."""
+    try:
+        return await breakout_manager.end(breakout_id)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8003)
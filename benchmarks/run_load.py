@@ -0,0 +1,285 @@
+"""Load test and latency benchmark for /run-reasoning-agent.
+
+Starts a stub LLM server, a Redis stand-in and the API under uvicorn, then
+drives simulated workshop sessions through every section concurrently.
+Each section is one opening turn (advance_section) followed by
+--questions participant turns. With --delta, requests carry only the
+messages added since the server's last ack (base_seq). Results are
+written as JSON; pass --baseline to compare against an earlier run and
+fail on regressions.
+
+    python benchmarks/run_load.py --sessions 50 --output benchmarks/results/latest.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from stub_llm import StubLLMServer
+from stub_redis import StubRedisServer
+
+QUESTIONS = [
+    "How does this apply to our service users?",
+    "Can you give an example from a medium secure unit?",
+    "What is the task?",
+    "How much time do we have?",
+    "What should we do differently on our ward?"
+]
+
+# Regressions larger than this fraction fail a --baseline comparison
+DEFAULT_TOLERANCE = 0.15
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def percentile(values: List[float], fraction: float) -> Optional[float]:
+    """Nearest-rank percentile."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(fraction * len(ordered)))
+    return ordered[rank - 1]
+
+def summarize(values: List[float]) -> Dict[str, Optional[float]]:
+    return {
+        "p50": percentile(values, 0.50),
+        "p95": percentile(values, 0.95),
+        "p99": percentile(values, 0.99),
+        "mean": sum(values) / len(values) if values else None,
+        "max": max(values) if values else None
+    }
+
+def rss_bytes(pid: int) -> Optional[int]:
+    """Resident set size of a process, from /proc (Linux only)."""
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        return None
+    return None
+
+class Recorder:
+    def __init__(self):
+        self.ttfb: List[float] = []
+        self.turn: List[float] = []
+        self.opening_turn: List[float] = []
+        self.request_bytes: List[float] = []
+        self.errors = 0
+
+async def run_turn(client: httpx.AsyncClient, payload: Dict[str, Any], recorder: Recorder, opening: bool) -> Optional[int]:
+    """Run one turn and return the seq it was acknowledged at, if any."""
+    body = json.dumps(payload).encode()
+    recorder.request_bytes.append(len(body))
+    started = time.perf_counter()
+    first_byte = None
+    seq = None
+    try:
+        async with client.stream("POST", "/run-reasoning-agent", content=body, headers={"Content-Type": "application/json"}) as response:
+            response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line:
+                    continue
+                if first_byte is None:
+                    first_byte = time.perf_counter()
+                frame = json.loads(line)
+                if frame.get("type") == "error":
+                    recorder.errors += 1
+                elif frame.get("type") == "ack":
+                    seq = frame["seq"]
+    except (httpx.HTTPError, ValueError):
+        recorder.errors += 1
+        return None
+    finished = time.perf_counter()
+    if first_byte is not None:
+        recorder.ttfb.append(first_byte - started)
+    (recorder.opening_turn if opening else recorder.turn).append(finished - started)
+    return seq
+
+async def run_session(client: httpx.AsyncClient, index: int, args: argparse.Namespace, recorder: Recorder) -> int:
+    session = {"session_id": f"bench-{index}"}
+    messages: List[Dict[str, str]] = []
+    # Delta mode: the server's seq and how many of our messages it has
+    seq = 0
+    sent = 0
+    turns = 0
+
+    async def turn(content: str, opening: bool) -> None:
+        nonlocal seq, sent
+        messages.append({"role": "user", "content": content})
+        payload: Dict[str, Any] = {"session": session, "stream": True}
+        if opening:
+            payload["advance_section"] = True
+        if args.delta:
+            payload["messages"] = messages[sent:]
+            payload["base_seq"] = seq
+        else:
+            payload["messages"] = messages
+        acked = await run_turn(client, payload, recorder, opening)
+        if acked is not None:
+            seq = acked
+            sent = len(messages)
+
+    for section in range(args.sections):
+        await turn("Let's move on.", True)
+        turns += 1
+        for question in range(args.questions):
+            await turn(QUESTIONS[(section + question) % len(QUESTIONS)], False)
+            turns += 1
+    return turns
+
+def start_api(port: int, env: Dict[str, str]) -> subprocess.Popen:
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=os.path.join(ROOT, "app"),
+        env=env
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        if process.poll() is not None:
+            break
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("API did not start")
+
+async def drive(args: argparse.Namespace, api_url: str, api_pid: int) -> Dict[str, Any]:
+    recorder = Recorder()
+    limits = httpx.Limits(max_connections=args.sessions, max_keepalive_connections=args.sessions)
+    async with httpx.AsyncClient(base_url=api_url, limits=limits, timeout=120) as client:
+        rss_before = rss_bytes(api_pid)
+        started = time.perf_counter()
+        turns = await asyncio.gather(*(
+            run_session(client, index, args, recorder)
+            for index in range(args.sessions)
+        ))
+        elapsed = time.perf_counter() - started
+        rss_after = rss_bytes(api_pid)
+        health = (await client.get("/health")).json()
+
+    memory_per_session = None
+    if rss_before is not None and rss_after is not None:
+        memory_per_session = (rss_after - rss_before) / args.sessions
+    return {
+        "turns": sum(turns),
+        "errors": recorder.errors,
+        "elapsed_seconds": elapsed,
+        "throughput_turns_per_second": sum(turns) / elapsed if elapsed else None,
+        "ttfb_seconds": summarize(recorder.ttfb),
+        "turn_seconds": summarize(recorder.turn),
+        "opening_turn_seconds": summarize(recorder.opening_turn),
+        "request_bytes": summarize(recorder.request_bytes),
+        "rss_bytes_before": rss_before,
+        "rss_bytes_after": rss_after,
+        "memory_bytes_per_session": memory_per_session,
+        "server": health
+    }
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """List the metrics that regressed by more than tolerance."""
+    regressions = []
+    for metric in ("ttfb_seconds", "turn_seconds", "opening_turn_seconds"):
+        for stat in ("p50", "p95", "p99"):
+            current = results["results"][metric][stat]
+            previous = baseline["results"][metric][stat]
+            if current is not None and previous and current > previous * (1 + tolerance):
+                regressions.append(f"{metric}.{stat}: {previous:.4f}s -> {current:.4f}s")
+    current = results["results"]["throughput_turns_per_second"]
+    previous = baseline["results"]["throughput_turns_per_second"]
+    if current is not None and previous and current < previous * (1 - tolerance):
+        regressions.append(f"throughput_turns_per_second: {previous:.2f} -> {current:.2f}")
+    return regressions
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=20, help="Concurrent workshop sessions")
+    parser.add_argument("--sections", type=int, default=27, help="Sections each session goes through")
+    parser.add_argument("--questions", type=int, default=2, help="Participant turns per section")
+    parser.add_argument("--first-token-ms", type=float, default=250, help="Stub LLM time to first token")
+    parser.add_argument("--tokens-per-second", type=float, default=80, help="Stub LLM token rate")
+    parser.add_argument("--reply-tokens", type=int, default=60, help="Stub LLM reply length")
+    parser.add_argument("--delta", action="store_true", help="Send only new messages with base_seq")
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results", "latest.json"))
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    args = parser.parse_args()
+
+    llm = StubLLMServer(free_port(), first_token_ms=args.first_token_ms,
+                        tokens_per_second=args.tokens_per_second, reply_tokens=args.reply_tokens)
+    redis_server = StubRedisServer(free_port())
+    llm.start()
+    redis_server.start()
+
+    api_port = free_port()
+    env = dict(os.environ)
+    env.update({
+        "LLM_API_KEY": "benchmark",
+        "LLM_BASE_URL": llm.base_url,
+        "LLM_MODEL_ID": "stub",
+        "REDIS_HOST": "127.0.0.1",
+        "REDIS_PORT": str(redis_server.port),
+        "EVENTS_DIR": os.path.join(ROOT, "benchmarks", "results", "events")
+    })
+    api = start_api(api_port, env)
+    try:
+        results = asyncio.run(drive(args, f"http://127.0.0.1:{api_port}", api.pid))
+    finally:
+        api.terminate()
+        api.wait(timeout=10)
+        llm.stop()
+        redis_server.stop()
+
+    report = {
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "config": vars(args),
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "llm_requests": llm.app.state.requests,
+        "redis_commands": redis_server.store.commands,
+        "results": results
+    }
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{results['turns']} turns in {results['elapsed_seconds']:.1f}s "
+          f"({results['throughput_turns_per_second']:.1f} turns/s), {results['errors']} errors")
+    for metric in ("ttfb_seconds", "turn_seconds", "opening_turn_seconds"):
+        stats = results[metric]
+        if stats["p50"] is not None:
+            print(f"{metric}: p50={stats['p50']:.4f} p95={stats['p95']:.4f} p99={stats['p99']:.4f}")
+    requests = results["request_bytes"]
+    if requests["p50"] is not None:
+        print(f"request_bytes: p50={requests['p50']:.0f} max={requests['max']:.0f}")
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
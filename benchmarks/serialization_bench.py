@@ -0,0 +1,142 @@
+"""Micro-benchmark of the JSON path a turn's frames go through.
+
+Encodes a typical turn (text deltas, sentences, the widget frame and the
+final frame) for the data_table and flowchart widgets the Widget node
+serves, three ways:
+
+    escaped   the previous path: widget details as an escaped JSON string,
+              every frame encoded with json.dumps
+    json      EncodedJSON widgets spliced in, stdlib encoder
+    orjson    the same with orjson, when it is installed
+
+and reports bytes and CPU time per turn.
+
+    python benchmarks/serialization_bench.py --turns 2000
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Callable, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "app"))
+
+from agent.content.widgets import CachedWidget
+from agent.models import WidgetSpec
+from agent.utils import serialization
+from agent.utils.streaming import encode_frame
+
+# What the Widget node serves for population_data and service_user_journey
+WIDGETS = {
+    "data_table": WidgetSpec("data_table", {
+        "title": "Service User Demographics",
+        "headers": ["Ethnic Group", "Medium Secure", "Low Secure", "Local Borough"],
+        "rows": [
+            ["White British", "45%", "48%", "55%"],
+            ["Black Caribbean", "15%", "14%", "8%"],
+            ["Black African", "12%", "11%", "6%"],
+            ["Asian", "10%", "9%", "15%"],
+            ["Other", "18%", "18%", "16%"]
+        ]
+    }),
+    "flowchart": WidgetSpec("flowchart", {
+        "title": "Process Flow for service_user_journey",
+        "nodes": [
+            {"id": "1", "content": "Initial Contact"},
+            {"id": "2", "content": "Cultural Assessment"},
+            {"id": "3", "content": "Treatment Planning"},
+            {"id": "4", "content": "Service Delivery"},
+            {"id": "5", "content": "Progress Review"}
+        ],
+        "edges": [
+            {"from": "1", "to": "2"},
+            {"from": "2", "to": "3"},
+            {"from": "3", "to": "4"},
+            {"from": "4", "to": "5"},
+            {"from": "5", "to": "3"}
+        ]
+    })
+}
+
+REPLY = (
+    "Facilitator: Let's look at how the people we support move through the service. "
+    "Each stage is a chance to notice cultural needs early — who is involved, what "
+    "language they prefer and which community links matter to them. Take a moment "
+    "with your table to find the stage where your ward most often misses this."
+)
+
+def turn_frames(widget: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The frames of one turn showing a widget, as the executor yields them."""
+    tokens = REPLY.split(" ")
+    frames: List[Dict[str, Any]] = [{"type": "text_delta", "content": token + " "} for token in tokens]
+    frames.extend({"type": "sentence", "content": sentence + ".", "index": index} for index, sentence in enumerate(REPLY.split(". ")))
+    frames.append({"type": "widget", "widget": widget})
+    frames.append({
+        "type": "final",
+        "messages": [{"role": "assistant", "content": REPLY}],
+        "session": {"session_id": "bench", "current_section": "service_user_journey"},
+        "output": REPLY,
+        "widget": widget,
+        "task": {"description": "Map the journey", "duration": 10}
+    })
+    return frames
+
+def escaped_widget(spec: WidgetSpec) -> Dict[str, Any]:
+    """The widget payload before pre-encoding: details as a JSON string."""
+    details = json.dumps(spec.details, separators=(",", ":"))
+    return {"type": spec.type, "details": details, "etag": "0" * 16, "version": None}
+
+def encode_escaped(frames: List[Dict[str, Any]]) -> int:
+    return sum(len((json.dumps(frame) + "\n").encode()) for frame in frames)
+
+def encode_spliced(frames: List[Dict[str, Any]]) -> int:
+    return sum(len(encode_frame(frame)) for frame in frames)
+
+ORJSON = serialization.orjson
+
+def use_backend(name: str) -> None:
+    """Point the serialization module at one JSON backend."""
+    serialization.orjson = ORJSON if name == "orjson" else None
+    serialization._FRAGMENT = getattr(serialization.orjson, "Fragment", None)
+
+def measure(encode: Callable[[List[Dict[str, Any]]], int], frames: List[Dict[str, Any]], turns: int) -> Dict[str, float]:
+    start = time.process_time()
+    for _ in range(turns):
+        size = encode(frames)
+    elapsed = time.process_time() - start
+    return {"bytes_per_turn": size, "us_per_turn": round(elapsed / turns * 1e6, 1)}
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--turns", type=int, default=2000, help="Turns encoded per measurement")
+    parser.add_argument("--output", help="Write the results here as JSON")
+    args = parser.parse_args()
+
+    backends = ["json"] + (["orjson"] if ORJSON is not None else [])
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for name, spec in WIDGETS.items():
+        results[name] = {"escaped": measure(encode_escaped, turn_frames(escaped_widget(spec)), args.turns)}
+        for backend in backends:
+            use_backend(backend)
+            frames = turn_frames(CachedWidget(spec, None).payload)
+            results[name][backend] = measure(encode_spliced, frames, args.turns)
+    use_backend("orjson")
+
+    print(f"{'widget':<12}{'path':<10}{'bytes/turn':>12}{'us/turn':>10}{'saved':>16}")
+    for name, paths in results.items():
+        baseline = paths["escaped"]
+        for path, result in paths.items():
+            saved = ""
+            if path != "escaped":
+                saved = f"{baseline['bytes_per_turn'] - result['bytes_per_turn']}B {baseline['us_per_turn'] - result['us_per_turn']:.1f}us"
+            print(f"{name:<12}{path:<10}{result['bytes_per_turn']:>12}{result['us_per_turn']:>10}{saved:>16}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+if __name__ == "__main__":
+    main()
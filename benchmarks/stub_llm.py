@@ -0,0 +1,105 @@
+"""OpenAI-compatible streaming chat completion server for benchmarks.
+
+Replies are generated locally with a configurable time to first token and
+token rate, so runs measure the agent rather than a provider.
+
+    python benchmarks/stub_llm.py --port 8090 --first-token-ms 250 --tokens-per-second 80
+"""
+
+import argparse
+import asyncio
+import json
+import threading
+import time
+import uuid
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+REPLY = (
+    "Thank you for sharing that. Cultural competency starts with noticing our own assumptions. "
+    "In forensic settings, that awareness shapes every assessment we make. "
+    "Let's take a moment to think about how this shows up on your unit. "
+    "What is one example you have seen recently?"
+)
+
+def create_app(first_token_ms: float = 250, tokens_per_second: float = 80, reply_tokens: int = 60) -> FastAPI:
+    """Build the stub server app."""
+    app = FastAPI()
+    words = REPLY.split(" ")
+    app.state.requests = 0
+
+    @app.post("/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        max_tokens = body.get("max_tokens") or reply_tokens
+        count = min(reply_tokens, max_tokens)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+
+        async def stream():
+            await asyncio.sleep(first_token_ms / 1000)
+            for index in range(count):
+                chunk = {
+                    "id": completion_id,
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": body.get("model", "stub"),
+                    "choices": [{
+                        "index": 0,
+                        "delta": {"content": words[index % len(words)] + " "},
+                        "finish_reason": None
+                    }]
+                }
+                yield f"data: {json.dumps(chunk)}\n\n"
+                if tokens_per_second > 0:
+                    await asyncio.sleep(1 / tokens_per_second)
+            done = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+            }
+            yield f"data: {json.dumps(done)}\n\n"
+            yield "data: [DONE]\n\n"
+
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    return app
+
+class StubLLMServer:
+    """Runs the stub server on a background thread."""
+
+    def __init__(self, port: int, **options):
+        self.port = port
+        self.app = create_app(**options)
+        self.server = uvicorn.Server(uvicorn.Config(self.app, host="127.0.0.1", port=port, log_level="warning"))
+        self._thread = threading.Thread(target=self.server.run, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self) -> None:
+        self._thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self._thread.join(timeout=5)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--first-token-ms", type=float, default=250)
+    parser.add_argument("--tokens-per-second", type=float, default=80)
+    parser.add_argument("--reply-tokens", type=int, default=60)
+    args = parser.parse_args()
+    uvicorn.run(
+        create_app(args.first_token_ms, args.tokens_per_second, args.reply_tokens),
+        host="127.0.0.1",
+        port=args.port
+    )
@@ -0,0 +1,174 @@
+"""Minimal in-memory Redis stand-in for benchmarks.
+
+Speaks enough RESP2 for the agent: PING, GET, SET (with EX/PX), DEL,
+EXISTS, EXPIRE, RPUSH, LLEN, LRANGE, PUBLISH, SUBSCRIBE and UNSUBSCRIBE.
+It is not a general Redis replacement.
+
+    python benchmarks/stub_redis.py --port 6390
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+def encode(value) -> bytes:
+    """Encode a reply as RESP2."""
+    if value is None:
+        return b"$-1\r\n"
+    if isinstance(value, int):
+        return b":%d\r\n" % value
+    if isinstance(value, str):
+        return b"+" + value.encode() + b"\r\n"
+    if isinstance(value, Exception):
+        return b"-ERR " + str(value).encode() + b"\r\n"
+    if isinstance(value, list):
+        return b"*%d\r\n" % len(value) + b"".join(encode(item) for item in value)
+    return b"$%d\r\n" % len(value) + value + b"\r\n"
+
+async def read_command(reader: asyncio.StreamReader) -> Optional[List[bytes]]:
+    line = await reader.readline()
+    if not line:
+        return None
+    if not line.startswith(b"*"):
+        return line.strip().split()
+    parts = []
+    for _ in range(int(line[1:])):
+        size = int((await reader.readline())[1:])
+        parts.append((await reader.readexactly(size + 2))[:-2])
+    return parts
+
+class StubRedis:
+    """Keyspace and pub/sub shared by every connection."""
+
+    def __init__(self):
+        self.values: Dict[bytes, Tuple[Any, Optional[float]]] = {}
+        self.channels: Dict[bytes, Set[asyncio.StreamWriter]] = {}
+        self.commands = 0
+
+    def get(self, key: bytes) -> Any:
+        entry = self.values.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self.values[key]
+            return None
+        return value
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        subscribed: Set[bytes] = set()
+        try:
+            while True:
+                command = await read_command(reader)
+                if command is None:
+                    break
+                self.commands += 1
+                name = command[0].upper()
+                args = command[1:]
+                if name == b"SUBSCRIBE":
+                    for channel in args:
+                        self.channels.setdefault(channel, set()).add(writer)
+                        subscribed.add(channel)
+                        writer.write(encode([b"subscribe", channel, len(subscribed)]))
+                elif name == b"UNSUBSCRIBE":
+                    for channel in args or list(subscribed):
+                        self.channels.get(channel, set()).discard(writer)
+                        subscribed.discard(channel)
+                        writer.write(encode([b"unsubscribe", channel, len(subscribed)]))
+                elif name == b"PING" and subscribed:
+                    writer.write(encode([b"pong", args[0] if args else b""]))
+                else:
+                    writer.write(encode(self.execute(name, args)))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for channel in subscribed:
+                self.channels.get(channel, set()).discard(writer)
+            writer.close()
+
+    def execute(self, name: bytes, args: List[bytes]):
+        if name == b"PING":
+            return "PONG"
+        if name == b"GET":
+            return self.get(args[0])
+        if name == b"SET":
+            expires_at = None
+            options = [arg.upper() for arg in args[2:]]
+            for index, option in enumerate(options):
+                if option == b"EX":
+                    expires_at = time.monotonic() + int(args[3 + index])
+                elif option == b"PX":
+                    expires_at = time.monotonic() + int(args[3 + index]) / 1000
+            self.values[args[0]] = (args[1], expires_at)
+            return "OK"
+        if name == b"DEL":
+            return sum(1 for key in args if self.values.pop(key, None) is not None)
+        if name == b"EXISTS":
+            return sum(1 for key in args if self.get(key) is not None)
+        if name == b"EXPIRE":
+            value = self.get(args[0])
+            if value is None:
+                return 0
+            self.values[args[0]] = (value, time.monotonic() + int(args[1]))
+            return 1
+        if name == b"RPUSH":
+            items = self.get(args[0]) or []
+            items.extend(args[1:])
+            self.values[args[0]] = (items, self.values.get(args[0], (None, None))[1])
+            return len(items)
+        if name == b"LLEN":
+            return len(self.get(args[0]) or [])
+        if name == b"LRANGE":
+            items = self.get(args[0]) or []
+            start, end = int(args[1]), int(args[2])
+            return items[start:] if end == -1 else items[start:end + 1]
+        if name == b"PUBLISH":
+            receivers = self.channels.get(args[0], set())
+            for receiver in receivers:
+                receiver.write(encode([b"message", args[0], args[1]]))
+            return len(receivers)
+        if name in (b"CLIENT", b"SELECT", b"AUTH"):
+            return "OK"
+        return Exception(f"unknown command '{name.decode()}'")
+
+class StubRedisServer:
+    """Runs the stand-in on its own event loop in a background thread."""
+
+    def __init__(self, port: int):
+        self.port = port
+        self.store = StubRedis()
+        self._loop = asyncio.new_event_loop()
+        self._started = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+        self._started.wait(timeout=5)
+
+    def stop(self) -> None:
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self._loop)
+        server = self._loop.run_until_complete(asyncio.start_server(self.store.handle, "127.0.0.1", self.port))
+        self._started.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            server.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=6390)
+    args = parser.parse_args()
+
+    async def main():
+        server = await asyncio.start_server(StubRedis().handle, "127.0.0.1", args.port)
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
@@ -24,6 +24,7 @@ type WidgetDataType = {
 interface Widget {
   type: WidgetType;
   data: WidgetDataType[WidgetType];
+  etag?: string;
 }
 
 export default function WorkshopPage() {
@@ -72,7 +73,13 @@ export default function WorkshopPage() {
             timestamp: new Date().toISOString()
           }]);
         } else if (data.type === 'widget') {
-          setWidgets(prev => [...prev, data.content as Widget]);
+          const widget = data.content as Widget;
+          // Identical widgets share an etag; don't render them twice
+          setWidgets(prev =>
+            widget.etag && prev.some(w => w.etag === widget.etag)
+              ? prev
+              : [...prev, widget]
+          );
         }
       };
       
@@ -222,7 +229,7 @@ export default function WorkshopPage() {
             <div className="space-y-6">
               {widgets.map((widget, idx) => (
                 <WidgetSelector
-                  key={idx}
+                  key={widget.etag ?? idx}
                   type={widget.type}
                   data={widget.data}
                 />
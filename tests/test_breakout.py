@@ -0,0 +1,109 @@
+"""Tests for running breakout groups concurrently."""
+
+import asyncio
+import time
+import pytest
+from app.agent.runtime.breakout import BreakoutManager
+from app.agent.runtime.timers import TimerScheduler
+from app.agent.state import InputKind, SessionStateStore
+
+async def slow_turn(messages, session):
+    """A facilitator turn that takes a fixed amount of time."""
+    await asyncio.sleep(0.1)
+    yield {"type": "final", "output": f"{session['session_id']}: {messages[-1]['content']}"}
+
+async def join_summaries(summary, messages):
+    """Summarize a group by joining its messages."""
+    return " | ".join(message["content"] for message in messages)
+
+@pytest.mark.asyncio
+async def test_groups_run_concurrently_and_aggregate():
+    """Test that twenty groups take about one group's time and report back."""
+    store = SessionStateStore()
+    manager = BreakoutManager(slow_turn, store, join_summaries, llm_concurrency=20, timers=TimerScheduler())
+    groups = [{"id": f"g{index}", "participants": [f"P{index}"]} for index in range(20)]
+
+    started = time.monotonic()
+    breakout = await manager.start("plenary", groups, duration=5, prompt="Map the service journey")
+    replies = await asyncio.gather(*(
+        manager.send(breakout.breakout_id, f"g{index}", "done") for index in range(20)
+    ))
+    result = await manager.end(breakout.breakout_id)
+
+    assert time.monotonic() - started < 1.0
+    assert len(replies) == 20
+    assert result["groups"]["g3"]["turns"] == 2
+    state = await store.load("plenary")
+    assert state.input_counts[InputKind.BREAKOUT] == 20
+    assert "g3: Map the service journey" in state.summaries["introduction"]
+
+@pytest.mark.asyncio
+async def test_deadline_cuts_off_unfinished_turns():
+    """Test that groups still mid-turn are stopped at the shared deadline."""
+    store = SessionStateStore()
+    manager = BreakoutManager(slow_turn, store, llm_concurrency=1, timers=TimerScheduler())
+    breakout = await manager.start("plenary", [{"id": "a"}, {"id": "b"}, {"id": "c"}], duration=0.15, prompt="Go")
+    await asyncio.wait_for(breakout.task, timeout=1)
+
+    assert breakout.status == "ended"
+    assert sum(group["turns"] for group in breakout.result["groups"].values()) < 3
+    with pytest.raises(ValueError):
+        await manager.send(breakout.breakout_id, "a", "too late")
+
+@pytest.mark.asyncio
+async def test_failed_opening_turn_keeps_group_running():
+    """Test that a group whose opening turn fails still answers messages."""
+    async def flaky_turn(messages, session):
+        if messages[-1]["content"] == "Go":
+            raise RuntimeError("LLM unavailable")
+        yield {"type": "final", "output": f"re: {messages[-1]['content']}"}
+
+    manager = BreakoutManager(flaky_turn, SessionStateStore(), timers=TimerScheduler())
+    breakout = await manager.start("plenary", [{"id": "a"}], duration=5, prompt="Go")
+    reply = await asyncio.wait_for(manager.send(breakout.breakout_id, "a", "hello"), timeout=1)
+    assert reply["output"] == "re: hello"
+    assert [message["content"] for message in breakout.groups["a"].messages] == ["hello", "re: hello"]
+    await manager.end(breakout.breakout_id)
+
+@pytest.mark.asyncio
+async def test_messages_refused_while_groups_stop():
+    """Test that a message sent while the groups wind down fails instead of hanging."""
+    async def stubborn_turn(messages, session):
+        try:
+            await asyncio.sleep(10)
+        finally:
+            # Slow to wind down when cancelled
+            await asyncio.sleep(0.2)
+        yield {"type": "final", "output": "never"}
+
+    store = SessionStateStore()
+    manager = BreakoutManager(stubborn_turn, store, llm_concurrency=2, timers=TimerScheduler())
+    breakout = await manager.start("plenary", [{"id": "a"}, {"id": "b"}], duration=5)
+    busy = asyncio.ensure_future(manager.send(breakout.breakout_id, "a", "first"))
+    await asyncio.sleep(0.05)
+    ending = asyncio.ensure_future(manager.end(breakout.breakout_id))
+    await asyncio.sleep(0.05)
+
+    with pytest.raises(ValueError):
+        await asyncio.wait_for(manager.send(breakout.breakout_id, "b", "late"), timeout=1)
+    with pytest.raises(ValueError):
+        await busy
+    await ending
+
+@pytest.mark.asyncio
+async def test_reply_wait_is_bounded():
+    """Test that a sender stops waiting a grace period after the deadline."""
+    async def hung_turn(messages, session):
+        await asyncio.sleep(10)
+        yield {"type": "final", "output": "never"}
+
+    store = SessionStateStore()
+    manager = BreakoutManager(hung_turn, store, llm_concurrency=1, timers=TimerScheduler(), reply_grace=0.1)
+    breakout = await manager.start("plenary", [{"id": "a"}], duration=5)
+    # The supervisor has its timer; only the reply wait sees the new deadline
+    await asyncio.sleep(0.01)
+    breakout.deadline = time.monotonic()
+
+    with pytest.raises(asyncio.TimeoutError):
+        await manager.send(breakout.breakout_id, "a", "hello")
+    await manager.stop()
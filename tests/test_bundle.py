@@ -0,0 +1,55 @@
+"""Tests for the pre-rendered content bundle."""
+
+import json
+import pytest
+from app.agent.content import ContentRepository
+from app.agent.content.bundle import BundleServer, ContentBundle, compile_bundle
+
+def write_content(tmp_path):
+    """Write a small workshop content file."""
+    path = tmp_path / "workshop_content.json"
+    path.write_text(json.dumps({"sections": {
+        "introduction": {"title": "Introduction", "activities": [{"type": "discussion", "duration": 300}]},
+        "population_data": {"title": "Population Data", "widget_type": "data_table", "has_visual_aid": True}
+    }}))
+    return str(path)
+
+def test_scripted_turns_from_compiled_bundle(tmp_path):
+    """Test that task, time and widget requests are answered from the bundle."""
+    repository = ContentRepository(write_content(tmp_path), reload_interval=0)
+    bundle = compile_bundle(repository.snapshot)
+
+    task = bundle.match("introduction", "What's the task?")
+    assert task.text.startswith("Let's start with introductions.")
+    assert task.text.endswith("We'll spend 5 minutes on this task.")
+    assert task.task["metadata"]["requires_group_work"] is True
+
+    assert bundle.match("introduction", "How much time do we have?", 45).text == "We have less than a minute left for this section."
+    assert bundle.match("population_data", "Show the table").widget["type"] == "data_table"
+    assert bundle.match("population_data", "Why are these numbers so different?") is None
+
+def test_bundle_round_trip_and_stats(tmp_path):
+    """Test that a saved bundle is reused only for the content it was built from."""
+    repository = ContentRepository(write_content(tmp_path), reload_interval=0)
+    path = str(tmp_path / "bundle.json")
+    compile_bundle(repository.snapshot).save(path)
+    assert ContentBundle.load(path, repository.version) is not None
+    assert ContentBundle.load(path, "other-version") is None
+
+    server = BundleServer(path)
+    server.match(repository.snapshot, "introduction", "what is the task")
+    server.match(repository.snapshot, "introduction", "tell me about bias")
+    assert server.stats()["scripted_share"] == 0.5
+
+@pytest.mark.asyncio
+async def test_bundled_task_matches_node(tmp_path):
+    """Test that the scripted task answer is what the TaskDescription node says."""
+    from app.agent.graph.nodes import TaskDescription
+    repository = ContentRepository(write_content(tmp_path), reload_interval=0)
+    task = compile_bundle(repository.snapshot).match("introduction", "What's the task?").task
+
+    output = await TaskDescription().process(
+        [{"role": "user", "content": "What's the task?"}],
+        workshop_context={"current_section": "introduction", "task_type": "discussion", "duration": 300}
+    )
+    assert task == {"content": output.output, "metadata": output.metadata}
@@ -0,0 +1,79 @@
+"""Tests for cancelling in-flight agent turns."""
+
+import asyncio
+import pytest
+from app.agent.runtime.cancellation import CancellationRegistry, run_cancellable
+
+async def slow_frames(closed):
+    """Yield frames slowly, recording when the stream is closed."""
+    try:
+        for index in range(100):
+            await asyncio.sleep(0.01)
+            yield {"type": "text_delta", "content": str(index)}
+    finally:
+        closed.append(True)
+
+@pytest.mark.asyncio
+async def test_cancel_stops_running_turn():
+    """Test that cancelling interrupts the turn and closes its stream."""
+    registry = CancellationRegistry()
+    closed, frames = [], []
+
+    async def consume():
+        async for frame in run_cancellable("task-1", slow_frames(closed), registry):
+            frames.append(frame)
+
+    consumer = asyncio.ensure_future(consume())
+    await asyncio.sleep(0.035)
+    assert registry.cancel("task-1") is True
+    await asyncio.wait_for(consumer, timeout=0.5)
+    assert 0 < len(frames) < 100
+    assert closed == [True]
+    assert "task-1" not in registry
+
+@pytest.mark.asyncio
+async def test_cancel_before_start():
+    """Test that a cancel arriving before the turn starts still applies."""
+    registry = CancellationRegistry()
+    assert registry.cancel("task-2") is False
+    frames = [frame async for frame in run_cancellable("task-2", slow_frames([]), registry)]
+    assert frames == []
+
+@pytest.mark.asyncio
+async def test_turn_errors_are_raised():
+    """Test that errors from the turn reach the caller."""
+    async def failing_frames():
+        yield {"type": "text_delta", "content": "Hi"}
+        raise ValueError("LLM failure")
+
+    with pytest.raises(ValueError):
+        async for _ in run_cancellable("task-3", failing_frames(), CancellationRegistry()):
+            pass
+
+class FakeRedis:
+    """Minimal async Redis recording SET expiries."""
+
+    def __init__(self):
+        self.values, self.expiry = {}, {}
+
+    async def set(self, key, value, ex=None):
+        self.values[key] = value.encode()
+        self.expiry[key] = ex
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def delete(self, key):
+        self.values.pop(key, None)
+
+@pytest.mark.asyncio
+async def test_task_tracker_sets_status_with_ttl():
+    """Test that task status is written with an expiry and cleared on finish."""
+    from app.agent.runtime.tasks import TaskTracker, TASK_KEY_PREFIX
+    redis_client = FakeRedis()
+    tracker = TaskTracker(redis_client, ttl=30)
+    await tracker.set_status("task-3", "running")
+    assert await tracker.get_status("task-3") == "running"
+    assert redis_client.expiry[TASK_KEY_PREFIX + "task-3"] == 30
+    await tracker.finish("task-3")
+    assert await tracker.get_status("task-3") is None
@@ -0,0 +1,208 @@
+"""Tests for the session WebSocket channel and the conversation log."""
+
+import asyncio
+import json
+import pytest
+from app.agent.runtime.cancellation import CancellationRegistry
+from app.agent.runtime.channel import SessionChannel, logged_turn
+from app.agent.runtime.timers import TimerScheduler
+from app.agent.state.conversation import ConversationLog, SequenceMismatch
+# The log the channel was written against, so its SequenceMismatch is caught
+from app.agent.runtime.channel import ConversationLog as ChannelConversationLog
+
+class FakeRedisLists:
+    """Minimal async stand-in for Redis lists."""
+
+    def __init__(self):
+        self.lists = {}
+
+    async def llen(self, key):
+        return len(self.lists.get(key, []))
+
+    async def lrange(self, key, start, end):
+        items = self.lists.get(key, [])
+        return items[start:] if end == -1 else items[start:end + 1]
+
+    def register_script(self, script):
+        """The conditional append script, run atomically like Redis would."""
+        async def append(keys, args):
+            items = self.lists.setdefault(keys[0], [])
+            if len(items) != args[0]:
+                return [0, len(items)]
+            items.extend(args[2:])
+            return [1, len(items)]
+        return append
+
+class Client:
+    """Drives a channel through in-memory receive and send."""
+
+    def __init__(self, channel):
+        self.incoming = asyncio.Queue()
+        self.frames = []
+        self.channel = channel
+        self.task = asyncio.ensure_future(channel.serve(self.incoming.get, self.record))
+
+    async def record(self, text):
+        self.frames.append(json.loads(text))
+
+    async def send(self, frame):
+        await self.incoming.put(json.dumps(frame))
+
+    async def wait_for(self, kind):
+        for _ in range(200):
+            for frame in self.frames:
+                if frame["type"] == kind:
+                    return frame
+            await asyncio.sleep(0.005)
+        raise AssertionError(f"No {kind} frame in {self.frames}")
+
+    async def close(self):
+        self.task.cancel()
+        await asyncio.gather(self.task, return_exceptions=True)
+
+def make_channel(run_turn, conversations=None):
+    return SessionChannel("room-1", run_turn, conversations or ChannelConversationLog(), TimerScheduler(), CancellationRegistry())
+
+@pytest.mark.asyncio
+async def test_turns_carry_only_new_messages():
+    """Test that the server rebuilds history from deltas and acknowledges each turn."""
+    seen = []
+
+    async def run_turn(task_id, session, messages, opening):
+        seen.append([message["content"] for message in messages])
+        yield {"type": "text_delta", "content": "Welcome."}
+        yield {"type": "final", "messages": [{"role": "assistant", "content": "Facilitator: Welcome."}]}
+
+    client = Client(make_channel(run_turn))
+    assert (await client.wait_for("ready"))["seq"] == 0
+
+    await client.send({"type": "turn", "turn_id": "t1", "messages": [{"role": "user", "content": "Hello"}], "base_seq": 0})
+    ack = await client.wait_for("ack")
+    assert ack == {"type": "ack", "turn_id": "t1", "seq": 2}
+    assert all(frame.get("turn_id") == "t1" for frame in client.frames if frame["type"] != "ready")
+
+    client.frames.clear()
+    await client.send({"type": "turn", "turn_id": "t2", "messages": [{"role": "user", "content": "Next"}], "base_seq": 2})
+    assert (await client.wait_for("ack"))["seq"] == 4
+    assert seen[1] == ["Hello", "Facilitator: Welcome.", "Next"]
+    await client.close()
+
+@pytest.mark.asyncio
+async def test_stale_base_seq_is_rejected():
+    """Test that a client out of step with the log is told the current seq."""
+    async def run_turn(task_id, session, messages, opening):
+        yield {"type": "final", "messages": []}
+
+    conversations = ChannelConversationLog()
+    await conversations.append("room-1", [{"role": "user", "content": "Hi"}])
+    client = Client(make_channel(run_turn, conversations))
+    await client.send({"type": "turn", "turn_id": "t1", "messages": [{"role": "user", "content": "Hello"}], "base_seq": 0})
+    error = await client.wait_for("error")
+    assert error["code"] == "seq_mismatch"
+    assert error["seq"] == 1
+    await client.close()
+
+@pytest.mark.asyncio
+async def test_message_limit_counts_bytes():
+    """Test that the frame size limit applies to UTF-8 bytes, not characters."""
+    async def run_turn(task_id, session, messages, opening):
+        yield {"type": "final", "messages": []}
+
+    channel = SessionChannel("room-1", run_turn, ChannelConversationLog(), TimerScheduler(), CancellationRegistry(), max_message_bytes=64)
+    client = Client(channel)
+    await client.wait_for("ready")
+    frame = json.dumps({"type": "ping", "pad": "é" * 20}, ensure_ascii=False)
+    assert len(frame) <= 64 < len(frame.encode())
+    await client.incoming.put(frame)
+    assert (await client.wait_for("error"))["code"] == "too_large"
+    await client.close()
+
+@pytest.mark.asyncio
+async def test_queued_text_deltas_are_coalesced():
+    """Test that deltas stuck behind a slow client are sent as one frame."""
+    release = asyncio.Event()
+    sent = []
+
+    async def slow_send(text):
+        await release.wait()
+        sent.append(json.loads(text))
+
+    async def run_turn(task_id, session, messages, opening):
+        for word in ["One ", "two ", "three."]:
+            yield {"type": "text_delta", "content": word}
+        yield {"type": "final", "messages": []}
+
+    channel = make_channel(run_turn)
+    incoming = asyncio.Queue()
+    task = asyncio.ensure_future(channel.serve(incoming.get, slow_send))
+    await incoming.put(json.dumps({"type": "turn", "turn_id": "t1", "messages": []}))
+    await asyncio.sleep(0.02)
+    release.set()
+    await asyncio.sleep(0.02)
+    deltas = [frame for frame in sent if frame["type"] == "text_delta"]
+    assert len(deltas) == 1
+    assert deltas[0]["content"] == "One two three."
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+@pytest.mark.asyncio
+async def test_conversation_log_reads_only_the_new_tail():
+    """Test that another worker's appends are fetched without re-reading the log."""
+    redis = FakeRedisLists()
+    worker_a = ConversationLog(redis, local_ttl=0)
+    worker_b = ConversationLog(redis, local_ttl=0)
+    assert await worker_a.append("s1", [{"role": "user", "content": "One"}]) == 1
+    assert await worker_b.seq("s1") == 1
+    await worker_a.append("s1", [{"role": "assistant", "content": "Two"}], base_seq=1)
+    assert [message["content"] for message in await worker_b.load("s1")] == ["One", "Two"]
+    with pytest.raises(SequenceMismatch):
+        await worker_b.append("s1", [{"role": "user", "content": "Three"}], base_seq=1)
+
+@pytest.mark.asyncio
+async def test_conversation_appends_are_conditional():
+    """Test that a worker with a stale local tier can't interleave another's messages."""
+    redis = FakeRedisLists()
+    worker_a = ConversationLog(redis, local_ttl=60)
+    worker_b = ConversationLog(redis, local_ttl=60)
+    assert await worker_a.seq("s1") == await worker_b.seq("s1") == 0
+
+    await worker_a.append("s1", [{"role": "user", "content": "From A"}], base_seq=0)
+    with pytest.raises(SequenceMismatch) as mismatch:
+        await worker_b.append("s1", [{"role": "user", "content": "From B"}], base_seq=0)
+    assert mismatch.value.seq == 1
+
+    # Without a base seq the append lands after what the other worker added
+    assert await worker_b.append("s1", [{"role": "assistant", "content": "Reply"}]) == 2
+    assert [message["content"] for message in await worker_b.load("s1")] == ["From A", "Reply"]
+    assert len(redis.lists["conversation:s1"]) == 2
+
+@pytest.mark.asyncio
+async def test_malformed_messages_are_rejected():
+    """Test that messages that aren't role/content objects are a bad frame."""
+    async def run_turn(task_id, session, messages, opening):
+        yield {"type": "final", "messages": []}
+
+    conversations = ChannelConversationLog()
+    client = Client(make_channel(run_turn, conversations))
+    await client.send({"type": "turn", "turn_id": "t1", "messages": ["Hello"], "base_seq": 0})
+    error = await client.wait_for("error")
+    assert error["code"] == "bad_frame"
+    assert await conversations.seq("room-1") == 0
+    await client.close()
+
+    with pytest.raises(ValueError):
+        await ConversationLog().append("s1", [{"role": "user", "content": None}])
+
+@pytest.mark.asyncio
+async def test_logged_turn_records_reply_and_acks():
+    """Test that a delta turn runs on the logged history and ends with the new seq."""
+    conversations = ConversationLog()
+    await conversations.append("s1", [{"role": "user", "content": "Hello"}], base_seq=0)
+
+    async def run(history):
+        assert [message["content"] for message in history] == ["Hello"]
+        yield {"type": "final", "messages": [{"role": "assistant", "content": "Facilitator: Hi."}]}
+
+    frames = [frame async for frame in logged_turn(conversations, "s1", run)]
+    assert frames[-1] == {"type": "ack", "seq": 2}
+    assert (await conversations.load("s1"))[-1]["content"] == "Facilitator: Hi."
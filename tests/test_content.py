@@ -0,0 +1,89 @@
+"""Tests for the workshop content repository."""
+
+import json
+import os
+import pytest
+from app.agent.content import ContentRepository, WidgetCache
+from app.agent.models import WidgetSpec
+
+@pytest.fixture
+def content_file(tmp_path):
+    """Write a small workshop content file for testing."""
+    path = tmp_path / "workshop_content.json"
+    path.write_text(json.dumps({
+        "sections": {
+            "introduction": {"title": "Introduction", "has_visual_aid": False},
+            "population_data": {
+                "title": "Population Data",
+                "has_visual_aid": True,
+                "widget_type": "data_table"
+            }
+        }
+    }))
+    return path
+
+def test_sections_are_indexed(content_file):
+    """Test that sections are indexed with precomputed fields."""
+    repository = ContentRepository(str(content_file))
+    section = repository.get_section("population_data")
+    assert section.title == "Population Data"
+    assert section.has_visual_aid is True
+    assert section.widget_type == "data_table"
+    assert repository.get_section("introduction").has_visual_aid is False
+    assert repository.get_section("unknown") is None
+
+def test_reload_on_change(content_file):
+    """Test that edits are picked up and produce a new version."""
+    repository = ContentRepository(str(content_file))
+    old_version = repository.version
+    assert repository.reload_if_changed() is False
+
+    content_file.write_text(json.dumps({"sections": {"introduction": {"title": "Welcome"}}}))
+    os.utime(content_file, ns=(0, 1))
+    assert repository.reload_if_changed() is True
+    assert repository.version != old_version
+    assert repository.get_section("introduction").title == "Welcome"
+    assert repository.get_section("population_data") is None
+
+def test_invalid_edit_keeps_previous_version(content_file):
+    """Test that a broken edit does not replace the loaded content."""
+    repository = ContentRepository(str(content_file))
+    version = repository.version
+    content_file.write_text("{not json")
+    os.utime(content_file, ns=(0, 2))
+    assert repository.reload_if_changed() is False
+    assert repository.version == version
+    assert repository.get_section("introduction").title == "Introduction"
+
+    # Valid JSON, but not workshop content
+    for text, mtime in (("[1, 2]", 3), ('{"sections": ["introduction"]}', 4)):
+        content_file.write_text(text)
+        os.utime(content_file, ns=(0, mtime))
+        assert repository.reload_if_changed() is False
+        assert repository.version == version
+
+def test_default_content_file():
+    """Test that the bundled content file loads."""
+    repository = ContentRepository()
+    assert repository.get_section("introduction") is not None
+
+def test_widget_cache_reuses_payload_per_version():
+    """Test that widgets are serialized once per content version."""
+    cache = WidgetCache()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return WidgetSpec("checklist", {"items": ["a"], "title": "T"})
+
+    first = cache.get(("section", "key_concepts"), "v1", build)
+    second = cache.get(("section", "key_concepts"), "v1", build)
+    assert first is second
+    assert len(builds) == 1
+    assert json.loads(first.details) == {"items": ["a"], "title": "T"}
+    assert json.loads(first.encoded)["etag"] == first.etag
+
+    third = cache.get(("section", "key_concepts"), "v2", build)
+    assert len(builds) == 2
+    assert third.version == "v2"
+    assert third.etag == first.etag
@@ -0,0 +1,55 @@
+"""Tests for the batched workshop event sink."""
+
+import asyncio
+import pytest
+from app.agent.runtime.events import EventSink, JsonlSegmentStore
+
+@pytest.mark.asyncio
+async def test_events_flushed_in_batches(tmp_path):
+    """Test that a full batch is written without waiting for the interval."""
+    store = JsonlSegmentStore(str(tmp_path))
+    sink = EventSink(store, batch_size=3, flush_interval=60)
+    sink.start()
+    for index in range(3):
+        sink.emit("feedback", {"rating": index})
+    await asyncio.sleep(0.1)
+    assert [event["rating"] for event in store.read()] == [0, 1, 2]
+    await sink.stop()
+
+@pytest.mark.asyncio
+async def test_stop_drains_buffer(tmp_path):
+    """Test that graceful shutdown persists every buffered event."""
+    store = JsonlSegmentStore(str(tmp_path))
+    sink = EventSink(store, batch_size=100, flush_interval=60)
+    sink.start()
+    for index in range(250):
+        sink.emit("participant_input", {"index": index})
+    await sink.stop()
+    assert len(sink) == 0
+    assert [event["index"] for event in store.read()] == list(range(250))
+
+def test_full_buffer_drops_without_writing(tmp_path):
+    """Test that emit never writes on the caller's thread and stays bounded."""
+    store = JsonlSegmentStore(str(tmp_path))
+    sink = EventSink(store, batch_size=2, max_buffer=4)
+    accepted = [sink.emit("action_item", {"index": index}) for index in range(10)]
+    assert accepted == [True] * 4 + [False] * 6
+    assert len(sink) == 4
+    assert sink.dropped == 6
+    assert store.segments() == []
+
+@pytest.mark.asyncio
+async def test_failed_writes_keep_buffer_bounded(tmp_path):
+    """Test that a batch put back after a failed write doesn't exceed max_buffer."""
+    class FailingStore(JsonlSegmentStore):
+        def append(self, events):
+            sink.emit("feedback", {"during": True})
+            raise OSError("disk full")
+
+    sink = EventSink(FailingStore(str(tmp_path)), batch_size=3, max_buffer=4)
+    for index in range(4):
+        sink.emit("feedback", {"index": index})
+    assert await sink.flush() is False
+    assert len(sink) == 4
+    assert sink.dropped == 1
+    assert [event.get("index") for event in sink._buffer] == [1, 2, 3, None]
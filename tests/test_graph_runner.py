@@ -0,0 +1,70 @@
+"""Tests for the graph execution engine."""
+
+import asyncio
+import time
+import pytest
+from app.agent.graph.runner import GraphRunner
+from app.agent.models import NodeOutput, Successor
+
+class FakeNode:
+    """Node that sleeps, then hands off to fixed successors."""
+
+    def __init__(self, name, successors, delay=0.0):
+        self.name = name
+        self.successors = successors
+        self.delay = delay
+        self.calls = 0
+
+    async def process(self, messages, **kwargs):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return NodeOutput(self.name, self.name)
+
+    async def get_successors(self, output, **kwargs):
+        return [Successor(name, output) for name in self.successors]
+
+@pytest.mark.asyncio
+async def test_branches_run_concurrently():
+    """Test that sibling branches overlap and stream in completion order."""
+    runner = GraphRunner({
+        "CustomerResponse": FakeNode("CustomerResponse", ["TaskDescription", "Widget"]),
+        "TaskDescription": FakeNode("TaskDescription", [], delay=0.1),
+        "Widget": FakeNode("Widget", [], delay=0.1)
+    })
+    start = time.monotonic()
+    order = [output.node async for output in runner.run("CustomerResponse", [])]
+    assert time.monotonic() - start < 0.18
+    assert order[0] == "CustomerResponse"
+    assert sorted(order[1:]) == ["TaskDescription", "Widget"]
+
+@pytest.mark.asyncio
+async def test_cycles_run_each_node_once():
+    """Test that the Widget -> CustomerResponse loop is not followed."""
+    nodes = {
+        "CustomerResponse": FakeNode("CustomerResponse", ["Widget"]),
+        "Widget": FakeNode("Widget", ["CustomerResponse"])
+    }
+    outputs = [output async for output in GraphRunner(nodes).run("CustomerResponse", [])]
+    assert [output.node for output in outputs] == ["CustomerResponse", "Widget"]
+    assert nodes["CustomerResponse"].calls == 1
+
+@pytest.mark.asyncio
+async def test_depth_limit():
+    """Test that chains stop at the configured depth."""
+    nodes = {name: FakeNode(name, [chr(ord(name) + 1)]) for name in "ABCDEF"}
+    outputs = [output async for output in GraphRunner(nodes, max_depth=2).run("A", [])]
+    assert [output.node for output in outputs] == ["A", "B", "C"]
+
+@pytest.mark.asyncio
+async def test_node_outputs_reference_not_copy_history():
+    """Test that the workshop nodes' outputs are slotted and don't embed messages."""
+    from app.agent.graph.nodes import CustomerResponse, TaskDescription
+    messages = [{"role": "user", "content": "What is the task?"}]
+    context = {"current_section": "introduction", "interactive_mode": True, "task_type": "discussion"}
+    runner = GraphRunner({"CustomerResponse": CustomerResponse(), "TaskDescription": TaskDescription()})
+    outputs = [output async for output in runner.run("CustomerResponse", messages, workshop_context=context)]
+    assert [output.node for output in outputs] == ["CustomerResponse", "TaskDescription"]
+    for output in outputs:
+        assert not hasattr(output, "__dict__")
+        assert not hasattr(output, "messages")
+    assert outputs[1].metadata["requires_group_work"] is True
@@ -0,0 +1,54 @@
+"""Tests for LLM call admission and rate limiting."""
+
+import asyncio
+import pytest
+from app.agent.utils.llm_scheduler import LLMScheduler, Priority, TokenBucket
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_and_priority_order():
+    """Test that queued live calls are admitted before queued background calls."""
+    scheduler = LLMScheduler(max_concurrency=1)
+    order = []
+    release = asyncio.Event()
+
+    async def call(name, priority):
+        async with scheduler.slot(priority):
+            order.append(name)
+            await release.wait()
+
+    first = asyncio.ensure_future(call("first", Priority.LIVE))
+    await asyncio.sleep(0)
+    queued = [
+        asyncio.ensure_future(call("summary", Priority.BACKGROUND)),
+        asyncio.ensure_future(call("reply", Priority.LIVE))
+    ]
+    await asyncio.sleep(0.01)
+    assert scheduler.in_flight == 1
+    assert scheduler.stats()["queue_depth"] == 2
+
+    release.set()
+    await asyncio.gather(first, *queued)
+    assert order == ["first", "reply", "summary"]
+    assert scheduler.in_flight == 0
+    assert scheduler.stats()["classes"]["background"]["admitted"] == 1
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_frees_its_place():
+    """Test that a call cancelled while queued doesn't block the queue."""
+    scheduler = LLMScheduler(max_concurrency=1)
+    async with scheduler.slot():
+        waiting = asyncio.ensure_future(scheduler.slot().__aenter__())
+        await asyncio.sleep(0)
+        waiting.cancel()
+        await asyncio.gather(waiting, return_exceptions=True)
+    async with scheduler.slot():
+        assert scheduler.in_flight == 1
+    assert scheduler.stats()["queue_depth"] == 0
+
+def test_token_bucket_reports_wait():
+    """Test that overdrawing the bucket returns how long to wait."""
+    bucket = TokenBucket(rate_per_minute=60)
+    assert bucket.take(60) == 0.0
+    assert bucket.take(30) == pytest.approx(30, abs=0.1)
+    bucket.refund(30)
+    assert bucket.take(1) < 1.1
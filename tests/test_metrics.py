@@ -0,0 +1,63 @@
+"""Tests for the Prometheus metrics registry."""
+
+import json
+import os
+import pytest
+from app.agent.observability.metrics import MetricsRegistry
+
+def test_render_counters_and_histograms():
+    """Test the text exposition of counters, callback gauges and histograms."""
+    registry = MetricsRegistry(directory="")
+    errors = registry.counter("workshop_errors_total", "Errors", ["source", "type"])
+    latency = registry.histogram("workshop_turn_seconds", "Turn latency", ["kind"], buckets=(0.1, 1.0))
+    registry.gauge("workshop_llm_in_flight", "In-flight calls", callback=lambda: 3)
+
+    errors.inc(source="turn", type="TimeoutError")
+    errors.inc(source="turn", type="TimeoutError")
+    latency.observe(0.05, kind="turn")
+    latency.observe(0.5, kind="turn")
+    latency.observe(4.0, kind="turn")
+
+    text = registry.render()
+    assert "# TYPE workshop_errors_total counter" in text
+    assert 'workshop_errors_total{source="turn",type="TimeoutError"} 2' in text
+    assert 'workshop_turn_seconds_bucket{kind="turn",le="0.1"} 1' in text
+    assert 'workshop_turn_seconds_bucket{kind="turn",le="1"} 2' in text
+    assert 'workshop_turn_seconds_bucket{kind="turn",le="+Inf"} 3' in text
+    assert 'workshop_turn_seconds_count{kind="turn"} 3' in text
+    assert "workshop_llm_in_flight 3" in text
+
+def test_workers_are_merged(tmp_path):
+    """Test that counts from every worker are summed and dead workers' gauges dropped."""
+    registry = MetricsRegistry(directory=str(tmp_path))
+    registry.counter("workshop_cancellations_total", "Cancellations").inc()
+    registry.gauge("workshop_active_sessions", "Active sessions").set(2)
+
+    def write_worker(pid, ppid):
+        snapshot = registry.snapshot()
+        snapshot["pid"] = pid
+        snapshot["ppid"] = ppid
+        with open(os.path.join(tmp_path, f"{pid}.json"), "w") as f:
+            json.dump(snapshot, f)
+
+    # A live sibling, a crashed sibling and a worker of an earlier server run
+    write_worker(os.getppid(), os.getppid())
+    write_worker(99999999, os.getppid())
+    write_worker(99999998, -1)
+
+    text = registry.render()
+    assert "workshop_cancellations_total 3" in text
+    assert "workshop_active_sessions 4" in text
+    assert not os.path.exists(os.path.join(tmp_path, "99999998.json"))
+
+@pytest.mark.asyncio
+async def test_publish_and_render_off_the_loop(tmp_path):
+    """Test that the async publish and render see the same merged metrics."""
+    registry = MetricsRegistry(directory=str(tmp_path))
+    registry.counter("workshop_cancellations_total", "Cancellations").inc(2)
+
+    await registry.publish_async()
+    assert os.path.exists(os.path.join(tmp_path, f"{os.getpid()}.json"))
+    text = await registry.render_async()
+    assert text == registry.render()
+    assert "workshop_cancellations_total 2" in text
@@ -0,0 +1,71 @@
+"""Tests for speculative prefetch of section opening turns."""
+
+import asyncio
+import pytest
+from app.agent.cache.prefetch import SectionPrefetcher
+
+def opening(section, calls):
+    """Build function that records how often it ran."""
+    async def build():
+        calls.append(section)
+        await asyncio.sleep(0.01)
+        return [{"type": "text_delta", "content": f"Welcome to {section}."}]
+    return build
+
+@pytest.mark.asyncio
+async def test_prefetched_turn_served_once():
+    """Test that a matching section change reads the prefetched frames."""
+    prefetcher = SectionPrefetcher()
+    calls = []
+    assert prefetcher.schedule("s1", "introduction", "v1", opening("introduction", calls)) is True
+    assert prefetcher.schedule("s1", "introduction", "v1", opening("introduction", calls)) is False
+
+    frames = await prefetcher.take("s1", "introduction", "v1")
+    assert frames[0]["content"] == "Welcome to introduction."
+    assert calls == ["introduction"]
+    assert await prefetcher.take("s1", "introduction", "v1") is None
+    assert prefetcher.hits == 1
+
+@pytest.mark.asyncio
+async def test_diverged_session_discards_guess():
+    """Test that a guess for another section or content version is thrown away."""
+    prefetcher = SectionPrefetcher()
+    prefetcher.schedule("s1", "introduction", "v1", opening("introduction", []))
+    await asyncio.sleep(0.02)
+    assert await prefetcher.take("s1", "welcome", "v1") is None
+    assert prefetcher.discarded == 1
+
+    prefetcher.schedule("s1", "introduction", "v1", opening("introduction", []))
+    assert await prefetcher.take("s1", "introduction", "v2") is None
+    assert len(prefetcher) == 0
+
+@pytest.mark.asyncio
+async def test_failed_build_is_a_miss():
+    """Test that a failing prefetch falls back to a live turn."""
+    prefetcher = SectionPrefetcher()
+
+    async def failing():
+        raise RuntimeError("provider unavailable")
+
+    prefetcher.schedule("s1", "introduction", "v1", failing)
+    assert await prefetcher.take("s1", "introduction", "v1") is None
+
+@pytest.mark.asyncio
+async def test_slow_build_is_abandoned():
+    """Test that a live turn doesn't wait out a background build stuck in the queue."""
+    prefetcher = SectionPrefetcher(wait_timeout=0.05)
+    cancelled = []
+
+    async def queued():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    prefetcher.schedule("s1", "introduction", "v1", queued)
+    await asyncio.sleep(0)
+    assert await asyncio.wait_for(prefetcher.take("s1", "introduction", "v1"), timeout=1) is None
+    await asyncio.sleep(0)
+    assert cancelled == [True]
+    assert prefetcher.misses == 1
@@ -0,0 +1,93 @@
+"""Tests for the semantic response cache."""
+
+import pytest
+from app.agent.cache import ResponseCache, conversation_context, normalize_utterance
+
+def test_normalize_utterance():
+    """Test that case, punctuation and spacing are ignored."""
+    assert normalize_utterance("  What does Cultural SAFETY mean?! ") == "what does cultural safety mean"
+
+@pytest.mark.asyncio
+async def test_exact_and_similar_hits():
+    """Test exact and near-identical utterances hit the cache."""
+    cache = ResponseCache(opt_out=set())
+    await cache.store("key_concepts", "v1", "What does cultural safety mean?", "Cultural safety means...")
+    assert await cache.lookup("key_concepts", "v1", "what does cultural safety mean") == "Cultural safety means..."
+    assert await cache.lookup("key_concepts", "v1", "So what does cultural safety mean exactly?") == "Cultural safety means..."
+    assert cache.hits == 1
+    assert cache.similar_hits == 1
+
+@pytest.mark.asyncio
+async def test_misses_across_sections_and_versions():
+    """Test that entries are scoped to a section and content version."""
+    cache = ResponseCache(opt_out=set())
+    await cache.store("key_concepts", "v1", "What does cultural safety mean?", "Answer")
+    assert await cache.lookup("introduction", "v1", "What does cultural safety mean?") is None
+    assert await cache.lookup("key_concepts", "v2", "What does cultural safety mean?") is None
+    assert await cache.lookup("key_concepts", "v1", "How do we assess risk factors?") is None
+
+@pytest.mark.asyncio
+async def test_opt_out_and_short_utterances():
+    """Test that opted-out sections and short replies are never cached."""
+    cache = ResponseCache(opt_out={"role_play"})
+    await cache.store("role_play", "v1", "Can you play the service user?", "Sure...")
+    assert await cache.lookup("role_play", "v1", "Can you play the service user?") is None
+    await cache.store("key_concepts", "v1", "ok yes", "Great")
+    assert await cache.lookup("key_concepts", "v1", "ok yes") is None
+
+@pytest.mark.asyncio
+async def test_lru_eviction_and_ttl():
+    """Test that the in-memory tier is bounded and entries expire."""
+    cache = ResponseCache(opt_out=set(), max_entries=1)
+    await cache.store("key_concepts", "v1", "What does cultural safety mean?", "First")
+    await cache.store("key_concepts", "v1", "How long do we have left?", "Second")
+    assert await cache.lookup("key_concepts", "v1", "What does cultural safety mean?") is None
+
+    expired = ResponseCache(opt_out=set(), ttl=-1)
+    await expired.store("key_concepts", "v1", "What does cultural safety mean?", "Stale")
+    assert await expired.lookup("key_concepts", "v1", "What does cultural safety mean?") is None
+
+@pytest.mark.asyncio
+async def test_questions_shared_across_sessions():
+    """Test that a self-contained question hits whatever came before it."""
+    cache = ResponseCache(opt_out=set())
+    ours = [
+        {"role": "user", "content": "We work on a medium secure ward."},
+        {"role": "assistant", "content": "Thanks, let's move on to key concepts."},
+        {"role": "user", "content": "What does cultural safety mean?"}
+    ]
+    theirs = [
+        {"role": "user", "content": "Can we skip the introduction?"},
+        {"role": "assistant", "content": "Of course. Key concepts next."},
+        {"role": "user", "content": "So what does cultural safety mean exactly?"}
+    ]
+
+    await cache.store("key_concepts", "v1", ours[-1]["content"], "Cultural safety means...", conversation_context(ours[-1]["content"], ours))
+    assert await cache.lookup("key_concepts", "v1", ours[-1]["content"], conversation_context(ours[-1]["content"], ours)) == "Cultural safety means..."
+    assert await cache.lookup("key_concepts", "v1", theirs[-1]["content"], conversation_context(theirs[-1]["content"], theirs)) == "Cultural safety means..."
+
+@pytest.mark.asyncio
+async def test_referring_questions_scoped_to_previous_turn():
+    """Test that a question about the last turn only hits after the same turn."""
+    cache = ResponseCache(opt_out=set())
+    question = "Can you say more about that example?"
+    ours = conversation_context(question, [{"role": "assistant", "content": "Consider a ward round..."}, {"role": "user", "content": question}])
+    theirs = conversation_context(question, [{"role": "assistant", "content": "Consider a discharge meeting..."}, {"role": "user", "content": question}])
+    assert conversation_context("What does cultural safety mean?", []) == ""
+
+    await cache.store("key_concepts", "v1", question, "On the ward round...", ours)
+    assert await cache.lookup("key_concepts", "v1", question, ours) == "On the ward round..."
+    assert await cache.lookup("key_concepts", "v1", question, theirs) is None
+
+@pytest.mark.asyncio
+async def test_empty_scopes_are_released():
+    """Test that evicted and expired entries don't leave their scope behind."""
+    cache = ResponseCache(opt_out=set(), max_entries=1)
+    await cache.store("key_concepts", "v1", "Can you say more about that example?", "First", "a")
+    await cache.store("key_concepts", "v1", "Can you say more about that example?", "Second", "b")
+    assert list(cache._by_section) == [("key_concepts", "v1:b")]
+
+    expired = ResponseCache(opt_out=set(), ttl=-1)
+    await expired.store("key_concepts", "v1", "What does cultural safety mean?", "Stale")
+    assert await expired.lookup("key_concepts", "v1", "What do cultural safety practices mean?") is None
+    assert not expired._by_section and not expired._entries
@@ -0,0 +1,52 @@
+"""Tests for the JSON serialization helpers."""
+
+import json
+import pytest
+from app.agent.utils import serialization
+from app.agent.utils.serialization import EncodedJSON, dumps, loads
+from app.agent.content.widgets import CachedWidget
+from app.agent.models import WidgetSpec
+from app.agent.utils.streaming import encode_frame, final_frame
+
+WIDGET = WidgetSpec("data_table", {
+    "title": "Service User Demographics",
+    "headers": ["Ethnic Group", "Medium Secure"],
+    "rows": [["White British", "45%"], ["Black Caribbean", "15%"]]
+})
+
+@pytest.fixture(params=["orjson", "json"])
+def backend(request, monkeypatch):
+    """Run a test against orjson (when installed) and the stdlib fallback."""
+    if request.param == "json":
+        monkeypatch.setattr(serialization, "orjson", None)
+        monkeypatch.setattr(serialization, "_FRAGMENT", None)
+    elif serialization.orjson is None:
+        pytest.skip("orjson is not installed")
+    return request.param
+
+def test_encoded_values_are_spliced(backend):
+    """Test that pre-encoded values come out as their own bytes, once."""
+    encoded = EncodedJSON({"a": 1}, b'{"a":1,"spliced":true}')
+    data = dumps({"first": encoded, "nested": [{"second": encoded}], "text": "café"})
+    assert loads(data) == {
+        "first": {"a": 1, "spliced": True},
+        "nested": [{"second": {"a": 1, "spliced": True}}],
+        "text": "café"
+    }
+
+def test_widget_details_are_not_re_escaped(backend):
+    """Test that a widget in a final frame is nested JSON, not a string."""
+    widget = CachedWidget(WIDGET, "v1")
+    line = encode_frame(final_frame({"output": "Facilitator: Hi", "widget": widget.payload}))
+    assert line.endswith(b"\n")
+    assert b'\\"' not in line
+    frame = json.loads(line)
+    assert frame["widget"]["details"] == WIDGET.details
+    assert frame["widget"]["etag"] == widget.etag
+    assert json.loads(widget.encoded) == frame["widget"]
+
+def test_encoded_json_is_a_plain_dict():
+    """Test that code reading a payload doesn't need to know it's pre-encoded."""
+    payload = CachedWidget(WIDGET, None).payload
+    assert payload["details"] == WIDGET.details
+    assert json.loads(json.dumps(payload)) == json.loads(payload.encoded)
@@ -0,0 +1,151 @@
+"""Tests for the per-session workshop state store."""
+
+import asyncio
+import pytest
+from app.agent.state import WorkshopState, InputKind, Section, SECTIONS, SessionStateStore, HistoryManager, session_key
+
+class FakeRedis:
+    """Minimal async stand-in for the Redis tier."""
+
+    def __init__(self):
+        self.data = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def delete(self, key):
+        self.data.pop(key, None)
+
+def test_session_key():
+    """Test deriving store keys from request sessions."""
+    assert session_key({"session_id": "room-1"}) == "room-1"
+    assert session_key({"id": 42}) == "42"
+    assert session_key("room-2") == "room-2"
+    assert session_key({}) == "default"
+    assert session_key(None) == "default"
+
+def test_state_round_trip():
+    """Test compact serialization of workshop state."""
+    state = WorkshopState()
+    state.current_section = 3
+    state.completion_status["introduction"] = True
+    state.current_discussion = "d1"
+    restored = WorkshopState.deserialize(state.serialize())
+    assert restored.current_section == 3
+    assert restored.completion_status["introduction"] is True
+    assert restored.completion_status["key_concepts"] is False
+    assert restored.current_discussion == "d1"
+    assert restored.current_section_name == "scenario_discussion"
+
+def test_completion_bitset():
+    """Test completion bits and the next incomplete section lookup."""
+    state = WorkshopState()
+    assert state.next_incomplete() == "introduction"
+    state.mark_complete("introduction")
+    state.completion_status["key_concepts"] = True
+    assert state.completed == 1 << Section.INTRODUCTION | 1 << Section.KEY_CONCEPTS
+    assert state.is_complete("key_concepts")
+    assert state.next_incomplete() == "scenario_discussion"
+    state.mark_complete("key_concepts", False)
+    assert state.next_incomplete() == "key_concepts"
+    for section in SECTIONS:
+        state.mark_complete(section)
+    assert state.next_incomplete() is None
+
+def test_binary_and_json_encodings():
+    """Test that progress and input counts encode to a fixed few bytes."""
+    state = WorkshopState()
+    state.current_section = 9
+    state.mark_complete("population_data")
+    assert len(state.serialize()) == 18
+
+    # Counting input doesn't grow the encoding
+    state.record_input(InputKind.QUESTION, 3)
+    state.record_input(InputKind.BREAKOUT, 70000)
+    assert len(state.serialize()) == 18
+    restored = WorkshopState.deserialize(state.serialize())
+    assert restored.input_counts[InputKind.QUESTION] == 3
+    assert restored.input_counts[InputKind.BREAKOUT] == 0xFFFF
+
+    state.summaries["introduction"] = "Everyone introduced themselves."
+    state.summarized_upto = 12
+    restored = WorkshopState.deserialize(state.serialize())
+    assert restored.to_dict() == state.to_dict()
+    assert restored.summarized_upto == 12
+
+    from_json = WorkshopState.deserialize(b'{"c":4,"d":9,"x":"d1","i":[0,0,0,2]}')
+    assert from_json.current_section == 4
+    assert from_json.is_complete("population_data")
+    assert from_json.next_incomplete() == "key_concepts"
+    assert from_json.current_discussion == "d1"
+    assert from_json.input_counts[InputKind.BREAKOUT] == 2
+
+    with pytest.raises(ValueError):
+        WorkshopState.deserialize(b"\x01\x04\x00\x00\x00\x00\x09\x00\x00\x00")
+
+def test_fresh_state_section_name():
+    """Test that a fresh session starts at the introduction."""
+    assert WorkshopState().current_section_name == "introduction"
+
+@pytest.mark.asyncio
+async def test_sessions_are_isolated():
+    """Test that sessions do not share progress."""
+    store = SessionStateStore()
+    first = await store.load("room-1")
+    first.current_section = 5
+    await store.save("room-1", first)
+    second = await store.load("room-2")
+    assert second.current_section == 0
+    assert (await store.load("room-1")).current_section == 5
+
+@pytest.mark.asyncio
+async def test_lru_eviction():
+    """Test that the in-process tier is bounded."""
+    store = SessionStateStore(max_sessions=2)
+    for session_id in ("a", "b", "c"):
+        await store.save(session_id, WorkshopState())
+    assert len(store) == 2
+    state = await store.load("a")
+    assert state.current_section == 0
+
+@pytest.mark.asyncio
+async def test_redis_tier_shared_between_workers():
+    """Test that a second worker sees progress saved by the first."""
+    redis = FakeRedis()
+    worker_a = SessionStateStore(redis_client=redis)
+    worker_b = SessionStateStore(redis_client=redis, local_ttl=0)
+    state = await worker_a.load("room-1")
+    state.current_section = 7
+    await worker_a.save("room-1", state)
+    assert (await worker_b.load("room-1")).current_section == 7
+
+@pytest.mark.asyncio
+async def test_history_window_and_background_summary():
+    """Test that old turns are summarized off the response path."""
+    store = SessionStateStore()
+    calls = []
+
+    async def summarize(summary, messages):
+        calls.append(len(messages))
+        return f"{len(messages)} earlier turns"
+
+    manager = HistoryManager(store, summarize, token_budget=30)
+    messages = [{"role": "user", "content": "x" * 40} for _ in range(10)]
+    state = await store.load("room-1")
+
+    history = manager.build_history("room-1", state, messages)
+    assert 0 < len(history) < 9
+    assert all(message["role"] == "user" for message in history)
+
+    await asyncio.sleep(0)
+    await asyncio.sleep(0)
+    state = await store.load("room-1")
+    assert calls == [9 - len(history)]
+    assert state.summaries["introduction"] == f"{calls[0]} earlier turns"
+
+    history = manager.build_history("room-1", state, messages)
+    assert history[0]["role"] == "system"
+    assert "earlier turns" in history[0]["content"]
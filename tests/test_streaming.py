@@ -0,0 +1,43 @@
+"""Tests for the streaming frame helpers."""
+
+import json
+from app.agent.utils.streaming import (
+    SentenceBuffer,
+    text_delta_frame,
+    sentence_frame,
+    final_frame,
+    encode_frame
+)
+
+def test_sentence_buffer_splits_on_boundaries():
+    """Test that complete sentences are released as soon as they end."""
+    buffer = SentenceBuffer()
+    assert buffer.feed("Welcome to the workshop. Let's") == ["Welcome to the workshop."]
+    assert buffer.feed(" begin with introductions! Who") == ["Let's begin with introductions!"]
+    assert buffer.flush() == "Who"
+    assert buffer.flush() is None
+
+def test_sentence_buffer_merges_short_fragments():
+    """Test that very short fragments are held back for the next sentence."""
+    buffer = SentenceBuffer()
+    assert buffer.feed("Ok. ") == []
+    assert buffer.feed("That covers the key concepts. ") == ["Ok. That covers the key concepts."]
+
+def test_encode_frame_ndjson():
+    """Test NDJSON encoding of frames."""
+    line = encode_frame(text_delta_frame("Hello"))
+    assert line.endswith(b"\n")
+    assert json.loads(line) == {"type": "text_delta", "content": "Hello"}
+
+def test_encode_frame_sse():
+    """Test SSE encoding of frames."""
+    event = encode_frame(sentence_frame("Hello there.", 0), "sse")
+    assert event.startswith(b"event: sentence\ndata: ")
+    assert event.endswith(b"\n\n")
+
+def test_final_frame_carries_result():
+    """Test that the final frame keeps the full turn result."""
+    frame = final_frame({"output": "Facilitator: Hi", "widget": None})
+    assert frame["type"] == "final"
+    assert frame["output"] == "Facilitator: Hi"
+    assert frame["widget"] is None
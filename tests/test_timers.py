@@ -0,0 +1,63 @@
+"""Tests for the discussion timer scheduler."""
+
+import asyncio
+import time
+import pytest
+from app.agent.runtime.timers import TimerScheduler, with_alerts
+
+def test_alerts_fire_in_deadline_order():
+    """Test that due alerts are delivered in order and the timer ends at zero."""
+    scheduler = TimerScheduler()
+    queue = scheduler.subscribe("s1")
+    timer = scheduler.start_timer("s1", "d1", 180, [120])
+    assert scheduler.time_remaining("s1") in (179, 180)
+
+    assert scheduler.fire_due(timer.started_at + 119) == 0
+    assert scheduler.fire_due(timer.started_at + 180) == 2
+    alerts = [queue.get_nowait() for _ in range(queue.qsize())]
+    assert [alert["message"] for alert in alerts] == ["One minute left.", "Time's up."]
+    assert scheduler.time_remaining("s1") is None
+    assert len(scheduler) == 0
+
+def test_restarted_timer_skips_stale_alerts():
+    """Test that restarting a timer drops the alerts of the old one."""
+    scheduler = TimerScheduler()
+    scheduler.start_timer("s1", "d1", 10)
+    restarted = scheduler.start_timer("s1", "d1", 100)
+    assert scheduler.fire_due(restarted.started_at + 50) == 0
+    assert scheduler.time_remaining("s1", "d1") is not None
+
+def test_alerts_held_until_session_subscribes():
+    """Test that alerts for a session without a stream wait for its next one."""
+    scheduler = TimerScheduler()
+    timer = scheduler.start_timer("s1", "d1", 5)
+    scheduler.fire_due(timer.started_at + 5)
+    queue = scheduler.subscribe("s1")
+    assert queue.get_nowait()["discussion_id"] == "d1"
+
+@pytest.mark.asyncio
+async def test_scheduler_pushes_alerts_into_turn_stream():
+    """Test that an alert due mid-turn is interleaved with the turn's frames."""
+    scheduler = TimerScheduler()
+    scheduler.start()
+    queue = scheduler.subscribe("s1")
+
+    async def frames():
+        for index in range(3):
+            await asyncio.sleep(0.05)
+            yield {"type": "text_delta", "content": str(index)}
+
+    scheduler.start_timer("s1", "d1", 0.08)
+    types = [frame["type"] async for frame in with_alerts(frames(), queue)]
+    await scheduler.stop()
+    assert types.count("alert") == 1
+    assert types.count("text_delta") == 3
+
+def test_many_timers_one_heap():
+    """Test that thousands of timers are tracked without per-timer tasks."""
+    scheduler = TimerScheduler()
+    now = time.monotonic()
+    for index in range(5000):
+        scheduler.start_timer(f"s{index}", "d", 60 + index % 10, [30])
+    assert len(scheduler) == 5000
+    assert scheduler.fire_due(now + 31) == 5000
@@ -0,0 +1,100 @@
+"""Tests for per-turn span tracing."""
+
+import asyncio
+import json
+import pytest
+from app.agent.observability.tracing import Tracer
+
+@pytest.mark.asyncio
+async def test_spans_nest_across_tasks():
+    """Test that spans opened in tasks a turn starts attach to its trace."""
+    tracer = Tracer(sample_rate=1.0)
+
+    async def node(name):
+        with tracer.span(f"node.{name}"):
+            await asyncio.sleep(0)
+
+    with tracer.trace("run_agent", trace_id="6f1c2a9e-0b7d-4e51-9a55-1d2f3c4b5a69") as root:
+        with tracer.span("single_turn_agent") as turn:
+            await asyncio.gather(node("Widget"), node("TaskDescription"))
+
+    trace = tracer.get("6f1c2a9e0b7d4e519a551d2f3c4b5a69")
+    assert trace is not None
+    parents = {span.name: span.parent_id for span in trace.spans}
+    assert parents["run_agent"] is None
+    assert parents["single_turn_agent"] == root.span_id
+    assert parents["node.Widget"] == turn.span_id
+    assert parents["node.TaskDescription"] == turn.span_id
+
+def test_unsampled_trace_records_nothing():
+    """Test that an unsampled turn's spans are no-ops."""
+    tracer = Tracer(sample_rate=0.0)
+    with tracer.trace("run_agent", trace_id="t1"):
+        with tracer.span("single_turn_agent") as span:
+            span.set_attribute("path", "llm")
+    assert tracer.recent() == []
+    assert tracer.stats()["started"] == 1
+    assert tracer.stats()["sampled"] == 0
+
+def test_ring_buffer_keeps_most_recent():
+    """Test that only the newest buffer_size traces are kept."""
+    tracer = Tracer(buffer_size=2)
+    for index in range(3):
+        with tracer.trace("run_agent", trace_id=f"{index:032x}"):
+            pass
+    assert [summary["trace_id"] for summary in tracer.recent()] == [f"{2:032x}", f"{1:032x}"]
+
+@pytest.mark.asyncio
+async def test_traced_records_errors():
+    """Test that the decorator marks a failing function's span as an error."""
+    tracer = Tracer()
+
+    @tracer.traced("tool.check")
+    def check(value):
+        return value * 2
+
+    @tracer.traced("tool.fail")
+    async def fail():
+        raise ValueError("boom")
+
+    with tracer.trace("run_agent", trace_id="t2"):
+        assert check(2) == 4
+        with pytest.raises(ValueError):
+            await fail()
+
+    summary = tracer.recent()[0]
+    assert summary["status"] == "error"
+    spans = {span.name: span for span in tracer.get("t2").spans}
+    assert spans["tool.fail"].status_message == "ValueError: boom"
+
+@pytest.mark.asyncio
+async def test_otlp_file_export(tmp_path):
+    """Test that finished traces are appended as OTLP/JSON lines by the exporter."""
+    path = tmp_path / "traces.jsonl"
+    tracer = Tracer(export_path=str(path), flush_interval=60)
+    tracer.start()
+    with tracer.trace("run_agent", trace_id="t3", session_id="s1") as root:
+        root.add_event("first_frame", type="sentence")
+
+    # Finishing a trace only queues it; nothing touches the file on the loop
+    assert not path.exists()
+    assert tracer.stats()["export_pending"] == 1
+    await tracer.stop()
+
+    exported = json.loads(path.read_text().splitlines()[0])
+    span = exported["resourceSpans"][0]["scopeSpans"][0]["spans"][0]
+    assert span["traceId"] == "t3"
+    assert span["name"] == "run_agent"
+    assert {"key": "session_id", "value": {"stringValue": "s1"}} in span["attributes"]
+    assert span["events"][0]["name"] == "first_frame"
+
+def test_export_queue_is_bounded(tmp_path):
+    """Test that traces waiting for export are capped at the buffer size."""
+    tracer = Tracer(export_path=str(tmp_path / "traces.jsonl"), buffer_size=2)
+    for index in range(5):
+        with tracer.trace("run_agent", trace_id=f"t{index}"):
+            pass
+
+    stats = tracer.stats()
+    assert stats["export_pending"] == 2
+    assert stats["export_dropped"] == 3